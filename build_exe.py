@@ -27,6 +27,7 @@ SPEC_FILE = ROOT / "영단어_ui.spec"
 
 EXCEL_FILE_SOURCE = ROOT / "단어장.xlsx"
 EXCEL_DIR_SOURCE = ROOT / "단어장"
+PARAMS_SOURCE = ROOT / "영단어_params.json"
 
 
 def ensure_pyinstaller_available() -> None:
@@ -55,6 +56,17 @@ def run_pyinstaller() -> None:
         "영단어_ui",
         "--hidden-import",
         "영단어",
+        "--hidden-import",
+        "영단어_store",
+        "--hidden-import",
+        "영단어_xlsx",
+        # pandas/numpy는 lazy_import로 불러와 PyInstaller가 자동으로 찾지 못한다
+        "--hidden-import",
+        "pandas",
+        "--hidden-import",
+        "numpy",
+        "--hidden-import",
+        "openpyxl",
         "--distpath",
         str(OUTPUT_DIR),
         "--workpath",
@@ -85,12 +97,21 @@ def copy_learning_materials() -> None:
     print("[경고] 복사할 단어장 자료(폴더 또는 엑셀 파일)를 찾지 못했습니다.")
 
 
+def copy_params() -> None:
+    # 영단어_tune.py로 맞춘 K/PRIOR_MAP은 exe 옆에 있어야 읽힌다
+    if PARAMS_SOURCE.is_file():
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(PARAMS_SOURCE, OUTPUT_DIR / PARAMS_SOURCE.name)
+        print(f"학습 파라미터 복사 완료 → {OUTPUT_DIR / PARAMS_SOURCE.name}")
+
+
 def main() -> None:
     if not APP_SCRIPT.exists():
         raise SystemExit(f"앱 스크립트를 찾을 수 없습니다: {APP_SCRIPT}")
     ensure_pyinstaller_available()
     run_pyinstaller()
     copy_learning_materials()
+    copy_params()
     print("완료: release/영단어_ui.exe 를 실행해 주세요.")
 
 
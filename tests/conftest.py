@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 모듈 이름이 한글이라 패키지 없이 저장소 폴더에서 바로 불러온다
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
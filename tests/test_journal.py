@@ -0,0 +1,101 @@
+"""답안 저널: 강제 종료 뒤 다시 불러오면 저장되지 않았던 답안이 되살아나는지."""
+
+import importlib
+
+import pandas as pd
+import pytest
+
+core = importlib.import_module("영단어")
+store = importlib.import_module("영단어_store")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    df = pd.DataFrame(
+        {
+            "단어": ["apple", "banana", "cherry", "apple", None],
+            "뜻": ["사과", "바나나", "체리", "사과", "빈칸"],
+            "Day": ["Day 1", "Day 1", "Day 2", "Day 2", "Day 2"],
+            "Tries": [0, 3, 0, 0, 0],
+            "Fails": [0, 1, 0, 0, 0],
+            "LastStep": [0, 2, 0, 0, 0],
+            "InitLevel": [None, 2, None, None, None],
+        }
+    )
+    path = tmp_path / "단어장.xlsx"
+    df.to_excel(path, index=False)
+    return path
+
+
+def crash(backend):
+    # checkpoint 없이 끝난 것처럼 파일 핸들만 닫는다
+    backend.journal.close()
+
+
+def state(df, row):
+    return df.loc[row, ["Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due"]].tolist()
+
+
+def test_replay_after_crash(workbook):
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    df = backend.load()
+    backend.record_levels([(("apple", "사과"), [0, 3], 3), (None, [4], 1)])
+    backend.record_answer(("apple", "사과"), [0, 3], 4, False, 1, 1, 1700000000, 1700003600)
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 4, 1, 1700000100, 1700090000)
+    crash(backend)
+
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert backend.recovered == 4
+    assert state(df, 0) == state(df, 3) == [1, 1, 4, 3, 1700000000, 1700003600]
+    assert state(df, 1) == [4, 1, 5, 2, 1700000100, 1700090000]
+    assert df.loc[4, "InitLevel"] == 1  # 키가 없는 행은 행 번호로
+    assert pd.read_excel(workbook)["Tries"].tolist() == [0, 3, 0, 0, 0]  # 엑셀은 아직 그대로
+
+    backend.checkpoint(df, final=True)
+    backend.close()
+    assert not backend.journal.pending()
+    saved = pd.read_excel(workbook)
+    assert saved["Tries"].tolist() == [1, 4, 0, 1, 0]
+    assert saved["Due"].tolist() == [1700003600, 1700090000, 0, 1700003600, 0]
+
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    backend.load()
+    assert backend.recovered == 0
+
+
+def test_replay_is_idempotent_and_skips_torn_line(workbook):
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("cherry", "체리"), [2], 7, True, 1, 0, 1700000000, 1700086400)
+    # 저장 직전에 봉인만 되고 엑셀 저장은 끝나지 못했다
+    backend.journal.rotate()
+    backend.record_answer(("cherry", "체리"), [2], 8, False, 2, 1, 1700000500, 1700001100)
+    crash(backend)
+    with open(backend.journal.path, "a", encoding="utf-8") as fh:
+        fh.write('{"w":"cherry","m":"체리","r":2,"s":9,"c":1,"tr":')  # 쓰다 끊긴 줄
+
+    for _ in range(2):
+        backend = store.ExcelBackend(workbook, "Sheet1")
+        df = backend.load()
+        assert backend.recovered == 2
+        assert state(df, 2)[:3] == [2, 1, 8]
+        backend.close()
+
+
+def test_replay_follows_key_when_rows_move(workbook):
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("cherry", "체리"), [2], 7, True, 1, 0, 1700000000, 1700086400)
+    crash(backend)
+
+    # 강제 종료 뒤 엑셀에서 맨 앞에 행을 하나 넣었다
+    df = pd.read_excel(workbook)
+    new_row = pd.DataFrame({"단어": ["date"], "뜻": ["대추"], "Day": ["Day 1"]})
+    pd.concat([new_row, df], ignore_index=True).to_excel(workbook, index=False)
+
+    backend = store.ExcelBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert backend.recovered == 1
+    assert df.loc[3, "단어"] == "cherry" and df.loc[3, "Tries"] == 1
+    assert df.loc[2, "Tries"] == 3  # banana는 그대로
@@ -0,0 +1,146 @@
+"""MmapBackend: 엑셀을 편집해 상태 파일을 다시 만들어도 내보내지 않은 답안을 잃지 않는지."""
+
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+store = importlib.import_module("영단어_store")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    df = pd.DataFrame(
+        {
+            "영어": ["apple", "banana", "cherry", None],
+            "의미": ["사과", "바나나", "체리", "빈칸"],
+            "Day": ["Day 1", "Day 1", "Day 2", "Day 2"],
+            "Tries": [2, 0, 0, 0],
+            "Fails": [1, 0, 0, 0],
+            "LastStep": [1, 0, 0, 0],
+            "InitLevel": [3, None, None, None],
+        }
+    )
+    path = tmp_path / "단어장.xlsx"
+    df.to_excel(path, index=False)
+    return path
+
+
+def edit_workbook(path, rows_before):
+    """엑셀에서 맨 앞에 행을 넣고 첫 카드의 Tries를 손으로 고친 것처럼."""
+    df = pd.read_excel(path)
+    df.loc[0, "Tries"] = 9
+    new = pd.DataFrame({"영어": ["date"] * rows_before, "의미": ["대추"] * rows_before, "Day": ["Day 1"] * rows_before})
+    pd.concat([new, df], ignore_index=True).to_excel(path, index=False)
+
+
+def state_records(backend):
+    header, record = store._state_dtypes()
+    return np.fromfile(backend.state_path, np.uint8)[store.STATE_HEADER_SIZE :].view(record)
+
+
+def test_reimport_keeps_unexported_answers(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, False, 1, 1, 1700000000, 1700003600)
+    backend.record_levels([(("cherry", "체리"), [2], 2), (None, [3], 4)])
+    backend.close()  # 종료 때 내보내기 없이 꺼졌다
+
+    edit_workbook(workbook, 1)
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load().set_index("영어", drop=False)
+    assert df.loc["banana", ["Tries", "Fails", "LastStep", "LastSeen", "Due"]].tolist() == [
+        1, 1, 5, 1700000000, 1700003600
+    ]
+    assert df.loc["cherry", "InitLevel"] == 2
+    assert df.loc["apple", "Tries"] == 9  # 내보낸 뒤 기록이 없는 카드는 엑셀에서 고친 값
+    # 행이 밀렸으므로 키 없는 카드(원래 3행)는 옮기지 않는다
+    assert pd.isna(df["InitLevel"].iloc[4])
+    backend.close()
+
+    # 옮긴 레코드는 아직 내보내지 않았으므로 다음 편집에서도 남는다
+    assert state_records(backend)["dirty"].tolist() == [0, 0, 1, 1, 0]
+    edit_workbook(workbook, 1)
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load().set_index("영어", drop=False)
+    assert df.loc["banana", "Tries"] == 1
+    backend.close()
+
+
+def test_reimport_keeps_unkeyed_card_by_row(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_levels([(None, [3], 4)])
+    backend.close()
+
+    df = pd.read_excel(workbook)
+    df.loc[0, "Tries"] = 9
+    df.to_excel(workbook, index=False)
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert df["InitLevel"].iloc[3] == 4  # 키가 없는 카드는 같은 행 번호로
+    assert df["Tries"].iloc[0] == 9
+    backend.close()
+
+
+def test_duplicate_cards_all_get_the_answer(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 1, 0, 1700000000, 1700090000)
+    backend.close()
+
+    df = pd.read_excel(workbook)
+    pd.concat([df, df.iloc[[1]]], ignore_index=True).to_excel(workbook, index=False)
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert df.loc[df["영어"] == "banana", "Tries"].tolist() == [1, 1]
+    backend.close()
+
+
+def test_export_clears_dirty_records(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 1, 0, 1700000000, 1700090000)
+    df.loc[1, ["Tries", "LastStep", "LastSeen", "Due"]] = [1, 5, 1700000000, 1700090000]
+    backend.checkpoint(df, final=True)
+    backend.close()
+    assert not state_records(backend)["dirty"].any()
+
+    # 내보낸 뒤 엑셀에서 고친 값은 그대로 가져온다
+    df = pd.read_excel(workbook)
+    df.loc[1, "Tries"] = 7
+    df.to_excel(workbook, index=False)
+    backend = store.MmapBackend(workbook, "Sheet1")
+    assert backend.load().loc[1, "Tries"] == 7
+    backend.close()
+
+
+def test_reopen_maps_existing_file(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 1, 0, 1700000000, 1700090000)
+    backend.close()
+    before = backend.state_path.stat().st_mtime_ns
+
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert df.loc[1, "Tries"] == 1
+    assert backend.state_path.stat().st_mtime_ns == before  # 엑셀이 그대로면 다시 만들지 않는다
+    backend.close()
+
+
+def test_old_format_is_rebuilt(workbook):
+    backend = store.MmapBackend(workbook, "Sheet1")
+    backend.load()
+    backend.close()
+    data = bytearray(backend.state_path.read_bytes())
+    header, _ = store._state_dtypes()
+    offset = header.fields["version"][1]
+    data[offset : offset + 4] = (1).to_bytes(4, "little")
+    backend.state_path.write_bytes(bytes(data))
+
+    backend = store.MmapBackend(workbook, "Sheet1")
+    df = backend.load()
+    assert df["Tries"].tolist() == [2, 0, 0, 0]
+    backend.close()
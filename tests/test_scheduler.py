@@ -0,0 +1,218 @@
+"""출제 스케줄러를 전체 정렬(기존 방식)과, sample 스케줄러는 가중치를 직접 더해 뽑은 결과와 비교한다."""
+
+import importlib
+import random
+
+import pytest
+
+core = importlib.import_module("영단어")
+
+
+def brute_best(diff, last, step):
+    """risk 내림차순 → recency 내림차순 → 위치 순서로 정렬했을 때 1위."""
+    if not diff:
+        return None
+
+    def order(i):
+        recn = core.recency_norm(step, last[i])
+        return (-(diff[i] * recn), -recn, i)
+
+    return min(range(len(diff)), key=order)
+
+
+def random_deck(rng, n):
+    # 같은 diff·LastStep이 자주 겹치도록 작은 집합에서 고른다
+    diffs = [rng.choice([0.0, 0.1, 0.25, 0.5, 0.5, 0.75, 0.9, 1.0]) for _ in range(n)]
+    lasts = [rng.randint(0, 15) for _ in range(n)]
+    return diffs, lasts
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_risk_scheduler_matches_sort(seed):
+    rng = random.Random(seed)
+    diffs, lasts = random_deck(rng, rng.randint(1, 40))
+    step = rng.randint(0, 10)
+    sched = core.RiskScheduler(diffs, lasts, step)
+    for _ in range(60):
+        assert sched.best(step) == brute_best(diffs, lasts, step)
+        i = rng.randrange(len(diffs))
+        if rng.random() < 0.05:
+            step = max(step - rng.randint(1, 5), 0)  # 되돌아가는 step
+        else:
+            step += rng.randint(0, 3)
+        diffs[i] = rng.choice([0.0, 0.2, 0.5, 0.8, rng.random()])
+        lasts[i] = step
+        sched.update(i, diffs[i], lasts[i], step)
+    assert sched.best(step) == brute_best(diffs, lasts, step)
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_risk_scheduler_peek_does_not_change_tree(seed):
+    rng = random.Random(seed)
+    diffs, lasts = random_deck(rng, rng.randint(1, 30))
+    step = rng.randint(1, 10)
+    sched = core.RiskScheduler(diffs, lasts, step)
+    for _ in range(20):
+        changes = {}
+        for i in rng.sample(range(len(diffs)), min(2, len(diffs))):
+            changes[i] = (rng.random(), step)
+        ahead = step + rng.randint(0, 2)
+        new_diffs, new_lasts = list(diffs), list(lasts)
+        for i, (d, l) in changes.items():
+            new_diffs[i], new_lasts[i] = d, l
+        pos, risk = sched.peek(ahead, changes)
+        assert pos == brute_best(new_diffs, new_lasts, ahead)
+        assert risk == new_diffs[pos] * core.recency_norm(ahead, new_lasts[pos])
+        # peek 뒤에도 트리는 그대로
+        assert sched.best(step) == brute_best(diffs, lasts, step)
+        i = rng.randrange(len(diffs))
+        step += 1
+        diffs[i], lasts[i] = rng.random(), step
+        sched.update(i, diffs[i], lasts[i], step)
+
+
+def test_empty_scheduler():
+    sched = core.RiskScheduler([], [], 0)
+    assert sched.best(3) is None
+    assert sched.peek(3) == (None, 0.0)
+
+
+# ===== RiskSampler =====
+def sample_weights(diff, last, step, temperature):
+    """카드마다 정수 가중치 q×(floor−last). recency가 0인 카드(last ≥ floor)는 0."""
+    floor = max(step, 1)
+    weights = []
+    for d, l in zip(diff, last):
+        l = max(l, 0)
+        if not d > 0 or l >= floor:
+            weights.append(0)
+        else:
+            q = max(1, round(d ** (1 / temperature) * core.RiskSampler.SCALE))
+            weights.append(q * (floor - l))
+    return weights
+
+
+def brute_draw(diff, last, step, temperature, u):
+    """u로 가중치 누적합을 처음부터 훑어 고른 위치. 합이 0이면 None."""
+    weights = sample_weights(diff, last, step, temperature)
+    total = sum(weights)
+    if total <= 0:
+        return None
+    target = min(int(u * total), total - 1)
+    for i, w in enumerate(weights):
+        if target < w:
+            return i
+        target -= w
+
+
+def sampler_state(sampler):
+    return (
+        sampler.t, list(sampler.diff), list(sampler.last), list(sampler._q), list(sampler._on),
+        list(sampler._a), list(sampler._b), sorted(sampler._pending),
+    )
+
+
+@pytest.mark.parametrize("temperature", [1.0, 0.5, 2.0])
+@pytest.mark.parametrize("seed", range(60))
+def test_risk_sampler_matches_prefix_sum(seed, temperature):
+    rng = random.Random(seed)
+    diffs, lasts = random_deck(rng, rng.randint(1, 40))
+    step = rng.randint(0, 10)
+    sampler = core.RiskSampler(diffs, lasts, step, temperature, seed)
+    # sampler와 같은 순서로 난수를 꺼낸다(뽑을 카드가 없으면 난수를 쓰지 않는다)
+    draws = random.Random(seed)
+
+    def expected(at):
+        if not sum(sample_weights(diffs, lasts, at, temperature)):
+            return None
+        return brute_draw(diffs, lasts, at, temperature, draws.random())
+
+    for _ in range(60):
+        assert sampler.best(step) == expected(step)
+        i = rng.randrange(len(diffs))
+        if rng.random() < 0.05:
+            step = max(step - rng.randint(1, 5), 0)  # 되돌아가는 step
+        else:
+            step += rng.randint(0, 3)
+        diffs[i] = rng.choice([0.0, 0.2, 0.5, 0.8, rng.random()])
+        lasts[i] = step
+        sampler.update(i, diffs[i], lasts[i], step)
+    assert sampler.best(step) == expected(step)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_risk_sampler_peek_restores_state(seed):
+    rng = random.Random(seed)
+    diffs, lasts = random_deck(rng, rng.randint(1, 30))
+    step = rng.randint(1, 10)
+    sampler = core.RiskSampler(diffs, lasts, step, 1.0, seed)
+    draws = random.Random(seed)
+    for _ in range(20):
+        changes = {}
+        for i in rng.sample(range(len(diffs)), min(2, len(diffs))):
+            changes[i] = (rng.random(), step)
+        ahead = step + rng.randint(0, 2)
+        new_diffs, new_lasts = list(diffs), list(lasts)
+        for i, (d, l) in changes.items():
+            new_diffs[i], new_lasts[i] = d, l
+
+        before = sampler_state(sampler)
+        pos, risk = sampler.peek(ahead, changes)
+        assert sampler_state(sampler) == before
+        # peek이 만든 난수는 남아 있다가 바뀐 상태로 best를 부르면 같은 카드가 나온다
+        if sum(sample_weights(new_diffs, new_lasts, ahead, 1.0)):
+            u = draws.random()
+            assert pos == brute_draw(new_diffs, new_lasts, ahead, 1.0, u)
+            assert risk == new_diffs[pos] * core.recency_norm(ahead, new_lasts[pos])
+        else:
+            assert (pos, risk) == (None, 0.0)
+        for i, (d, l) in changes.items():
+            sampler.update(i, d, l, ahead)
+        assert sampler.best(ahead) == pos
+        diffs, lasts, step = new_diffs, new_lasts, ahead + 1
+
+
+def test_risk_sampler_same_seed_same_order():
+    rng = random.Random(7)
+    diffs, lasts = random_deck(rng, 50)
+    updates = [(rng.randrange(50), rng.random()) for _ in range(40)]
+
+    def run(order):
+        sampler = core.RiskSampler(diffs, lasts, 5, 0.7, 123)
+        picks = []
+        for step, batch in enumerate(updates[k : k + 4] for k in range(0, len(updates), 4)):
+            # 같은 step 안의 갱신 순서는 결과에 영향을 주지 않는다
+            for i, d in order(batch):
+                sampler.update(i, d, 5 + step, 5 + step)
+            picks.append(sampler.best(6 + step))
+        return picks
+
+    first = run(list)
+    assert first == run(lambda batch: list(reversed(batch)))
+    assert any(p is not None for p in first)
+
+
+def test_risk_sampler_frequencies():
+    # 고정한 상태에서 여러 번 뽑으면 risk^(1/온도)에 비례해 나온다(카이제곱, 자유도 7의 0.1% 기준 24.32)
+    diffs = [0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9, 1.0, 0.0]
+    lasts = [0, 3, 1, 5, 2, 7, 0, 4, 0]
+    step, temperature, draws = 10, 0.8, 40000
+    sampler = core.RiskSampler(diffs, lasts, step, temperature, 2024)
+    counts = [0] * len(diffs)
+    for _ in range(draws):
+        counts[sampler.best(step)] += 1
+    weights = [d ** (1 / temperature) * core.recency_norm(step, l) for d, l in zip(diffs, lasts)]
+    total = sum(weights)
+    assert counts[-1] == 0
+    chi2 = sum((c - draws * w / total) ** 2 / (draws * w / total) for c, w in zip(counts, weights) if w)
+    assert chi2 < 24.32
+
+
+def test_empty_sampler():
+    sampler = core.RiskSampler([], [], 0)
+    assert sampler.best(3) is None
+    assert sampler.peek(3) == (None, 0.0)
+    sampler = core.RiskSampler([0.0, 0.5], [0, 9], 3, seed=1)
+    assert sampler.best(3) is None  # diff 0이거나 방금 본 카드뿐
+    with pytest.raises(ValueError):
+        core.RiskSampler([0.5], [0], 0, temperature=0)
@@ -0,0 +1,104 @@
+"""SqliteBackend: 엑셀을 편집해 다시 가져와도 내보내지 않은 답안을 잃지 않는지."""
+
+import importlib
+import sqlite3
+
+import pandas as pd
+import pytest
+
+store = importlib.import_module("영단어_store")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    df = pd.DataFrame(
+        {
+            "영어": ["apple", "banana", "cherry", None],
+            "의미": ["사과", "바나나", "체리", "빈칸"],
+            "Day": ["Day 1", "Day 1", "Day 2", "Day 2"],
+            "Tries": [2, 0, 0, 0],
+            "Fails": [1, 0, 0, 0],
+            "LastStep": [1, 0, 0, 0],
+            "InitLevel": [3, None, None, None],
+        }
+    )
+    path = tmp_path / "단어장.xlsx"
+    df.to_excel(path, index=False)
+    return path
+
+
+def edit_workbook(path, rows_before):
+    """엑셀에서 맨 앞에 행을 넣고 첫 카드의 Tries를 손으로 고친 것처럼."""
+    df = pd.read_excel(path)
+    df.loc[0, "Tries"] = 9
+    new = pd.DataFrame({"영어": ["date"] * rows_before, "의미": ["대추"] * rows_before, "Day": ["Day 1"] * rows_before})
+    pd.concat([new, df], ignore_index=True).to_excel(path, index=False)
+
+
+def test_reimport_keeps_unexported_answers(workbook):
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, False, 1, 1, 1700000000, 1700003600)
+    backend.record_levels([(("cherry", "체리"), [2], 2), (None, [3], 4)])
+    backend.close()  # 종료 때 내보내기 없이 꺼졌다
+
+    edit_workbook(workbook, 1)
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    df = backend.load().set_index("영어", drop=False)
+    assert df.loc["banana", ["Tries", "Fails", "LastStep", "LastSeen", "Due"]].tolist() == [
+        1, 1, 5, 1700000000, 1700003600
+    ]
+    assert df.loc["cherry", "InitLevel"] == 2
+    assert df.loc["apple", "Tries"] == 9  # 내보낸 뒤 기록이 없는 카드는 엑셀에서 고친 값
+    backend.close()
+
+
+def test_reimport_keeps_unkeyed_card_by_row(workbook):
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_levels([(None, [3], 4)])
+    backend.close()
+
+    df = pd.read_excel(workbook)
+    df.loc[0, "Tries"] = 9
+    df.to_excel(workbook, index=False)
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    assert backend.load()["InitLevel"].iloc[3] == 4  # 키가 없는 카드는 같은 행 번호로
+    backend.close()
+
+
+def test_export_clears_dirty_rows(workbook):
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    df = backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 1, 0, 1700000000, 1700090000)
+    df.loc[1, ["Tries", "LastStep", "LastSeen", "Due"]] = [1, 5, 1700000000, 1700090000]
+    backend.checkpoint(df, final=True)
+    backend.close()
+    conn = sqlite3.connect(backend.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM state WHERE dirty").fetchone()[0] == 0
+    conn.close()
+
+    # 내보낸 뒤 엑셀에서 고친 값은 그대로 가져온다
+    df = pd.read_excel(workbook)
+    df.loc[1, "Tries"] = 7
+    df.to_excel(workbook, index=False)
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    assert backend.load().loc[1, "Tries"] == 7
+    backend.close()
+
+
+def test_old_database_without_dirty_column(workbook):
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    backend.load()
+    backend.record_answer(("banana", "바나나"), [1], 5, True, 1, 0, 1700000000, 1700090000)
+    backend.close()
+    conn = sqlite3.connect(backend.db_path)
+    conn.execute("ALTER TABLE state DROP COLUMN dirty")
+    conn.commit()
+    conn.close()
+
+    edit_workbook(workbook, 2)
+    backend = store.SqliteBackend(workbook, "Sheet1")
+    df = backend.load().set_index("영어", drop=False)
+    assert df.loc["banana", "Tries"] == 1
+    backend.close()
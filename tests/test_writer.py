@@ -0,0 +1,78 @@
+"""WorkbookWriter: 여러 엑셀을 저장할 때 한 곳의 실패가 다른 곳의 성공에 묻히지 않는지."""
+
+import importlib
+
+import pandas as pd
+import pytest
+
+store = importlib.import_module("영단어_store")
+ui = importlib.import_module("영단어_ui")
+
+
+def failing_write(snapshot, path, sheet_name):
+    raise OSError(f"{path}: 디스크가 가득 찼습니다")
+
+
+def written(paths):
+    def write(snapshot, path, sheet_name):
+        paths.append(path)
+
+    return write
+
+
+def test_error_survives_later_save_of_another_target(tmp_path):
+    paths = []
+    writer = store.WorkbookWriter(tmp_path / "a.xlsx", "Sheet1")
+    writer.submit(pd.DataFrame(), write=failing_write)
+    writer.flush(5)
+    writer.submit(pd.DataFrame(), path=tmp_path / "b.xlsx", write=written(paths))
+    assert writer.close(5)
+    assert paths == [str(tmp_path / "b.xlsx")]
+    assert list(writer.errors) == [(str(tmp_path / "a.xlsx"), "Sheet1")]
+    with pytest.raises(OSError, match="a.xlsx"):
+        writer.raise_errors()
+
+
+def test_later_save_of_same_target_clears_error(tmp_path):
+    writer = store.WorkbookWriter(tmp_path / "a.xlsx", "Sheet1")
+    writer.submit(pd.DataFrame(), write=failing_write)
+    writer.flush(5)
+    writer.submit(pd.DataFrame(), write=written([]))
+    assert writer.close(5)
+    assert writer.errors == {}
+    writer.raise_errors()
+
+
+def test_several_failures_are_reported_together(tmp_path):
+    writer = store.WorkbookWriter(tmp_path / "a.xlsx", "Sheet1")
+    writer.submit(pd.DataFrame(), write=failing_write)
+    writer.submit(pd.DataFrame(), path=tmp_path / "b.xlsx", write=failing_write)
+    assert writer.close(5)
+    with pytest.raises(RuntimeError) as info:
+        writer.raise_errors()
+    assert "a.xlsx" in str(info.value) and "b.xlsx" in str(info.value)
+
+
+class TwoDeckBackend(store.StateBackend):
+    """종료 저장 때 DeckSet처럼 덱마다 한 번씩 저장을 넘기는 백엔드. 첫 덱 저장은 실패한다."""
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.saved = []
+
+    def checkpoint(self, df, writer=None, final=False):
+        writer.submit(df, path=self.tmp_path / "a.xlsx", write=failing_write)
+        return writer.submit(df, path=self.tmp_path / "b.xlsx", write=written(self.saved))
+
+    def close(self):
+        pass
+
+
+def test_finalize_raises_when_first_deck_fails(tmp_path):
+    df = pd.DataFrame({"영어": ["apple", "banana"], "의미": ["사과", "바나나"]})
+    backend = TwoDeckBackend(tmp_path)
+    session = ui.StudySession(df, "count", "", "1-2", backend=backend)
+    writer = store.WorkbookWriter(tmp_path / "a.xlsx", "Sheet1")
+    with pytest.raises(OSError, match="a.xlsx"):
+        session.finalize(writer)
+    assert backend.saved == [str(tmp_path / "b.xlsx")]
@@ -0,0 +1,324 @@
+"""영단어_xlsx: 직접 읽기가 read_excel과 같은지, 병합 쓰기가 다른 열·서식을 그대로 두는지.
+
+openpyxl이 쓴 파일과 엑셀이 쓰는 모양(공유 문자열·서식 있는 텍스트·윗주·inlineStr·t="str"·spans·
+닫힌 <row/>)을 손으로 만든 파일 두 가지로 돌린다.
+"""
+
+import importlib
+import zipfile
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+core = importlib.import_module("영단어")
+xlsx = importlib.import_module("영단어_xlsx")
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+
+STRINGS = [
+    "<t>단어</t>",
+    "<t>뜻</t>",
+    "<t>Day</t>",
+    "<t>Tries</t>",
+    "<t>메모</t>",
+    "<r><rPr><b/><sz val=\"11\"/><vertAlign val=\"baseline\"/></rPr><t>ap</t></r><r><t>ple</t></r>",
+    '<t>사과</t><rPh sb="0" eb="2"><t>さか</t></rPh><phoneticPr fontId="1"/>',
+    "<t>Day 1</t>",
+    "<t>비고</t>",
+]
+
+EXCEL_ROWS = (
+    '<row r="1" spans="1:5" x14ac:dyDescent="0.3">'
+    '<c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="C1" t="s"><v>2</v></c>'
+    '<c r="D1" t="s"><v>3</v></c><c r="E1" t="s"><v>4</v></c></row>'
+    '<row r="2" spans="1:5" x14ac:dyDescent="0.3">'
+    '<c r="A2" t="s"><v>5</v></c><c r="B2" t="s"><v>6</v></c><c r="C2" t="s"><v>7</v></c>'
+    '<c r="D2" s="1"><v>3</v></c>'
+    '<c r="E2" t="inlineStr"><is><r><rPr><b/></rPr><t>메</t></r><r><t xml:space="preserve">모 </t></r></is></c></row>'
+    '<row r="3" spans="1:5" x14ac:dyDescent="0.3">'
+    '<c r="A3" t="str"><f>"ba"&amp;"nana"</f><v>banana</v></c>'
+    '<c r="B3" t="inlineStr"><is><t>바나나</t></is></c><c r="C3" t="s"><v>7</v></c><c r="D3"><v>1</v></c></row>'
+    '<row r="4" spans="1:5" x14ac:dyDescent="0.3"/>'
+    '<row r="5" spans="1:5" ht="20" customHeight="1" x14ac:dyDescent="0.3">'
+    '<c r="A5" t="s"><v>5</v></c><c r="B5" t="s"><v>6</v></c>'
+    '<c r="C5" t="inlineStr"><is><t>Day 2</t></is></c><c r="D5" s="1"/><c r="E5" t="s"><v>8</v></c></row>'
+)
+
+
+def excel_book(path, rows=EXCEL_ROWS, dimension="A1:E5"):
+    """엑셀이 저장한 것과 같은 모양의 통합 문서를 직접 만든다."""
+    sheet = (
+        f'<worksheet xmlns="{MAIN}" xmlns:r="{REL}" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" mc:Ignorable="x14ac" '
+        'xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac">'
+        + (f'<dimension ref="{dimension}"/>' if dimension else "")
+        + '<sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+        '<sheetFormatPr defaultRowHeight="16.5" x14ac:dyDescent="0.3"/>'
+        '<cols><col min="1" max="1" width="24.5" customWidth="1"/></cols>'
+        f"<sheetData>{rows}</sheetData>"
+        '<pageMargins left="0.7" right="0.7" top="0.75" bottom="0.75" header="0.3" footer="0.3"/>'
+        "</worksheet>"
+    )
+    strings = "".join(f"<si>{s}</si>" for s in STRINGS)
+    parts = {
+        "[Content_Types].xml": (
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{CT}.sheet.main+xml"/>'
+            f'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="{CT}.worksheet+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{CT}.styles+xml"/>'
+            f'<Override PartName="/xl/sharedStrings.xml" ContentType="{CT}.sharedStrings+xml"/></Types>'
+        ),
+        "_rels/.rels": (
+            f'<Relationships xmlns="{PKG}"><Relationship Id="rId1" Target="xl/workbook.xml" '
+            f'Type="{REL}/officeDocument"/></Relationships>'
+        ),
+        "xl/workbook.xml": (
+            f'<workbook xmlns="{MAIN}" xmlns:r="{REL}"><workbookPr/>'
+            '<sheets><sheet name="단어" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f'<Relationships xmlns="{PKG}">'
+            f'<Relationship Id="rId1" Type="{REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{REL}/styles" Target="styles.xml"/>'
+            f'<Relationship Id="rId3" Type="{REL}/sharedStrings" Target="sharedStrings.xml"/></Relationships>'
+        ),
+        "xl/styles.xml": (
+            f'<styleSheet xmlns="{MAIN}"><fonts count="1"><font><sz val="11"/><name val="맑은 고딕"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="1" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="표준" xfId="0" builtinId="0"/></cellStyles>'
+            "</styleSheet>"
+        ),
+        "xl/sharedStrings.xml": f'<sst xmlns="{MAIN}" count="{len(STRINGS)}" uniqueCount="{len(STRINGS)}">{strings}</sst>',
+        "xl/worksheets/sheet1.xml": sheet,
+    }
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, text in parts.items():
+            zf.writestr(name, '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + text)
+    return path
+
+
+@pytest.fixture
+def openpyxl_path(tmp_path):
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "단어"
+    sheet.append(["단어", "뜻", "메모", "Day", "Tries", "Fails"])
+    sheet.append(["apple", "사과", "=LEN(A2)", "Day 1", 2, 1])
+    sheet.append(["banana", "바나나", "노란색", "Day 1", 0, 0])
+    sheet.append([])
+    sheet.append(["apple", "사과", None, "Day 2", 5, 0])
+    sheet["A1"].font = Font(bold=True)
+    sheet["E2"].fill = PatternFill("solid", fgColor="FFFF00")
+    sheet.column_dimensions["A"].width = 31
+    book.create_sheet("기타")["A1"] = "그대로"
+    path = tmp_path / "openpyxl.xlsx"
+    book.save(path)
+    return path
+
+
+@pytest.fixture
+def excel_path(tmp_path):
+    return excel_book(tmp_path / "excel.xlsx")
+
+
+@pytest.fixture
+def slow_path(monkeypatch):
+    calls = []
+    merge = xlsx._merge_with_openpyxl
+
+    def spy(*args):
+        calls.append(args)
+        merge(*args)
+
+    monkeypatch.setattr(xlsx, "_merge_with_openpyxl", spy)
+    return calls
+
+
+def unsupported(monkeypatch):
+    def fail(*args):
+        raise xlsx.UnsupportedLayout("테스트")
+
+    monkeypatch.setattr(xlsx, "_patch_workbook", fail)
+
+
+def read_both(path):
+    df, _ = xlsx.read_streaming(path, "단어")
+    expected = pd.read_excel(path, sheet_name="단어")[list(df.columns)]
+    return df, expected
+
+
+@pytest.mark.parametrize("name", ["openpyxl_path", "excel_path"])
+def test_read_matches_read_excel(request, name):
+    df, expected = read_both(request.getfixturevalue(name))
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def test_excel_strings(excel_path):
+    df, _ = xlsx.read_streaming(excel_path, "단어")
+    # 서식 있는 텍스트는 이어 붙이고 윗주는 뺀다
+    assert df["단어"].fillna("").tolist() == ["apple", "banana", "", "apple"]
+    assert df["뜻"].fillna("").tolist() == ["사과", "바나나", "", "사과"]
+    assert df["Day"].fillna("").tolist() == ["Day 1", "Day 1", "", "Day 2"]
+
+
+def update(df):
+    df = core.normalize_state_cols(df.copy())
+    df["Tries"] = [7, 8, 0, 9]
+    df["LastSeen"] = [100, 200, 0, 300]
+    return df
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_merge_keeps_styles_and_other_columns(openpyxl_path, tmp_path, monkeypatch, slow_path, fast):
+    df, _ = xlsx.read_streaming(openpyxl_path, "단어")
+    df = update(df)
+    if not fast:
+        unsupported(monkeypatch)
+    out = tmp_path / "out.xlsx"
+    xlsx.merge_into_workbook(df, openpyxl_path, out, "단어")
+    assert bool(slow_path) is not fast
+
+    book = load_workbook(out)
+    sheet = book["단어"]
+    assert [c.value for c in sheet[1]][:9] == [
+        "단어", "뜻", "메모", "Day", "Tries", "Fails", "LastStep", "InitLevel", "LastSeen",
+    ]
+    assert sheet["C2"].value == "=LEN(A2)"
+    assert sheet["C3"].value == "노란색"
+    assert [sheet.cell(r, 5).value for r in range(2, 6)] == [7, 8, 0, 9]
+    assert [sheet.cell(r, 9).value for r in range(2, 6)] == [100, 200, 0, 300]
+    assert sheet["A1"].font.bold
+    assert sheet["E2"].fill.fgColor.rgb == "00FFFF00"
+    assert sheet.column_dimensions["A"].width == 31
+    assert book["기타"]["A1"].value == "그대로"
+
+    again, _ = read_both(out)
+    assert again["Tries"].tolist() == [7, 8, 0, 9]
+
+
+def test_merge_excel_layout_in_place(excel_path, tmp_path, slow_path):
+    df, _ = xlsx.read_streaming(excel_path, "단어")
+    df = update(df)
+    out = tmp_path / "out.xlsx"
+    xlsx.merge_into_workbook(df, excel_path, out, "단어")
+    assert not slow_path
+
+    again, expected = read_both(out)
+    pd.testing.assert_frame_equal(again, expected, check_dtype=False)
+    assert again["Tries"].tolist() == [7, 8, 0, 9]
+    assert again["LastSeen"].tolist() == [100, 200, 0, 300]
+    assert again["단어"].tolist()[:2] == ["apple", "banana"]
+
+    sheet = load_workbook(out)["단어"]
+    assert sheet["A3"].value == '="ba"&"nana"'
+    assert sheet["D2"].number_format == "0"  # 바꾼 셀도 서식은 그대로
+    assert sheet["E2"].value == "메모 "
+    assert sheet.row_dimensions[5].height == 20
+    assert sheet.column_dimensions["A"].width == 24.5
+
+
+def test_merge_syncs_rows_outside_range(excel_path, tmp_path, slow_path):
+    df, _ = xlsx.read_streaming(excel_path, "단어")
+    df = core.normalize_state_cols(df.iloc[[0]].copy())
+    df["Tries"] = [4]
+    out = tmp_path / "out.xlsx"
+    # 범위 밖의 같은 카드(5행, 공유 문자열의 서식 있는 텍스트와 윗주)도 함께 바뀐다
+    xlsx.merge_into_workbook(df, excel_path, out, "단어", sync={("apple", "사과"): {"Tries": 4}})
+    assert not slow_path
+    assert pd.read_excel(out)["Tries"].fillna(-1).tolist() == [4, 1, -1, 4]
+
+
+@pytest.mark.parametrize(
+    "old, new, dimension",
+    [
+        # 행 번호가 없는 줄
+        ('<row r="3" spans="1:5" x14ac:dyDescent="0.3">', '<row spans="1:5">', "A1:E5"),
+        # 셀 주소가 없는 셀
+        ('<c r="D3"><v>1</v></c>', "<c><v>1</v></c>", "A1:E5"),
+        # 머리글보다 긴 줄(덧붙일 열과 겹친다)
+        ('<c r="E5" t="s"><v>8</v></c>', '<c r="E5" t="s"><v>8</v></c><c r="F5"><v>1</v></c>', "A1:F5"),
+        # dimension이 없어 머리글보다 긴 줄이 있는지 모른다
+        ("", "", None),
+        # 상태 열 셀에 값 메타데이터
+        ('<c r="D2" s="1">', '<c r="D2" s="1" vm="1">', "A1:E5"),
+        # 셀이 아닌 요소가 있는 줄
+        ("</c></row><row r=\"3\"", "</c><extLst/></row><row r=\"3\"", "A1:E5"),
+    ],
+)
+def test_unmodeled_layout_falls_back(tmp_path, slow_path, old, new, dimension):
+    assert old in EXCEL_ROWS
+    path = excel_book(tmp_path / "excel.xlsx", EXCEL_ROWS.replace(old, new, 1), dimension)
+    df, _ = xlsx.read_streaming(path, "단어")
+    df = update(df)
+    out = tmp_path / "out.xlsx"
+    xlsx.merge_into_workbook(df, path, out, "단어")
+    assert slow_path
+
+    again, _ = read_both(out)
+    assert again["Tries"].tolist() == [7, 8, 0, 9]
+    assert again["LastSeen"].tolist() == [100, 200, 0, 300]
+    # openpyxl은 수식의 계산값을 저장하지 않으므로 A3(t="str")은 비어 읽힌다
+    assert again["뜻"].fillna("").tolist() == ["사과", "바나나", "", "사과"]
+
+
+def test_inline_phonetic_key_falls_back(tmp_path, slow_path):
+    rows = EXCEL_ROWS.replace(
+        '<c r="B5" t="s"><v>6</v></c>',
+        '<c r="B5" t="inlineStr"><is><t>사과</t><rPh sb="0" eb="2"><t>さか</t></rPh></is></c>',
+    )
+    path = excel_book(tmp_path / "excel.xlsx", rows)
+    df, _ = xlsx.read_streaming(path, "단어")
+    assert df["뜻"].tolist()[3] == "사과"
+    df = core.normalize_state_cols(df.iloc[[0]].copy())
+    out = tmp_path / "out.xlsx"
+    xlsx.merge_into_workbook(df, path, out, "단어", sync={("apple", "사과"): {"Tries": 6}})
+    assert slow_path
+    assert pd.read_excel(out)["Tries"].tolist()[3] == 6
+
+
+def edit(path, change):
+    book = load_workbook(path)
+    change(book["단어"])
+    book.save(path)
+
+
+def test_checks_keys_after_outside_edit(openpyxl_path, tmp_path, slow_path):
+    df, _ = xlsx.read_streaming(openpyxl_path, "단어")
+    edit(openpyxl_path, lambda sheet: sheet.cell(3, 3, "편집함"))
+    out = tmp_path / "out.xlsx"
+    # 파일이 바뀌었어도 단어/뜻이 그대로면 XML만 고쳐 쓰고 편집한 칸도 남는다
+    xlsx.merge_into_workbook(update(df), openpyxl_path, out, "단어")
+    assert not slow_path
+    sheet = load_workbook(out)["단어"]
+    assert sheet["C3"].value == "편집함"
+    assert [sheet.cell(r, 5).value for r in range(2, 6)] == [7, 8, 0, 9]
+
+
+@pytest.mark.parametrize("fast", [True, False])
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda sheet: sheet.insert_rows(2),
+        lambda sheet: sheet.cell(3, 1, "cherry"),
+        lambda sheet: sheet.delete_rows(4, 2),
+    ],
+    ids=["inserted", "renamed", "shortened"],
+)
+def test_refuses_moved_rows(openpyxl_path, tmp_path, monkeypatch, fast, change):
+    df, _ = xlsx.read_streaming(openpyxl_path, "단어")
+    edit(openpyxl_path, change)
+    if not fast:
+        unsupported(monkeypatch)
+    with pytest.raises(RuntimeError, match="단어/뜻|행 수"):
+        xlsx.merge_into_workbook(update(df), openpyxl_path, tmp_path / "out.xlsx", "단어")
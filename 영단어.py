@@ -1,11 +1,47 @@
-import pandas as pd
+from __future__ import annotations
+
+import bisect
+import contextlib
+from collections import deque
+import functools
+import heapq
+import importlib
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import random
 import re
 from pathlib import Path
+import shutil
 import sys
+import tempfile
+import time
+
+
+def lazy_import(name: str):
+    """처음 속성에 접근할 때 실제로 불러오는 모듈을 돌려준다(창을 먼저 띄우기 위해)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 # ===== 설정 =====
 
-def resolve_excel_path() -> Path:
+def resolve_excel_paths() -> list[Path]:
+    """단어장 폴더의 엑셀 파일 전체(이름순). 폴더가 없으면 단어장.xlsx 하나."""
     if getattr(sys, 'frozen', False):
         candidates = [
             Path(getattr(sys, '_MEIPASS')),      # 임시 추출 위치
@@ -18,20 +54,25 @@ def resolve_excel_path() -> Path:
     for base in candidates:
         data_dir = base / '단어장'
         if data_dir.is_dir():
-            excel_files = sorted(data_dir.glob('*.xlsx'))
+            # 엑셀 잠금 파일(~$)과 저장 중인 임시 파일(.이름.xxx.xlsx)은 뺀다
+            excel_files = sorted(
+                p for p in data_dir.glob('*.xlsx') if not p.name.startswith(('~$', '.'))
+            )
             if excel_files:
-                return excel_files[0]
+                return excel_files
         fallback = base / '단어장.xlsx'
         if fallback.is_file():
-            return fallback
+            return [fallback]
 
     raise FileNotFoundError(
         "단어장(.xlsx) 파일을 찾을 수 없습니다. 단어장 폴더 또는 엑셀 파일을 exe와 같은 위치에 두세요."
     )
 
-FILE_PATH    = resolve_excel_path()
+def resolve_excel_path() -> Path:
+    return resolve_excel_paths()[0]
+
 SHEET_NAME   = "Sheet1"
-CHAPTER_SPEC = "1-7"             # 예시: "1-7", "1,7,12"
+CHAPTER_SPEC = "1-7"             # 예시: "1-7", "1,7,12", "1-3,7,10-12"
 FILTER_MODE  = "count"        # chapter | count
 COUNT_SPEC   = "1-10"          # FILTER_MODE=count일 때 1-based 범위 예: "100" or "1-100" or "1,5,10-20"
 PRIOR_MAP    = {
@@ -41,10 +82,103 @@ PRIOR_MAP    = {
     4: 0.9,
 }
 K            = 3                 # prior 신뢰도(베이지안 기반)
+PARAMS_FILE  = "영단어_params.json"  # 영단어_tune.py로 맞춘 K/PRIOR_MAP(exe·스크립트 옆에 있으면 시작할 때 위 두 값을 덮어씀)
 AUTOSAVE     = 10                # n문제마다 자동 저장
+SAVE_FLUSH_TIMEOUT = 15          # 종료 시 백그라운드 저장을 기다리는 최대 시간(초)
+STORAGE      = "excel"           # excel | sqlite | mmap (sqlite/mmap이면 엑셀 옆 .sqlite3/.state.bin에 상태를 두고 종료 시 엑셀로 내보냄)
+MMAP_FLUSH   = 0                 # STORAGE=mmap일 때 n답안마다 상태 파일을 디스크에 동기화(0이면 종료할 때만, 1이면 답안마다)
+PARSE_CACHE  = True              # 파싱한 단어장을 엑셀 옆 .cache.pkl에 보관해 다음 실행을 빠르게
+STREAM_LOAD  = True              # 엑셀을 한 줄씩 읽어 단어/뜻/Day/상태 열만 메모리에 둠(저장 시 상태 열만 원본에 병합)
+JOURNAL      = True              # 답안을 저널 파일에 바로 기록(강제 종료 시 복구용)
+JOURNAL_COMPACT = 200            # 저널 사용 시 n문제마다 엑셀에 합쳐 저장
+JOURNAL_FSYNC = False            # True면 답안마다 디스크까지 동기화(정전 대비, 느림)
 SHOW_TOP10   = False             # 세션 종료 시 상위 10개 출력 여부
+BULK_INIT_MIN = 10               # 새 카드가 이만큼 이상이면 난이도를 표에서 한꺼번에 지정(0이면 한 장씩 묻기)
+MULTI_DECK   = True              # 단어장 폴더의 엑셀을 모두 덱으로 불러옴(False면 이름순 첫 파일만)
+ALL_SHEETS   = False             # True면 엑셀마다 모든 시트를 덱으로(False면 SHEET_NAME 시트만)
+LOAD_WORKERS = 0                 # 덱 파싱 프로세스 수(0=CPU 수, 1=한 프로세스에서 차례로). 큰 엑셀이 둘 이상일 때만 씀
+PROFILE      = False             # True면 상태 표시줄에 단계별 시간(p50/p95/최대)을 보이고 종료 때 엑셀 옆 .profile.json에 저장
+PROFILE_CPROFILE = False         # True면 학습 창 전체를 cProfile로 기록해 엑셀 옆 .prof에 저장(조금 느려짐)
+SCHEDULE     = "greedy"          # greedy(risk 1위부터) | sample(risk에 비례한 확률로 뽑음)
+SAMPLE_TEMPERATURE = 1.0         # sample일 때 diff^(1/온도)로 가중. 1보다 작으면 어려운 카드 쪽으로 더 몰림
+SAMPLE_SEED  = None              # sample일 때 난수 시드(정수면 같은 출제 순서를 재현)
+DUE_MODE     = False             # True면 복습 시각(Due)이 지난 카드부터 출제하고, 설정 창에 오늘 복습할 카드 수를 보임
+DUE_BASE_HOURS = 24              # diff 0.5인 카드를 한 번 맞힌 뒤 다음 복습까지 시간. 쉬울수록·맞힌 횟수만큼 늘어남
+DUE_MIN_MINUTES = 10             # 복습 간격 하한(분)
+DUE_MAX_DAYS = 180               # 복습 간격 상한(일)
+LEARNER      = ""                # 학습자 이름. 정하면 단어장은 읽기만 하고 상태는 엑셀 옆 <이름>.learner.json에 저장
+
+WORD_CANDIDATES    = ["영어", "단어", "Word", "단어(영어)", "단어(ENG)"]
+MEANING_CANDIDATES = ["뜻", "의미", "뜻풀이", "뜻(한국어)", "뜻(의미)", "Meaning"]
+STATE_COLUMNS      = {"Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due", "Day", "챕터"}
+DECK_COLUMN        = "덱"          # 여러 덱을 합친 표에서 행마다 덱 이름(엑셀에는 쓰지 않음)
+
+
+class _Config:
+    """파일 경로처럼 디스크를 봐야 하는 설정은 처음 쓸 때 한 번만 계산한다."""
+
+    @functools.cached_property
+    def file_paths(self) -> list[Path]:
+        return resolve_excel_paths()
+
+    @functools.cached_property
+    def file_path(self) -> Path:
+        return self.file_paths[0]
+
+
+CONFIG = _Config()
+
+
+def __getattr__(name):
+    # 예전 코드 호환: 영단어.FILE_PATH
+    if name == "FILE_PATH":
+        return CONFIG.file_path
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def params_path() -> Path:
+    """PARAMS_FILE 위치. exe로 실행 중이면 exe가 놓인 폴더."""
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).resolve().parent / PARAMS_FILE
+    return Path(__file__).resolve().parent / PARAMS_FILE
+
+def load_params(path=None) -> bool:
+    """맞춰 둔 K/PRIOR_MAP이 있으면 설정값을 덮어쓴다. 읽어서 적용했으면 True.
+
+    import할 때가 아니라 각 실행 진입점(main)에서 부른다(테스트·도구가 import만 해도 파일을 읽지 않게).
+    """
+    global K, PRIOR_MAP
+    if path is None and not PARAMS_FILE:
+        return False
+    path = Path(path) if path is not None else params_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        k = float(data["K"])
+        prior = {int(level): float(value) for level, value in data["PRIOR_MAP"].items()}
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+        print(f"[안내] {path.name}을 읽지 못해 기본 K/PRIOR_MAP을 씁니다: {exc}", file=sys.stderr)
+        return False
+    K, PRIOR_MAP = k, prior
+    return True
 
 # ===== 유틸 =====
+def detect_column(df, candidates, exclude) -> str:
+    for name in candidates:
+        if name in df.columns:
+            return name
+    for col in df.columns:
+        if col not in exclude:
+            return col
+    return df.columns[0]
+
+def detect_card_columns(df):
+    """(단어 열, 뜻 열) 이름. 후보 이름이 없으면 상태 열이 아닌 앞쪽 열을 쓴다."""
+    word_col = detect_column(df, WORD_CANDIDATES, STATE_COLUMNS)
+    meaning_col = detect_column(df, MEANING_CANDIDATES, STATE_COLUMNS | {word_col})
+    return word_col, meaning_col
+
 def to_chapter_num(x):
     """Day가 'day12' 같은 문자열이어도 숫자만 뽑아서 챕터 번호로."""
     if pd.isna(x): return None
@@ -52,36 +186,226 @@ def to_chapter_num(x):
     m = re.findall(r"\d+", s)
     return int(m[0]) if m else None
 
-def parse_chapter_spec(spec: str):
-    """'1-7'/'1~7' 범위, '1,7,12' 개별 선택 모두 지원."""
-    s = spec.strip().replace(" ", "")
-    if "-" in s or "~" in s:
-        a, b = re.split(r"[-~]", s)
-        a, b = int(a), int(b)
-        if a > b: a, b = b, a
-        return set(range(a, b+1))
-    return set(int(x) for x in s.split(",") if x)
-
-
-def parse_count_spec(spec: str):
-    """1-based 위치 기준 범위 지정. 예) "100", "1-100", "1,5,10-20" 지원."""
-    s = spec.strip().replace(" ", "")
-    if not s:
-        return []
-    parts = s.split(",")
-    idxs = set()
-    for part in parts:
-        if "-" in part or "~" in part:
-            a, b = re.split(r"[-~]", part)
-            a, b = int(a), int(b)
-            if a > b: a, b = b, a
-            idxs.update(range(a, b+1))
-        else:
-            idxs.add(int(part))
-    return sorted(idxs)
+def chapter_numbers(days) -> np.ndarray:
+    """Day 열 → 행별 챕터 번호 float 배열(결측=NaN).
+
+    Day 값 종류는 챕터 수 정도라 고유값마다 한 번만 to_chapter_num을 부르고 행으로 펼친다.
+    """
+    codes, uniques = pd.factorize(pd.Series(days, copy=False))
+    nums = [to_chapter_num(value) for value in uniques]
+    # factorize는 결측을 -1로 두므로 표 끝에 NaN을 하나 붙여 둔다
+    table = np.array([np.nan if num is None else num for num in nums] + [np.nan], dtype=float)
+    return table[codes]
+
+class ChapterIndex:
+    """챕터 번호 → 행 위치 색인. 불러올 때 한 번 만들고 설정 창과 학습 세션이 같이 쓴다.
+
+    행 위치를 챕터 순으로(같은 챕터 안에서는 원래 순서로) 늘어놓고 챕터마다 시작 위치를 둔다.
+    챕터 범위 선택은 구간마다 searchsorted 한 번, 챕터별 카드 수는 counts에 있다.
+    """
+
+    __slots__ = ("numbers", "chapters", "counts", "_order", "_bounds")
+
+    def __init__(self, numbers) -> None:
+        self.numbers = float_array(numbers, fill=np.nan)
+        valid = np.flatnonzero(np.isfinite(self.numbers) & (self.numbers == np.trunc(self.numbers)))
+        codes = self.numbers[valid].astype(np.int64)
+        order = np.argsort(codes, kind="stable")
+        self._order = valid[order]
+        self.chapters, starts, self.counts = np.unique(codes[order], return_index=True, return_counts=True)
+        self._bounds = np.append(starts, len(order))
+
+    @classmethod
+    def from_days(cls, days) -> "ChapterIndex":
+        return cls(chapter_numbers(days))
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def _slices(self, intervals: "Intervals"):
+        for a, b in intervals.spans:
+            lo, hi = np.searchsorted(self.chapters, [a, b + 1])
+            if lo < hi:
+                yield self._bounds[lo], self._bounds[hi]
+
+    def positions(self, intervals: "Intervals") -> np.ndarray:
+        """구간에 드는 챕터의 행 위치(오름차순)."""
+        parts = [self._order[start:stop] for start, stop in self._slices(intervals)]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts)).astype(np.int64, copy=False)
+
+    def count(self, intervals: "Intervals") -> int:
+        return int(sum(stop - start for start, stop in self._slices(intervals)))
+
+    def choices(self) -> list:
+        """[(챕터 번호, 카드 수), ...] 챕터 순."""
+        return list(zip(self.chapters.tolist(), self.counts.tolist()))
+
+class DueIndex:
+    """Due(유닉스 초, 0=아직 안 본 카드) 정렬 색인. 위치는 만들 때 준 배열의 위치.
+
+    count(t)는 처음 부를 때 한 번 정렬해 둔 배열에서 이진 탐색하고, 그 뒤 set으로 바뀐 카드만
+    따로 더하고 뺀다. next_due(t)는 (Due, 위치) 힙 맨 위에서 값이 바뀐 항목을 버리며 꺼내므로 O(log n)이다.
+    """
+
+    REBUILD = 4096  # 바뀐 카드가 이보다 많으면 정렬 배열을 다시 만든다
+
+    __slots__ = ("due", "_sorted", "_changed", "_heap")
+
+    def __init__(self, due) -> None:
+        self.due = int_array(due)
+        self._sorted = None
+        self._changed: dict = {}  # 위치 → 정렬 배열에 들어 있는 예전 값
+        self._heap = None
+
+    def __len__(self) -> int:
+        return len(self.due)
+
+    def set(self, positions, due: int) -> None:
+        due = int(due)
+        for p in positions:
+            p = int(p)
+            if self._sorted is not None:
+                self._changed.setdefault(p, int(self.due[p]))
+            self.due[p] = due
+            if self._heap is not None and due > 0:
+                heapq.heappush(self._heap, (due, p))
+        if len(self._changed) > self.REBUILD:
+            self._sorted = None
+            self._changed.clear()
+
+    def count(self, until: int) -> int:
+        """Due가 until 이하인 카드 수(아직 안 본 카드는 빼고)."""
+        if self._sorted is None:
+            self._sorted = np.sort(self.due[self.due > 0])
+        n = int(np.searchsorted(self._sorted, until, side="right"))
+        for p, old in self._changed.items():
+            new = int(self.due[p])
+            n += (0 < new <= until) - (0 < old <= until)
+        return n
+
+    def next_due(self, until: int):
+        """Due가 until 이하인 카드 중 가장 이른 카드의 위치(같으면 앞 위치). 없으면 None."""
+        heap = self._heap
+        if heap is None:
+            seen = np.flatnonzero(self.due > 0)
+            heap = self._heap = list(zip(self.due[seen].tolist(), seen.tolist()))
+            heapq.heapify(heap)
+        due = self.due
+        while heap:
+            value, p = heap[0]
+            if due[p] != value:
+                heapq.heappop(heap)
+                continue
+            return p if value <= until else None
+        return None
+
+class Intervals:
+    """정렬·병합된 닫힌 정수 구간 [(시작, 끝), ...]. 범위를 집합이나 목록으로 펼치지 않고 다룬다."""
+
+    __slots__ = ("spans", "_starts")
+
+    def __init__(self, spans=()) -> None:
+        merged: list = []
+        for a, b in sorted((min(a, b), max(a, b)) for a, b in spans):
+            if merged and a <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], b)
+            else:
+                merged.append([a, b])
+        self.spans = [(a, b) for a, b in merged]
+        self._starts = [a for a, _ in self.spans]
+
+    def __repr__(self) -> str:
+        return f"Intervals({self.spans})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Intervals) and self.spans == other.spans
+
+    def __bool__(self) -> bool:
+        return bool(self.spans)
+
+    def __len__(self) -> int:
+        return sum(b - a + 1 for a, b in self.spans)
+
+    def __iter__(self):
+        for a, b in self.spans:
+            yield from range(a, b + 1)
+
+    def __contains__(self, value) -> bool:
+        if type(value) is not int:
+            try:
+                if value is None or int(value) != value:
+                    return False
+            except (TypeError, ValueError, OverflowError):
+                return False
+        i = bisect.bisect_right(self._starts, value) - 1
+        return i >= 0 and value <= self.spans[i][1]
+
+    def shift(self, delta: int) -> "Intervals":
+        return Intervals((a + delta, b + delta) for a, b in self.spans)
+
+    def clip(self, low: int, high: int) -> "Intervals":
+        return Intervals((max(a, low), min(b, high)) for a, b in self.spans if b >= low and a <= high)
+
+    def mask(self, values) -> np.ndarray:
+        """values(숫자 배열, 결측=NaN) 중 구간에 드는 것. 구간마다 searchsorted 한 번."""
+        values = float_array(values, fill=np.nan)
+        out = np.zeros(len(values), dtype=bool)
+        if not self.spans:
+            return out
+        ends = np.array([b for _, b in self.spans], dtype=float)
+        i = np.searchsorted(np.array(self._starts, dtype=float), values, side="right") - 1
+        ok = (i >= 0) & (values == np.trunc(values))
+        out[ok] = values[ok] <= ends[i[ok]]
+        return out
+
+    def array(self) -> np.ndarray:
+        """구간의 정수들을 오름차순 int64 배열로."""
+        if not self.spans:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b + 1, dtype=np.int64) for a, b in self.spans])
+
+_SPEC_ITEM = re.compile(r"([0-9]+)(?:[-~]([0-9]+))?")
+
+def parse_spec(spec: str) -> Intervals:
+    """'7', '1-7'/'1~7', '1,7,12', '1-100,5000-9000' → Intervals. 빈 문자열은 빈 구간."""
+    spans = []
+    for item in re.sub(r"\s+", "", str(spec)).split(","):
+        if not item:
+            continue
+        m = _SPEC_ITEM.fullmatch(item)
+        if m is None:
+            raise ValueError(f"읽을 수 없는 범위: '{item}' (예: 7, 1-7, 1~7, 1-100,5000-9000)")
+        a = int(m.group(1))
+        spans.append((a, int(m.group(2)) if m.group(2) else a))
+    return Intervals(spans)
+
+def parse_chapter_spec(spec: str) -> Intervals:
+    """챕터 번호 구간. '1-7'/'1~7' 범위, '1,7,12' 개별 선택을 섞어 쓸 수 있다."""
+    return parse_spec(spec)
+
+
+def parse_count_spec(spec: str) -> Intervals:
+    """1-based 위치 구간. 예) "100", "1-100", "1,5,10-20"."""
+    return parse_spec(spec)
+
+def split_deck_spec(spec: str):
+    """'토익:1-3; 수능:2'처럼 덱별로 나눈 범위 → [(덱 이름 또는 None, 범위)].
+
+    덱은 ';'로 구분하고, '덱이름:' 뒤 범위가 비어 있으면 그 덱 전체. 덱 이름이 없는 조각은 모든 덱에 적용된다.
+    """
+    groups = []
+    for part in str(spec).split(";"):
+        name, sep, rest = part.partition(":")
+        if sep:
+            groups.append((name.strip(), rest.strip()))
+        elif part.strip():
+            groups.append((None, part.strip()))
+    return groups
 
 def ensure_state_cols(df):
-    for col in ["Tries", "Fails", "LastStep", "InitLevel"]:
+    for col in ["Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due"]:
         if col not in df.columns:
             if col == "InitLevel":
                 df[col] = pd.NA
@@ -89,6 +413,66 @@ def ensure_state_cols(df):
                 df[col] = 0
     return df
 
+def normalize_state_cols(df):
+    """상태 컬럼을 보강하고 Tries/Fails/LastStep/LastSeen/Due는 int64, InitLevel은 float(결측=NaN)로 맞춘다."""
+    df = ensure_state_cols(df)
+    for col in ["Tries", "Fails", "LastStep", "LastSeen", "Due"]:
+        df[col] = int_array(df[col])
+    df["InitLevel"] = float_array(df["InitLevel"], fill=np.nan)
+    return df
+
+def write_excel_atomic(df, path, sheet_name, sync=None):
+    """임시 파일에 다 쓴 뒤 교체한다. 쓰는 도중 멈춰도 기존 엑셀은 그대로 남는다.
+
+    일부 열/행만 읽은 표(영단어_xlsx.read_streaming)와 다른 시트가 있는 엑셀은 원본 엑셀에 병합해 쓴다
+    (시트 하나만 통째로 쓰면 다른 시트가 사라지므로).
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=".xlsx", dir=path.parent)
+    os.close(fd)
+    try:
+        xlsx = importlib.import_module("영단어_xlsx")
+        if path.exists():
+            shutil.copymode(path, tmp)
+        if path.exists() and (df.attrs.get("pruned") or xlsx.sheet_names(path) != [sheet_name]):
+            xlsx.merge_into_workbook(df, path, tmp, sheet_name, sync=sync)
+            os.replace(tmp, path)
+            xlsx.remember_written(path)
+        else:
+            df.to_excel(tmp, sheet_name=sheet_name, index=False, engine="openpyxl")
+            os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+def build_key_index(words, meanings) -> dict:
+    """(단어, 뜻) → 행 위치(0-based) 리스트.
+
+    같은 (단어, 뜻) 행이 여러 개면 한 카드로 보고 함께 갱신한다.
+    단어나 뜻이 비어 있는 행은 묶지 않으므로 색인에 넣지 않는다.
+    """
+    words = pd.Series(words, copy=False)
+    meanings = pd.Series(meanings, copy=False)
+    blank = (words.isna() | meanings.isna()).to_numpy()
+    index = {}
+    for pos, (w, m) in enumerate(zip(words.tolist(), meanings.tolist())):
+        if not blank[pos]:
+            index.setdefault((w, m), []).append(pos)
+    return index
+
+def build_duplicate_index(words, meanings) -> dict:
+    """build_key_index 중 두 행 이상인 키만. 모든 행의 키 튜플을 만들지 않아 큰 표에서도 가볍다."""
+    frame = pd.DataFrame(
+        {"w": pd.Series(words, copy=False).to_numpy(), "m": pd.Series(meanings, copy=False).to_numpy()}
+    )
+    blank = (frame["w"].isna() | frame["m"].isna()).to_numpy()
+    dup = np.flatnonzero(frame.duplicated(keep=False).to_numpy() & ~blank)
+    index = {}
+    for pos, w, m in zip(dup.tolist(), frame["w"].to_numpy()[dup].tolist(), frame["m"].to_numpy()[dup].tolist()):
+        index.setdefault((w, m), []).append(pos)
+    return index
+
 def get_prior(init_level):
     try:
         return PRIOR_MAP[int(init_level)]
@@ -107,120 +491,781 @@ def recency_norm(cur_step: int, last_step: int) -> float:
     rec = max(0, cur_step - last_step)
     return min(rec / cur_step, 1.0)
 
+def due_interval(diff: float, tries: int, fails: int) -> int:
+    """답한 뒤 다음 복습까지 초.
+
+    DUE_BASE_HOURS × 맞힌 횟수 × (1-diff)/diff. diff 0.5를 한 번 맞혔으면 DUE_BASE_HOURS이고,
+    DUE_MIN_MINUTES ~ DUE_MAX_DAYS로 자른다.
+    """
+    odds = (1.0 - diff) / max(diff, 0.01)
+    hours = DUE_BASE_HOURS * max(tries - fails, 1) * odds
+    return int(min(max(hours * 3600, DUE_MIN_MINUTES * 60), DUE_MAX_DAYS * 86400))
+
+def day_end(now: float = None) -> int:
+    """now(기본 지금)가 속한 날이 끝나는 시각(다음 날 0시, 현지 시각)의 유닉스 초."""
+    t = time.localtime(time.time() if now is None else now)
+    return int(time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1)))
+
+# ===== 배열 단위 점수 계산 =====
+def float_array(values, fill: float = 0.0) -> np.ndarray:
+    """열/리스트를 float 배열로. 숫자가 아닌 값과 결측은 fill."""
+    arr = pd.to_numeric(pd.Series(values, copy=False), errors="coerce")
+    return arr.to_numpy(dtype=float, na_value=fill)
+
+def int_array(values) -> np.ndarray:
+    """_safe_int처럼 결측/문자는 0, 나머지는 정수로 자른 int64 배열."""
+    return np.trunc(float_array(values)).astype(np.int64)
+
+def prior_array(init_levels) -> np.ndarray:
+    """get_prior의 배열 버전. PRIOR_MAP을 룩업 테이블로 적용한다."""
+    levels = float_array(init_levels, fill=np.nan)
+    out = np.full(levels.shape, 0.5)
+    keys = [int(k) for k in PRIOR_MAP if int(k) >= 0]
+    if not keys:
+        return out
+    lut = np.full(max(keys) + 1, np.nan)
+    for key in keys:
+        lut[key] = PRIOR_MAP[key]
+    ok = np.isfinite(levels)
+    lv = np.trunc(levels[ok])
+    inside = (lv >= 0) & (lv < len(lut))
+    hit = np.full(lv.shape, np.nan)
+    hit[inside] = lut[lv[inside].astype(np.int64)]
+    out[ok] = np.where(np.isnan(hit), 0.5, hit)
+    return out
+
+def score_arrays(tries, fails, last_steps, init_levels, cur_step: int, k: int = None):
+    """Tries/Fails/LastStep/InitLevel 배열 → (risk, diff, recn) 배열.
+
+    bayes_diff·recency_norm과 같은 연산 순서라 스칼라 버전과 값이 일치한다.
+    """
+    k = K if k is None else k
+    t = int_array(tries)
+    f = int_array(fails)
+    last = int_array(last_steps)
+    prior = prior_array(init_levels)
+
+    denom = k + t
+    diff = (prior * k + f) / np.where(denom > 0, denom, 1)
+    if cur_step <= 0:
+        recn = np.ones_like(diff)
+    else:
+        rec = np.maximum(0, cur_step - last)
+        recn = np.minimum(rec / cur_step, 1.0)
+    return diff * recn, diff, recn
+
+def score_frame(df, cur_step: int, k: int = None):
+    """상태 컬럼이 있는 DataFrame을 한 번에 점수화."""
+    return score_arrays(df["Tries"], df["Fails"], df["LastStep"], df["InitLevel"], cur_step, k)
+
+# ===== 스케줄러 =====
+class RiskScheduler:
+    """risk 최댓값 카드를 O(log n)에 찾는 kinetic segment tree.
+
+    cur_step>0이면 risk*cur_step = diff*(cur_step-last)로 모든 카드가 step에 대한
+    직선이므로, 각 노드에 '승자'와 그 승자가 바뀔 수 있는 가장 이른 step(만료)을 둔다.
+    step이 진행되면 만료된 노드만 다시 계산하고, 카드 갱신은 leaf→root 경로만 고친다.
+    순서는 기존 정렬과 같다: risk 내림차순 → recency 내림차순 → 서브셋 순서.
+    """
+
+    def __init__(self, diffs, lasts, cur_step: int = 0):
+        self.n = len(diffs)
+        self.diff = np.asarray(diffs, dtype=float).tolist()
+        self.last = np.asarray(lasts, dtype=np.int64).tolist()
+        size = 1
+        while size < max(self.n, 1):
+            size *= 2
+        self.size = size
+        self.win = [-1] * (2 * size)
+        self.exp = [math.inf] * (2 * size)
+        self.t = cur_step
+        for i in range(self.n):
+            self.win[size + i] = i
+        for node in range(size - 1, 0, -1):
+            self._pull(node)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def risk(self, i: int, cur_step: int):
+        recn = recency_norm(cur_step, self.last[i])
+        return self.diff[i] * recn, recn
+
+    def _better(self, a: int, b: int) -> bool:
+        if b < 0:
+            return True
+        if a < 0:
+            return False
+        ka, kb = self.risk(a, self.t), self.risk(b, self.t)
+        if ka != kb:
+            return ka > kb
+        return a < b
+
+    def _cert_expiry(self, a: int, b: int):
+        """a, b의 순서가 바뀔 수 있는 다음 step(보수적으로 이르게 잡는다)."""
+        t = self.t
+        if a < 0 or b < 0:
+            return math.inf
+        if t <= 0:
+            return 1
+        la, lb = max(self.last[a], 0), max(self.last[b], 0)
+        if la >= t or lb >= t:
+            # 아직 recency가 0인 카드가 있으면 활성화되는 시점에 다시 본다
+            return min(x + 1 for x in (la, lb) if x >= t)
+        da, db = self.diff[a], self.diff[b]
+        if da == db:
+            return math.inf
+        cross = (da * la - db * lb) / (da - db)
+        if cross + 1 < t:
+            return math.inf
+        return max(t + 1, math.floor(cross))
+
+    def _pull(self, node: int) -> None:
+        left, right = 2 * node, 2 * node + 1
+        a, b = self.win[left], self.win[right]
+        w = a if self._better(a, b) else b
+        self.win[node] = w
+        self.exp[node] = min(self._cert_expiry(a, b), self.exp[left], self.exp[right])
+
+    def _refresh(self, node: int) -> None:
+        if self.exp[node] > self.t:
+            return
+        if node < self.size:
+            self._refresh(2 * node)
+            self._refresh(2 * node + 1)
+            self._pull(node)
+
+    def advance(self, cur_step: int) -> None:
+        if cur_step < self.t:
+            # step이 되돌아가면 만료 정보가 무의미하므로 전체 재계산
+            self.t = cur_step
+            for node in range(self.size - 1, 0, -1):
+                self._pull(node)
+            return
+        self.t = cur_step
+        self._refresh(1)
+
+    def update(self, i: int, diff: float, last: int, cur_step: int) -> None:
+        self.advance(cur_step)
+        self.diff[i] = float(diff)
+        self.last[i] = int(last)
+        node = (self.size + i) // 2
+        while node >= 1:
+            self._pull(node)
+            node //= 2
+
+    def best(self, cur_step: int):
+        """cur_step 기준 우선순위 1위 카드 위치. 카드가 없으면 None."""
+        if self.n == 0:
+            return None
+        self.advance(cur_step)
+        return self.win[1]
+
+    def peek(self, cur_step: int, changes: dict = None):
+        """update(i, diff, last, ...) 뒤 best(cur_step)가 돌려줄 카드와 그 risk를 트리를 고치지 않고 구한다.
+
+        changes: {위치: (diff, last)}. cur_step은 지금 step 이상이어야 한다. 반환: (위치, risk), 카드가 없으면 (None, 0.0)
+        """
+        if self.n == 0:
+            return None, 0.0
+        changes = changes or {}
+        # 바뀌는 카드의 조상 노드는 저장된 승자를 믿을 수 없으므로 자식부터 다시 본다
+        blocked = set()
+        for i in changes:
+            node = (self.size + i) // 2
+            while node >= 1 and node not in blocked:
+                blocked.add(node)
+                node //= 2
+        saved_t = self.t
+        saved = {i: (self.diff[i], self.last[i]) for i in changes}
+        self.t = max(cur_step, self.t)
+        for i, (diff, last) in changes.items():
+            self.diff[i] = float(diff)
+            self.last[i] = int(last)
+        try:
+            w = self._peek(1, blocked)
+            return w, self.risk(w, cur_step)[0]
+        finally:
+            self.t = saved_t
+            for i, (diff, last) in saved.items():
+                self.diff[i] = diff
+                self.last[i] = last
+
+    def _peek(self, node: int, blocked: set) -> int:
+        if node >= self.size or (node not in blocked and self.exp[node] > self.t):
+            return self.win[node]
+        a, b = self._peek(2 * node, blocked), self._peek(2 * node + 1, blocked)
+        return a if self._better(a, b) else b
+
+    def taken(self, i: int) -> None:
+        """peek으로 구한 카드를 best 없이 냈다. 순서가 정해져 있으므로 할 일이 없다."""
+
+
+class RiskSampler:
+    """risk에 비례한 확률로 카드를 뽑는 스케줄러(SCHEDULE="sample"). RiskScheduler와 같은 방식으로 쓴다.
+
+    step t에서 risk×t = diff×(t−last)이므로 카드마다 a=diff', b=diff'×last를 두면 가중치 합이
+    t×Σa − Σb다. a, b를 펜윅 트리 두 개에 두어 뽑기와 갱신 모두 O(log n). diff' = diff^(1/온도)를
+    정수로 고정소수화해 두므로 합이 정확하고, 갱신 순서가 달라도 같은 시드면 같은 카드가 나온다.
+    last ≥ t인 카드(recency 0)는 빼 두었다가 step이 지나면 넣는다.
+    """
+
+    SCALE = 1 << 32
+
+    def __init__(self, diffs, lasts, cur_step: int = 0, temperature: float = 1.0, seed=None):
+        if not temperature > 0:
+            raise ValueError("SAMPLE_TEMPERATURE는 0보다 커야 합니다.")
+        self.n = len(diffs)
+        self.diff = np.asarray(diffs, dtype=float).tolist()
+        self.last = np.asarray(lasts, dtype=np.int64).tolist()
+        self.power = 1.0 / temperature
+        self.reseed(seed)
+        self.t = cur_step
+        self._build()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def reseed(self, seed) -> None:
+        self._rng = random.Random(seed)
+        self._u = None  # 다음 뽑기에 쓸 난수. peek은 만들어 두기만 하고 best/taken이 소비한다
+
+    def _weight(self, diff: float) -> int:
+        if not diff > 0 or not math.isfinite(diff):
+            return 0
+        return max(1, round(diff ** self.power * self.SCALE))
+
+    def _floor(self) -> int:
+        # step 0 직후에는 LastStep 0인 카드도 뽑혀야 하므로 1부터 센다
+        return max(self.t, 1)
+
+    def _build(self) -> None:
+        n = self.n
+        self._q = [self._weight(d) for d in self.diff]
+        self._on = [False] * n
+        self._pending: list = []  # (last, 위치) 힙: 아직 recency가 0인 카드
+        leaf_a = [0] * (n + 1)
+        leaf_b = [0] * (n + 1)
+        floor = self._floor()
+        for i in range(n):
+            q, last = self._q[i], max(self.last[i], 0)
+            if not q:
+                continue
+            if last < floor:
+                self._on[i] = True
+                leaf_a[i + 1] = q
+                leaf_b[i + 1] = q * last
+            else:
+                self._pending.append((last, i))
+        heapq.heapify(self._pending)
+        # 펜윅 트리를 O(n)에 만든다: 각 노드 값을 부모에 더해 올린다
+        for tree in (leaf_a, leaf_b):
+            for j in range(1, n + 1):
+                up = j + (j & -j)
+                if up <= n:
+                    tree[up] += tree[j]
+        self._a, self._b = leaf_a, leaf_b
+
+    def _add(self, i: int, sign: int) -> None:
+        q = self._q[i] * sign
+        qb = q * max(self.last[i], 0)
+        j = i + 1
+        while j <= self.n:
+            self._a[j] += q
+            self._b[j] += qb
+            j += j & -j
+
+    def _assign(self, i: int, diff: float, last: int) -> None:
+        if self._on[i]:
+            self._add(i, -1)
+            self._on[i] = False
+        self.diff[i] = float(diff)
+        self.last[i] = int(last)
+        self._q[i] = self._weight(self.diff[i])
+        if not self._q[i]:
+            return
+        if max(self.last[i], 0) < self._floor():
+            self._add(i, 1)
+            self._on[i] = True
+        else:
+            heapq.heappush(self._pending, (max(self.last[i], 0), i))
+
+    def advance(self, cur_step: int) -> list:
+        """반환: 이번에 새로 넣은 카드 위치."""
+        if cur_step < self.t:
+            self.t = cur_step
+            self._build()
+            return []
+        self.t = cur_step
+        floor = self._floor()
+        added = []
+        pending = self._pending
+        while pending and pending[0][0] < floor:
+            last, i = heapq.heappop(pending)
+            # 그사이 다시 갱신된 카드의 예전 항목은 건너뛴다
+            if not self._on[i] and self._q[i] and max(self.last[i], 0) == last:
+                self._add(i, 1)
+                self._on[i] = True
+                added.append(i)
+        return added
+
+    def update(self, i: int, diff: float, last: int, cur_step: int) -> None:
+        self.advance(cur_step)
+        self._assign(i, diff, last)
+
+    def risk(self, i: int, cur_step: int):
+        recn = recency_norm(cur_step, self.last[i])
+        return self.diff[i] * recn, recn
+
+    def _draw(self) -> int:
+        """지금 가중치로 한 장 뽑을 위치. 가중치 합이 0이면 None."""
+        floor = self._floor()
+        total = self._prefix(self.n, floor)
+        if total <= 0:
+            return None
+        if self._u is None:
+            self._u = self._rng.random()
+        target = min(int(self._u * total), total - 1)
+        pos = 0
+        bit = 1 << (self.n.bit_length() - 1)
+        while bit:
+            nxt = pos + bit
+            if nxt <= self.n:
+                weight = floor * self._a[nxt] - self._b[nxt]
+                if weight <= target:
+                    pos = nxt
+                    target -= weight
+            bit >>= 1
+        return pos
+
+    def _prefix(self, j: int, floor: int) -> int:
+        total = 0
+        while j > 0:
+            total += floor * self._a[j] - self._b[j]
+            j -= j & -j
+        return total
+
+    def best(self, cur_step: int):
+        """가중치에 비례해 뽑은 카드 위치. 뽑을 카드가 없으면 None."""
+        if self.n == 0:
+            return None
+        self.advance(cur_step)
+        pos = self._draw()
+        if pos is not None:
+            self._u = None
+        return pos
+
+    def peek(self, cur_step: int, changes: dict = None):
+        """update(i, diff, last, ...) 뒤 best(cur_step)가 뽑을 카드와 그 risk. 트리와 난수는 그대로 둔다."""
+        if self.n == 0:
+            return None, 0.0
+        changes = changes or {}
+        saved_t, saved_pending = self.t, list(self._pending)
+        saved = {i: (self.diff[i], self.last[i], self._q[i], self._on[i]) for i in changes}
+        for i, (diff, last) in changes.items():
+            self._assign(i, diff, last)
+        added = self.advance(max(cur_step, self.t))
+        try:
+            pos = self._draw()
+            return pos, (self.risk(pos, cur_step)[0] if pos is not None else 0.0)
+        finally:
+            # 정수 합이라 더했다 빼면 트리가 정확히 돌아온다
+            for i in added:
+                saved.setdefault(i, (self.diff[i], self.last[i], self._q[i], False))
+            for i in saved:
+                if self._on[i]:
+                    self._add(i, -1)
+            for i, (diff, last, q, on) in saved.items():
+                self.diff[i], self.last[i], self._q[i], self._on[i] = diff, last, q, on
+                if on:
+                    self._add(i, 1)
+            self.t, self._pending = saved_t, saved_pending
+
+    def taken(self, i: int) -> None:
+        """peek으로 구한 카드를 best 없이 냈다. 그 뽑기에 쓴 난수를 소비한다."""
+        self._u = None
+
+
+def make_scheduler(diffs, lasts, cur_step: int = 0):
+    """SCHEDULE 설정에 맞는 출제 스케줄러."""
+    if SCHEDULE == "sample":
+        return RiskSampler(diffs, lasts, cur_step, SAMPLE_TEMPERATURE, SAMPLE_SEED)
+    if SCHEDULE != "greedy":
+        raise ValueError("SCHEDULE은 'greedy' 또는 'sample'만 지원합니다.")
+    return RiskScheduler(diffs, lasts, cur_step)
+
+
+# ===== 카드 저장소 =====
+class Card:
+    """출제·표시용 카드 한 장(뽑을 때의 값)."""
+
+    __slots__ = ("idx", "word", "meaning", "deck", "tries", "fails", "last", "level", "seen", "due")
+
+    def __init__(
+        self, idx, word, meaning, deck, tries: int, fails: int, last: int, level, seen: int = 0, due: int = 0
+    ) -> None:
+        self.idx = idx
+        self.word = word
+        self.meaning = meaning
+        self.deck = deck
+        self.tries = tries
+        self.fails = fails
+        self.last = last
+        self.level = level  # InitLevel 숫자값, 없으면 None
+        self.seen = seen  # 마지막으로 답한 시각(유닉스 초, 0=없음)
+        self.due = due  # 다음 복습 시각(유닉스 초, 0=없음)
+
+
+class CardStore:
+    """학습 루프용 카드 상태. pandas 행 대신 열마다 고정 타입 배열 하나씩 둔다.
+
+    단어/뜻/덱은 DataFrame의 값 객체를 가리키기만 하므로 문자열을 복사하지 않는다.
+    rows는 원본 DataFrame 행 위치, index는 세션 밖에서 카드를 부르는 색인(원본 행 레이블).
+    상태가 바뀐 DataFrame 행은 따로 모아 두었다가 flush()에서 한꺼번에 쓴다.
+    """
+
+    __slots__ = (
+        "index", "rows", "word", "meaning", "deck", "keyed",
+        "tries", "fails", "last", "level", "seen", "due", "_lookup", "_dirty_state", "_dirty_level",
+    )
+
+    def __init__(self, df, positions, word_col: str, meaning_col: str, index=None) -> None:
+        rows = np.asarray(positions, dtype=np.int64)
+
+        def take(col):
+            # 열 전체를 배열로 바꾸지 않고 범위 행만 꺼낸다
+            return df[col].take(rows).to_numpy()
+
+        self.rows = rows
+        self.index = np.asarray(index) if index is not None else df.index[rows].to_numpy()
+        self.word = take(word_col)
+        self.meaning = take(meaning_col)
+        self.deck = take(DECK_COLUMN) if DECK_COLUMN in df.columns else None
+        # 단어나 뜻이 비어 있으면 (단어, 뜻) 키로 묶지 않는다
+        self.keyed = ~(pd.isna(self.word) | pd.isna(self.meaning))
+        self.tries = int_array(take("Tries")).astype(np.int32)
+        self.fails = int_array(take("Fails")).astype(np.int32)
+        self.last = int_array(take("LastStep"))
+        self.level = float_array(take("InitLevel"), fill=np.nan).astype(np.float32)
+        self.seen = int_array(take("LastSeen"))
+        self.due = int_array(take("Due"))
+        ordered = self.index.dtype.kind in "iu" and bool(np.all(self.index[1:] > self.index[:-1]))
+        self._lookup = None if ordered else {label: pos for pos, label in enumerate(self.index.tolist())}
+        self._dirty_state: dict = {}  # DataFrame 행 → 값을 가진 저장소 위치
+        self._dirty_level: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def position(self, idx) -> int:
+        """색인 → 저장소 위치. 색인이 오름차순 정수이면 이진 탐색, 아니면 사전."""
+        if self._lookup is not None:
+            return self._lookup[idx]
+        pos = int(np.searchsorted(self.index, idx))
+        if pos < len(self.index) and self.index[pos] == idx:
+            return pos
+        raise KeyError(idx)
+
+    def key(self, pos: int):
+        return (self.word[pos], self.meaning[pos]) if self.keyed[pos] else None
+
+    def card(self, pos: int) -> Card:
+        level = float(self.level[pos])
+        return Card(
+            self.index[pos],
+            self.word[pos],
+            self.meaning[pos],
+            self.deck[pos] if self.deck is not None else None,
+            int(self.tries[pos]),
+            int(self.fails[pos]),
+            int(self.last[pos]),
+            level if level == level else None,
+            int(self.seen[pos]),
+            int(self.due[pos]),
+        )
+
+    def scores(self, cur_step: int, positions=None, k: int = None):
+        """score_arrays와 같은 (risk, diff, recn). positions를 주면 그 카드만."""
+        if positions is None:
+            return score_arrays(self.tries, self.fails, self.last, self.level, cur_step, k)
+        return score_arrays(
+            self.tries[positions], self.fails[positions], self.last[positions], self.level[positions], cur_step, k
+        )
+
+    def set_state(self, positions, tries: int, fails: int, last: int, seen: int, due: int, df_rows) -> None:
+        """같은 카드인 위치들에 Tries/Fails/LastStep/LastSeen/Due를 쓰고, 저장 때 df_rows에 옮길 것으로 표시한다."""
+        self.tries[positions] = tries
+        self.fails[positions] = fails
+        self.last[positions] = last
+        self.seen[positions] = seen
+        self.due[positions] = due
+        for r in df_rows:
+            self._dirty_state[r] = positions[0]
+
+    def set_level(self, positions, level: int, df_rows) -> None:
+        self.level[positions] = level
+        for r in df_rows:
+            self._dirty_level[r] = positions[0]
+
+    @property
+    def dirty(self) -> int:
+        return len(self._dirty_state) + len(self._dirty_level)
+
+    def flush(self, df) -> int:
+        """바뀐 상태를 df에 쓰고 표시를 지운다. 반환: 쓴 DataFrame 행 수."""
+        written = 0
+        columns = (
+            (
+                self._dirty_state,
+                (
+                    ("Tries", self.tries), ("Fails", self.fails), ("LastStep", self.last),
+                    ("LastSeen", self.seen), ("Due", self.due),
+                ),
+            ),
+            (self._dirty_level, (("InitLevel", self.level),)),
+        )
+        for dirty, cols in columns:
+            if not dirty:
+                continue
+            rows = np.fromiter(dirty.keys(), dtype=np.int64, count=len(dirty))
+            src = np.fromiter(dirty.values(), dtype=np.int64, count=len(dirty))
+            for col, values in cols:
+                # InitLevel은 세션이 정수로만 쓰므로 float32 값을 정수로 돌려 쓴다
+                out = values[src].astype(np.int64)
+                df.iloc[rows, df.columns.get_loc(col)] = out
+            written += len(dirty)
+            dirty.clear()
+        return written
+
+
+# ===== 계측 =====
+class OpTimings:
+    """단계별 호출 수·누적·p50/p95/최대 시간(초). 분위수는 단계마다 최근 keep건으로 계산한다."""
+
+    def __init__(self, keep: int = 10000) -> None:
+        self.keep = keep
+        self._ops: dict = {}  # 이름 → [호출 수, 누적, 최대, 최근 측정값]
+
+    def add(self, name: str, seconds: float) -> None:
+        op = self._ops.get(name)
+        if op is None:
+            op = self._ops.setdefault(name, [0, 0.0, 0.0, deque(maxlen=self.keep)])
+        op[0] += 1
+        op[1] += seconds
+        op[2] = max(op[2], seconds)
+        op[3].append(seconds)
+
+    @contextlib.contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """함수 호출마다 걸린 시간을 name으로 기록하는 데코레이터."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    @staticmethod
+    def _rank(ordered: list, q: float) -> float:
+        return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+    def summary(self) -> dict:
+        out = {}
+        for name, (count, total, peak, recent) in list(self._ops.items()):
+            ordered = sorted(recent)
+            out[name] = {
+                "count": count,
+                "total": total,
+                "p50": self._rank(ordered, 0.5),
+                "p95": self._rank(ordered, 0.95),
+                "max": peak,
+            }
+        return out
+
+    def describe(self, labels: dict = None) -> str:
+        """'출제 0.21/0.90/3.1ms · ...' 형식(p50/p95/최대). labels를 주면 그 단계만 그 순서로."""
+        def ms(seconds: float) -> str:
+            value = seconds * 1000
+            return f"{value:.2f}" if value < 1 else f"{value:.1f}" if value < 10 else f"{value:.0f}"
+
+        stats = self.summary()
+        names = [n for n in labels if n in stats] if labels else list(stats)
+        return " · ".join(
+            f"{labels[n] if labels else n} {ms(stats[n]['p50'])}/{ms(stats[n]['p95'])}/{ms(stats[n]['max'])}ms"
+            for n in names
+        )
+
+    def dump(self, path, **extra) -> Path:
+        path = Path(path)
+        report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), **extra, "ops": self.summary()}
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        return path
+
+    def reset(self) -> None:
+        self._ops.clear()
+
+
+TIMINGS = OpTimings()
+timed = TIMINGS.timed
+
+
 # ===== 메인 =====
 def main():
-    df = pd.read_excel(FILE_PATH, sheet_name=SHEET_NAME)
-    df = ensure_state_cols(df)
+    load_params()
+    # 영단어_store가 이 모듈을 불러오므로 순환 import를 피해 여기서 불러온다
+    store = importlib.import_module("영단어_store")
+    backend = store.open_decks()
+    if LEARNER:
+        backend = store.ProfileBackend(backend, LEARNER, journal=JOURNAL, fsync=JOURNAL_FSYNC)
+    # 범위를 미리 알고 있으므로 범위 밖 행은 읽으면서 건너뛴다(STREAM_LOAD)
+    df = backend.load(scope=(FILTER_MODE, CHAPTER_SPEC if FILTER_MODE == "chapter" else COUNT_SPEC))
+    if backend.recovered:
+        print(f"[복구] 저장되지 않았던 기록 {backend.recovered}건을 저널에서 되살렸습니다.")
 
     # 선택 범위 필터 (챕터 또는 단어수)
     sel_desc = ""
     if FILTER_MODE == "chapter":
-        df["챕터"] = df["Day"].apply(to_chapter_num)
-        want = parse_chapter_spec(CHAPTER_SPEC)
-        sub = df[df["챕터"].isin(want)].copy()
+        index = backend.chapter_index
+        if index is None or len(index) != len(df):
+            index = ChapterIndex.from_days(df["Day"])
+        df["챕터"] = index.numbers
+        positions = backend.select_positions("chapter", CHAPTER_SPEC)
+        if positions is None:
+            positions = index.positions(parse_chapter_spec(CHAPTER_SPEC))
         sel_desc = f"챕터 {CHAPTER_SPEC}"
     elif FILTER_MODE == "count":
-        positions = parse_count_spec(COUNT_SPEC)
-        df_reset = df.reset_index(drop=True)
-        zero_based = [p-1 for p in sorted(set(positions)) if 1 <= p <= len(df_reset)]
-        sub = df_reset.iloc[zero_based].copy()
+        positions = backend.select_positions("count", COUNT_SPEC)
+        if positions is None:
+            positions = parse_count_spec(COUNT_SPEC).shift(-1).clip(0, len(df) - 1).array()
         sel_desc = f"단어순서 {COUNT_SPEC}"
     else:
         print("FILTER_MODE는 'chapter' 또는 'count'만 지원합니다.")
         return
-    if sub.empty:
+    if not len(positions):
         print("선택한 범위에 단어가 없습니다.")
         return
-    cur_step = int(df["Tries"].sum())
+    # 학습 중 상태는 범위 안 카드 배열에 두고, 저장할 때만 df에 옮겨 쓴다(UI의 StudySession과 같음)
+    word_col, meaning_col = detect_card_columns(df)
+    cards = CardStore(df, positions, word_col, meaning_col)
+    cur_step = backend.start_step(df)
     asked = 0
-    print(f"학습 시작: {sel_desc}, 단어 {len(sub)}개, 현재 step={cur_step}")
+    print(f"학습 시작: {sel_desc}, 단어 {len(cards)}개, 현재 step={cur_step}")
+
+    def card_diff(pos, tries=None, fails=None):
+        tries = int(cards.tries[pos]) if tries is None else tries
+        fails = int(cards.fails[pos]) if fails is None else fails
+        return bayes_diff(get_prior(float(cards.level[pos])), K, fails, tries)
+
+    # 범위 안 위치(pos) 기준으로 스케줄러를 한 번만 만들고 이후엔 바뀐 카드만 갱신
+    _, diffs, _ = cards.scores(cur_step)
+    sched = make_scheduler(diffs, cards.last, cur_step)
+    # DUE_MODE: 복습 시각이 지난 카드가 있으면 그중 가장 이른 카드부터
+    due_index = DueIndex(cards.due)
+
+    # 같은 (단어, 뜻) 행들은 한 카드로 함께 기록한다. 표 전체와 범위 안 모두 두 행 이상인 키만 둔다
+    df_dups = build_duplicate_index(df[word_col], df[meaning_col])
+    sub_dups = build_duplicate_index(cards.word, cards.meaning)
+
+    def card_rows(pos):
+        """pos 카드와 같은 (단어, 뜻)인 (df 행, 범위 안 위치). 단어/뜻이 비었으면 자기 자신만."""
+        key = cards.key(pos)
+        return df_dups.get(key, [int(cards.rows[pos])]), sub_dups.get(key, [pos])
+
+    if df_dups:
+        print(f"[안내] 같은 (단어, 뜻) 행 {len(df_dups)}묶음은 한 카드로 함께 기록됩니다.")
+
+    # 난이도를 아직 받지 않은 새 카드 위치(매 문제마다 범위 전체를 훑지 않도록 한 번만 계산)
+    pending_init = deque(np.flatnonzero((cards.tries == 0) & np.isnan(cards.level)).tolist())
 
     while True:
         # --- 지연 초기화: 처음 만나는 카드면 난이도부터 받기 ---
-        for idx, row in sub.iterrows():
-            if int(row["Tries"]) == 0 and pd.isna(row["InitLevel"]):
-                print(f"\n[새 카드 난이도 체크] {row['단어']} / 뜻: {row['뜻']}")
-                while True:
-                    s = input("난이도(1=매우 쉬움, 2=쉬움, 3=어려움, 4=전혀 모름) > ").strip()
-                    if s in {"1","2","3","4"}:
-                        sub.loc[idx, "InitLevel"] = int(s)
-                        # 원본 df에도 반영(단어/뜻 매칭으로 동기화)
-                        mask = (df["단어"] == row["단어"]) & (df["뜻"] == row["뜻"])
-                        df.loc[mask, "InitLevel"] = int(s)
-                        break
-                    else:
-                        print("1~4 중에 골라.")
-
-        # --- risk 계산(정렬용) ---
-        rows = []
-        for idx, row in sub.iterrows():
-            tries = int(row["Tries"])
-            fails = int(row["Fails"])
-            last  = int(row["LastStep"])
-            prior = get_prior(row["InitLevel"])
-            diff  = bayes_diff(prior, K, fails, tries)
-            recn  = recency_norm(cur_step, last)
-            # prior=0(매우 쉬움)이라도 오래되면 ε*recn으로 살짝은 나오게
-            risk  = diff * recn
-            rows.append((idx, risk, diff, recn))
-
-        # risk 내림차순, 동률이면 recency 큰 순
-        rows.sort(key=lambda x: (x[1], x[3]), reverse=True)
-
-        # risk>0인 첫 카드 선택 (이론상 항상 존재, 방금 본 카드만 잔뜩이면 다음 루프로)
-        pick = next((r for r in rows if r[1] > 0), None)
-        if pick is None:
-            # 거의 안 생기지만, 모두 방금 본 카드면 한 턴 쉬고 진행
-            cur_step += 1
-            continue
+        while pending_init:
+            pos = pending_init.popleft()
+            if cards.tries[pos] != 0 or not np.isnan(cards.level[pos]):
+                continue  # 같은 카드의 다른 행에서 이미 받음
+            print(f"\n[새 카드 난이도 체크] {cards.word[pos]} / 뜻: {cards.meaning[pos]}")
+            while True:
+                s = input("난이도(1=매우 쉬움, 2=쉬움, 3=어려움, 4=전혀 모름) > ").strip()
+                if s in {"1","2","3","4"}:
+                    # 원본 df의 같은 카드 행에도 저장할 때 반영된다
+                    df_rows, sub_rows = card_rows(pos)
+                    cards.set_level(sub_rows, int(s), df_rows)
+                    for p in sub_rows:
+                        sched.update(p, card_diff(p), int(cards.last[p]), cur_step)
+                    backend.record_level(cards.key(pos), df_rows, int(s))
+                    break
+                else:
+                    print("1~4 중에 골라.")
 
-        idx_top, r_top, d_top, rn_top = pick
-        row = sub.loc[idx_top]
+        # --- risk 최상위 카드 (스케줄러) ---
+        # risk 내림차순, 동률이면 recency 큰 순 / risk>0인 카드만 출제
+        pos = due_index.next_due(int(time.time())) if DUE_MODE else None
+        if pos is None:
+            pos = sched.best(cur_step)
+            if pos is None or sched.risk(pos, cur_step)[0] <= 0:
+                # 거의 안 생기지만, 모두 방금 본 카드면 한 턴 쉬고 진행
+                cur_step += 1
+                continue
 
         # --- 문제 출제 ---
         print("\n" + "-"*60)
-        print(f"[Q] {row['단어']}")
+        print(f"[Q] {cards.word[pos]}")
         input("뜻 떠올렸으면 엔터 > ")
-        print(f"[A] {row['뜻']}")
+        print(f"[A] {cards.meaning[pos]}")
 
         # --- 자기신고 ---
         ans = input("맞았나? y/n  (q=종료) > ").strip().lower()
         if ans == "q":
             break
 
-        # --- 업데이트 (원본 df와 sub 모두) ---
-        mask = (df["단어"] == row["단어"]) & (df["뜻"] == row["뜻"])
-        df.loc[mask, "Tries"]     = df.loc[mask, "Tries"].astype(int) + 1
-        sub.loc[idx_top, "Tries"] = int(sub.loc[idx_top, "Tries"]) + 1
-        if ans == "n":
-            df.loc[mask, "Fails"]     = df.loc[mask, "Fails"].astype(int) + 1
-            sub.loc[idx_top, "Fails"] = int(sub.loc[idx_top, "Fails"]) + 1
-        df.loc[mask, "LastStep"]     = cur_step
-        sub.loc[idx_top, "LastStep"] = cur_step
+        # --- 업데이트 (같은 카드의 행 모두) ---
+        tries = int(cards.tries[pos]) + 1
+        fails = int(cards.fails[pos]) + (1 if ans == "n" else 0)
+        seen = int(time.time())
+        due = seen + due_interval(card_diff(pos, tries, fails), tries, fails)
+        df_rows, sub_rows = card_rows(pos)
+        cards.set_state(sub_rows, tries, fails, cur_step, seen, due, df_rows)
+        for p in sub_rows:
+            sched.update(p, card_diff(p), cur_step, cur_step)
+        due_index.set(sub_rows, due)
+        backend.record_answer(cards.key(pos), df_rows, cur_step, ans != "n", tries, fails, seen, due)
 
         cur_step += 1
         asked += 1
 
         # --- 자동 저장 ---
-        if asked % AUTOSAVE == 0:
-            df.to_excel(FILE_PATH, sheet_name=SHEET_NAME, index=False)
+        if backend.autosave_every and asked % backend.autosave_every == 0:
+            cards.flush(df)
+            backend.checkpoint(df)
             print(f"[자동 저장] {asked}문제 진행, step={cur_step}")
 
     # --- 최종 저장 & 요약 ---
-    df.to_excel(FILE_PATH, sheet_name=SHEET_NAME, index=False)
+    cards.flush(df)
+    backend.checkpoint(df, final=True)
+    backend.close()
     print("\n세션 종료. 저장 완료.")
 
     if SHOW_TOP10:
         # 오답률 상위 10 (베이지안 추정치 기준)
-        sub["diff_est"] = sub.apply(
-            lambda r: bayes_diff(get_prior(r["InitLevel"]), K, int(r["Fails"]), int(r["Tries"])),
-            axis=1
-        )
-        rep = sub.sort_values("diff_est", ascending=False)[["단어","뜻","Tries","Fails","diff_est"]].head(10)
-        if not rep.empty:
+        diffs = cards.scores(cur_step)[1]
+        top = np.argsort(-diffs, kind="stable")[:10]
+        if len(top):
             print("\n[오답률 상위 10]")
-            for _, r in rep.iterrows():
-                print(f"- {r['단어']}: {int(r['Fails'])}/{int(r['Tries'])} (diff≈{r['diff_est']:.2f})")
+            for pos in top.tolist():
+                print(f"- {cards.word[pos]}: {int(cards.fails[pos])}/{int(cards.tries[pos])} (diff≈{diffs[pos]:.2f})")
 
 if __name__ == "__main__":
+    # exe에서도 덱 파싱 프로세스를 띄울 수 있게
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
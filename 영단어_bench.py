@@ -0,0 +1,408 @@
+"""영단어 앱 성능 점검 스크립트.
+
+사용법:
+    python 영단어_bench.py importtime [--budget-ms 300] [--json]
+    python 영단어_bench.py suite [--sizes 1k,10k,100k] [--out result.json] [--baseline old.json]
+
+importtime: `python -X importtime`으로 UI 모듈을 불러와 모듈별 시간을 집계한다.
+설정 창이 pandas보다 먼저 뜰 수 있도록, UI를 import하는 것만으로 pandas/numpy/openpyxl이
+실제로 로드되면 실패(종료 코드 1)로 처리한다.
+
+suite: 실제 단어장과 같은 열 구성의 합성 엑셀(Day 챕터, 새 카드/학습한 카드 섞임)을
+크기별로 만들고 read_excel·불러오기·범위 선택·범위 바꾸기·복습 수 세기·출제·답안 기록·저장 시간을 잰다.
+tracemalloc으로 단계별 최대 메모리도 기록한다. 창을 띄우지 않으므로 화면 없이 돈다.
+--baseline으로 이전 결과 JSON을 주면 `--tolerance`배 넘게 느려진 단계를 실패로 처리한다.
+1M장은 엑셀 생성만 1분 넘게 걸리므로 `--sizes 1m`으로 따로 돌린다.
+합성 엑셀은 임시 폴더에 만들고 끝나면 지운다. 다음 실행에 다시 쓰려면 `--workdir 폴더 --keep`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    """`-X importtime` 출력 한 줄마다 {name, self_us, cumulative_us, depth}."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append(
+            {
+                "name": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": max(len(indent) - 1, 0) // 2,
+            }
+        )
+    return rows
+
+
+def measure_importtime(module: str = "영단어_ui") -> List[Dict[str, object]]:
+    code = f"import importlib; importlib.import_module({module!r})"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def run_importtime(args) -> int:
+    rows = measure_importtime(args.module)
+    total_ms = sum(row["self_us"] for row in rows) / 1000
+    heavy = sorted({row["name"] for row in rows if row["name"].split(".")[0] in HEAVY_MODULES})
+    top = sorted((row for row in rows if row["depth"] == 0), key=lambda row: -row["cumulative_us"])[: args.top]
+
+    failures = []
+    if heavy:
+        failures.append(f"무거운 모듈이 시작 시점에 로드됨: {', '.join(heavy[:10])}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"import 시간 {total_ms:.1f}ms > 예산 {args.budget_ms:.1f}ms")
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "module": args.module,
+                    "total_ms": round(total_ms, 3),
+                    "modules": len(rows),
+                    "heavy": heavy,
+                    "top": top,
+                    "failures": failures,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        print(f"{args.module} import: {total_ms:.1f}ms (모듈 {len(rows)}개)")
+        for row in top:
+            print(f"  {row['cumulative_us'] / 1000:8.1f}ms  {row['name']}")
+        for message in failures:
+            print(f"[실패] {message}")
+    return 1 if failures else 0
+
+
+CARDS_PER_DAY = 50
+SYNTHETIC_COLUMNS = ["단어", "뜻", "Day", "Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due"]
+NOISE_FLOOR = 0.005  # 이보다 짧은 차이는 회귀로 보지 않음(초)
+
+
+def parse_sizes(text: str) -> List[int]:
+    """'1k,10k,1m' → [1000, 10000, 1000000]."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        scale = {"k": 1_000, "m": 1_000_000}.get(part[-1], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def make_workbook(path: Path, cards: int, seed: int = 0) -> Path:
+    """단어/뜻/Day/상태 열을 가진 합성 단어장. 약 1/3은 새 카드(Tries=0), 그중 절반은 난이도 미지정.
+
+    푼 카드는 지난 30일 안에 봤고 Due가 지금 앞뒤 30일에 흩어져 있다.
+    """
+    np = importlib.import_module("numpy")
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    tries = rng.choice([0, 0, 1, 2, 5, 12], cards)
+    fails = np.minimum((rng.random(cards) * (tries + 1)).astype(int), tries)
+    last = np.where(tries > 0, rng.integers(1, max(int(tries.sum()), 2), cards), 0)
+    levels = rng.integers(1, 5, cards)
+    unset = (tries == 0) & (rng.random(cards) < 0.5)
+    now = int(time.time())
+    seen = np.where(tries > 0, now - rng.integers(0, 30 * 86400, cards), 0)
+    due = np.where(tries > 0, now + rng.integers(-30 * 86400, 30 * 86400, cards), 0)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(SYNTHETIC_COLUMNS)
+    for i in range(cards):
+        ws.append(
+            [
+                f"word{i}",
+                f"뜻{i}",
+                f"Day {i // CARDS_PER_DAY + 1}",
+                int(tries[i]),
+                int(fails[i]),
+                int(last[i]),
+                None if unset[i] else int(levels[i]),
+                int(seen[i]),
+                int(due[i]),
+            ]
+        )
+    tmp = path.with_name(path.name + ".tmp")
+    wb.save(tmp)
+    tmp.replace(path)
+    return path
+
+
+def measure(fn: Callable[[], object], repeat: int, memory: bool) -> Dict[str, object]:
+    """fn을 repeat번 재서 최솟값/평균을 돌려준다. memory면 한 번 더 돌려 tracemalloc 최대치를 잰다."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    result: Dict[str, object] = {"seconds": round(min(times), 6), "mean": round(sum(times) / len(times), 6)}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def bench_size(path: Path, cards: int, args) -> List[Dict[str, object]]:
+    core = importlib.import_module("영단어")
+    store = importlib.import_module("영단어_store")
+    ui = importlib.import_module("영단어_ui")
+    pd = importlib.import_module("pandas")
+    np = importlib.import_module("numpy")
+
+    rows: List[Dict[str, object]] = []
+
+    def record(op: str, result: Dict[str, object], per: Optional[int] = None) -> None:
+        row = {"cards": cards, "op": op, "runs": 1 if per else args.repeat, **result}
+        if per:
+            row["per_op_us"] = round(result["seconds"] / per * 1e6, 2)
+        rows.append(row)
+        if not args.json:
+            extra = f"  {row['per_op_us']:9.1f}us/회" if per else ""
+            peak = f"  최대 {row['peak_kib'] / 1024:8.1f}MiB" if "peak_kib" in row else ""
+            print(f"  {cards:>9,}장 {op:<18} {row['seconds']:9.3f}s{extra}{peak}", flush=True)
+
+    def backend():
+        if args.storage == "excel":
+            return store.ExcelBackend(path, "Sheet1", journal=False)
+        return store.open_backend(path, "Sheet1", args.storage)
+
+    def load(cache: bool):
+        core.PARSE_CACHE = cache
+        return backend().load()
+
+    record("read_excel", measure(lambda: pd.read_excel(path, sheet_name="Sheet1"), args.repeat, args.memory))
+    record("load", measure(lambda: load(False), args.repeat, args.memory))
+    load(True)  # 캐시 만들기
+    record("load_cached", measure(lambda: load(True), args.repeat, args.memory))
+
+    b = backend()
+    core.PARSE_CACHE = False
+    df = b.load()
+    days = math.ceil(cards / CARDS_PER_DAY)
+    full = f"1-{cards}"
+    record(
+        "session_init",
+        measure(lambda: ui.StudySession(df, "count", "", full, backend=b), args.repeat, args.memory),
+    )
+
+    chapter = ui.StudySession(df, "chapter", f"1-{max(days // 2, 1)}", "", backend=b)
+    record("build_subset", measure(chapter._build_subset, args.repeat, args.memory))
+    record("switch_range", measure(lambda: chapter.switch_range("count", "", full), args.repeat, args.memory))
+    # 설정 창의 '오늘 복습할 카드' 수: 색인을 만들고(정렬) 한 번 센다
+    record(
+        "due_count",
+        measure(lambda: core.DueIndex(df["Due"]).count(core.day_end()), args.repeat, args.memory),
+    )
+
+    session = ui.StudySession(df, "count", "", full, backend=b)
+    rng = np.random.default_rng(args.seed)
+
+    def answer_loop() -> Dict[str, float]:
+        split = {"choose_next_card": 0.0, "record_answer": 0.0}
+        for _ in range(args.steps):
+            start = time.perf_counter()
+            pick = session.choose_next_card()
+            mid = time.perf_counter()
+            if pick is None:
+                break
+            session.record_answer(pick[0], bool(rng.random() < 0.7))
+            split["choose_next_card"] += mid - start
+            split["record_answer"] += time.perf_counter() - mid
+        return split
+
+    # 출제/기록은 한 번이 짧아 args.steps번을 이어서 재고 회당 시간으로 나눈다
+    split = answer_loop()
+    peak = None
+    if args.memory:
+        tracemalloc.start()
+        try:
+            answer_loop()
+            peak = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    for op, seconds in split.items():
+        result: Dict[str, object] = {"seconds": round(seconds, 6), "mean": round(seconds, 6)}
+        if peak is not None:
+            result["peak_kib"] = peak
+        record(op, result, per=args.steps)
+
+    record("save", measure(lambda: b.checkpoint(session.df, final=True), args.repeat, args.memory))
+    return rows
+
+
+def compare(results: List[Dict[str, object]], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """기준 결과보다 tolerance배 넘게 느려진 (크기, 단계) 목록."""
+    before = {(row["cards"], row["op"]): row["seconds"] for row in baseline.get("results", [])}
+    failures = []
+    for row in results:
+        old = before.get((row["cards"], row["op"]))
+        if old is None:
+            continue
+        row["baseline_seconds"] = old
+        if row["seconds"] > old * tolerance and row["seconds"] - old > NOISE_FLOOR:
+            failures.append(
+                f"{row['cards']:,}장 {row['op']}: {row['seconds']:.3f}s > 기준 {old:.3f}s × {tolerance:g}"
+            )
+    return failures
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def bench_sizes(workdir: Path, args) -> List[Dict[str, object]]:
+    """workdir에 크기별 합성 엑셀을 만들고(--keep이면 있는 것을 다시 쓰고) bench_size를 돌린다."""
+    # 첫 호출의 import·초기화 비용이 첫 크기 결과에 섞이지 않도록 작은 단어장으로 한 번 돌려 둔다
+    warmup = argparse.Namespace(**{**vars(args), "repeat": 1, "steps": 10, "memory": False, "json": True})
+    bench_size(make_workbook(workdir / "warmup.xlsx", 100, args.seed), 100, warmup)
+
+    results: List[Dict[str, object]] = []
+    for cards in parse_sizes(args.sizes):
+        path = workdir / f"synthetic_{cards}_{args.seed}.xlsx"
+        if not (args.keep and path.exists()):
+            start = time.perf_counter()
+            make_workbook(path, cards, args.seed)
+            if not args.json:
+                print(f"{cards:,}장 엑셀 생성 {time.perf_counter() - start:.1f}초 ({path})", flush=True)
+        # 저장 단계가 상태 열을 바꾸므로 사본에서 재서 원본은 다음 실행에도 같은 상태로 둔다
+        work = path.with_name(path.stem + ".work.xlsx")
+        shutil.copyfile(path, work)
+        results.extend(bench_size(work, cards, args))
+    return results
+
+
+def run_suite(args) -> int:
+    core = importlib.import_module("영단어")
+    core.SCHEDULE = args.schedule
+    core.SAMPLE_TEMPERATURE = args.temperature
+    core.SAMPLE_SEED = args.seed
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = bench_sizes(workdir, args)
+    else:
+        # 합성 엑셀은 크기별로 수백 MB가 될 수 있어 임시 폴더는 끝나면 지운다
+        with tempfile.TemporaryDirectory(prefix="영단어_bench_", ignore_cleanup_errors=True) as tmp:
+            results = bench_sizes(Path(tmp), args)
+
+    failures: List[str] = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance)
+
+    report = {
+        "suite": "ops",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "steps": args.steps,
+        "seed": args.seed,
+        "schedule": args.schedule,
+        "storage": args.storage,
+        "results": results,
+        "failures": failures,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    if args.json:
+        print(text)
+    else:
+        for message in failures:
+            print(f"[실패] {message}")
+    return 1 if failures else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="영단어 앱 성능 점검")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    importtime = sub.add_parser("importtime", help="UI 모듈 import 시간 측정")
+    importtime.add_argument("--module", default="영단어_ui")
+    importtime.add_argument("--budget-ms", type=float, default=None, help="넘으면 실패로 처리할 전체 import 시간")
+    importtime.add_argument("--top", type=int, default=10)
+    importtime.add_argument("--json", action="store_true")
+    importtime.set_defaults(func=run_importtime)
+
+    suite = sub.add_parser("suite", help="합성 단어장으로 단계별 시간/메모리 측정")
+    suite.add_argument("--sizes", default="1k,10k,100k", help="카드 수 목록(예: 1k,10k,100k,1m)")
+    suite.add_argument("--repeat", type=int, default=3, help="단계마다 반복 횟수(최솟값 기록)")
+    suite.add_argument("--steps", type=int, default=500, help="출제/답안 기록 반복 횟수")
+    suite.add_argument("--seed", type=int, default=0, help="합성 단어장·답안·sample 출제의 시드")
+    suite.add_argument("--schedule", choices=("greedy", "sample"), default="greedy", help="출제 방식(SCHEDULE)")
+    suite.add_argument("--temperature", type=float, default=1.0, help="sample 출제 온도(SAMPLE_TEMPERATURE)")
+    suite.add_argument(
+        "--storage",
+        choices=("excel", "sqlite", "mmap"),
+        default="excel",
+        help="상태 저장 방식(excel은 저널 없이 세션 비용만, sqlite/mmap은 답안 기록에 저장까지 포함)",
+    )
+    suite.add_argument("--workdir", default=None, help="합성 엑셀을 둘 폴더(기본: 임시 폴더)")
+    suite.add_argument(
+        "--keep", action="store_true", help="--workdir에 있는 합성 엑셀을 다시 만들지 않음(--workdir 필요)"
+    )
+    suite.add_argument("--no-memory", dest="memory", action="store_false", help="tracemalloc 측정 생략")
+    suite.add_argument("--out", default=None, help="결과 JSON 파일")
+    suite.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    suite.add_argument("--tolerance", type=float, default=1.5, help="기준 대비 이 배수를 넘으면 실패")
+    suite.add_argument("--json", action="store_true")
+    suite.set_defaults(func=run_suite)
+
+    args = parser.parse_args(argv)
+    if args.command == "suite" and args.keep and not args.workdir:
+        # 임시 폴더는 실행마다 새로 만들고 지우므로 남겨 둘 엑셀이 없다
+        suite.error("--keep은 --workdir와 함께 써야 합니다")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""영단어 학습 시뮬레이터.
+
+사용법:
+    python 영단어_sim.py [--learners 16] [--decks 1] [--cards 300] [--reviews 1500]
+                         [--model forgetting] [--k 3] [--prior 0,0.3,0.6,0.9] [--workers 0] [--json]
+                         [--schedule greedy|sample] [--temperature 1.0]
+
+StudySession을 창 없이 돌리고, 가상 학습자(기억 모델)가 출제된 카드의 정답 여부를 정한다.
+K·PRIOR_MAP·risk 규칙을 바꿨을 때 손으로 공부해 보지 않고도 결과를 비교하려는 용도다.
+
+- 덱마다 단어 난이도(0~1)를 만들고, 학습자마다 조금씩 흔들어 숨은 난이도로 쓴다.
+- 새 카드 난이도(InitLevel)는 학습자가 숨은 난이도를 보고 스스로 매긴다(잡음 포함).
+- 기억 모델은 MODELS에서 이름으로 고르거나 `모듈:클래스`로 직접 넘긴다(RecallModel 상속).
+- 학습자 × 덱 조합을 프로세스 풀에서 나눠 돌린다(--workers, 0이면 CPU 수).
+
+지표: 기억률(모든 카드의 기억 확률 평균, 구간마다), 정답률, 본 카드 비율,
+난이도 추정 순위상관(앱의 diff 추정치 ↔ 숨은 난이도, 본 카드만), 목표 기억률 도달 step,
+처리량(장/초).
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+core = importlib.import_module("영단어")
+np = core.lazy_import("numpy")
+pd = core.lazy_import("pandas")
+
+
+# ===== 기억 모델 =====
+class RecallModel:
+    """가상 학습자. 카드별 숨은 상태를 갖고 정답 여부를 정한다.
+
+    difficulty: 카드별 숨은 난이도(0=쉬움, 1=어려움). 난이도 추정 순위상관의 기준이 된다.
+    """
+
+    def __init__(self, difficulty, rng) -> None:
+        self.difficulty = np.asarray(difficulty, dtype=float)
+        self.rng = rng
+
+    def init_level(self, card: int) -> int:
+        """새 카드 자기 평가(1=매우 익숙 ~ 4=잘 모름). 숨은 난이도에 잡음을 섞어 4등분한다."""
+        noisy = self.difficulty[card] + self.rng.normal(0, 0.1)
+        return int(min(max(math.floor(noisy * 4) + 1, 1), 4))
+
+    def p_recall(self, step: int):
+        """step 시점 모든 카드의 기억 확률 배열."""
+        raise NotImplementedError
+
+    def answer(self, card: int, step: int) -> bool:
+        """card를 step에 물었을 때 맞히는지. 모델 상태도 갱신한다."""
+        raise NotImplementedError
+
+
+class FixedRecall(RecallModel):
+    """잊지도 늘지도 않는 학습자. 정답 확률이 늘 1-난이도라 추정치 수렴을 보기에 좋다."""
+
+    def p_recall(self, step: int):
+        return 1.0 - self.difficulty
+
+    def answer(self, card: int, step: int) -> bool:
+        return bool(self.rng.random() < 1.0 - self.difficulty[card])
+
+
+class ForgettingCurve(RecallModel):
+    """지수 망각 곡선. 기억 확률 = exp(-(지난 step) / 안정도).
+
+    처음 보는 카드는 (1-난이도)² 확률로 이미 알고 있다. 맞히면 안정도가 난이도에 따라
+    커지고, 틀리면 줄어들지만 정답을 다시 보므로 처음 배운 직후보다 낮아지지는 않는다.
+    시간 단위는 앱과 같은 step(답안 한 번 = 1)이다.
+    """
+
+    BASE = 400.0     # 첫 학습 직후 안정도(쉬운 카드 기준, step)
+    MIN = 20.0
+    GROWTH = 1.8     # 맞혔을 때 안정도 배수(쉬울수록 더 커짐)
+
+    def __init__(self, difficulty, rng) -> None:
+        super().__init__(difficulty, rng)
+        n = len(self.difficulty)
+        self.seen = np.zeros(n, dtype=bool)
+        self.last = np.zeros(n, dtype=np.int64)
+        self.stability = np.full(n, self.MIN)
+
+    def p_recall(self, step: int):
+        known = (1.0 - self.difficulty) ** 2
+        elapsed = np.maximum(step - self.last, 0)
+        return np.where(self.seen, np.exp(-elapsed / self.stability), known)
+
+    def answer(self, card: int, step: int) -> bool:
+        d = self.difficulty[card]
+        if self.seen[card]:
+            p = math.exp(-max(step - self.last[card], 0) / self.stability[card])
+        else:
+            p = (1.0 - d) ** 2
+        correct = bool(self.rng.random() < p)
+        learned = self.MIN + self.BASE * (1.0 - d)
+        if not self.seen[card]:
+            self.stability[card] = learned
+        elif correct:
+            self.stability[card] *= self.GROWTH + 1.5 * (1.0 - d)
+        else:
+            self.stability[card] = max(self.stability[card] * 0.5, learned)
+        self.seen[card] = True
+        self.last[card] = step
+        return correct
+
+
+MODELS = {"forgetting": ForgettingCurve, "fixed": FixedRecall}
+
+
+def load_model(name: str) -> type:
+    """MODELS의 이름 또는 `모듈:클래스`."""
+    if ":" in name:
+        module, _, attr = name.partition(":")
+        return getattr(importlib.import_module(module), attr)
+    try:
+        return MODELS[name]
+    except KeyError:
+        raise ValueError(f"기억 모델 '{name}'이 없습니다. (가능: {', '.join(MODELS)} 또는 모듈:클래스)") from None
+
+
+# ===== 세션 한 번 =====
+def deck_difficulty(cards: int, seed: int):
+    """덱의 단어 난이도. 대부분 중간, 양 끝은 드물게(Beta(2, 2))."""
+    return np.random.default_rng([seed, 0]).beta(2, 2, cards)
+
+
+def synthetic_frame(cards: int):
+    """처음 공부하는 단어장(상태 열이 모두 비어 있음)."""
+    return pd.DataFrame(
+        {
+            "단어": [f"word{i}" for i in range(cards)],
+            "뜻": [f"뜻{i}" for i in range(cards)],
+            "Day": [f"Day {i // 50 + 1}" for i in range(cards)],
+            "Tries": 0,
+            "Fails": 0,
+            "LastStep": 0,
+            "InitLevel": np.nan,
+        }
+    )
+
+
+def _rank_corr(a, b) -> Optional[float]:
+    if len(a) < 3:
+        return None
+    ra = pd.Series(a).rank().to_numpy()
+    rb = pd.Series(b).rank().to_numpy()
+    if ra.std() == 0 or rb.std() == 0:
+        return None
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def run_learner(job: Dict[str, object]) -> Dict[str, object]:
+    """학습자 한 명이 덱 하나를 reviews번 복습한다. 프로세스 풀에서도 불린다."""
+    ui = importlib.import_module("영단어_ui")
+    cards, reviews, every = job["cards"], job["reviews"], job["every"]
+    rng = np.random.default_rng([job["deck"], job["learner"], 1])
+    difficulty = np.clip(deck_difficulty(cards, job["deck"]) + rng.normal(0, 0.1, cards), 0.0, 1.0)
+    model = load_model(job["model"])(difficulty, rng)
+
+    started = time.perf_counter()
+    session = ui.StudySession(synthetic_frame(cards), "count", "", f"1-{cards}")
+    if isinstance(session.scheduler, core.RiskSampler):
+        # 학습자마다 다르게, 같은 --seed면 같은 출제 순서
+        session.scheduler.reseed(job["deck"] * 1_000_003 + job["learner"])
+    # 번호 범위 전체를 골랐으므로 세션 색인 = 카드 번호
+    session.set_init_levels({idx: model.init_level(int(idx)) for idx, _, _ in session.pending_init_cards()})
+
+    retention: List[float] = []
+    rank_corr: List[Optional[float]] = []
+    correct_total = 0
+    reached = None
+    for done in range(1, reviews + 1):
+        pick = session.choose_next_card()
+        if pick is None:
+            break
+        idx = int(pick[0])
+        correct = model.answer(idx, session.cur_step)
+        correct_total += correct
+        session.record_answer(idx, correct)
+        if done % every == 0 or done == reviews:
+            kept = float(model.p_recall(session.cur_step).mean())
+            retention.append(kept)
+            if reached is None and kept >= job["target"]:
+                reached = session.cur_step
+            seen = session.cards.tries > 0
+            diffs = session.cards.scores(session.cur_step)[1]
+            rank_corr.append(_rank_corr(diffs[seen], difficulty[seen]))
+    seconds = time.perf_counter() - started
+
+    asked = session.asked
+    total = session.stats.total
+    return {
+        "deck": job["deck"],
+        "learner": job["learner"],
+        "reviews": asked,
+        "seconds": seconds,
+        "cards_per_sec": asked / seconds if seconds > 0 else None,
+        "accuracy": correct_total / asked if asked else None,
+        "coverage": 1 - total.new / total.cards,
+        "retention": retention,
+        "rank_corr": rank_corr,
+        "steps_to_target": reached,
+    }
+
+
+# ===== 여러 학습자 =====
+def _init_worker(settings: Dict[str, object]) -> None:
+    for name, value in settings.items():
+        setattr(core, name, value)
+
+
+def run_all(jobs: List[Dict[str, object]], workers: int, settings: Dict[str, object]) -> tuple:
+    """jobs를 프로세스 풀에서 나눠 돌린다. 반환: (결과 목록, 쓴 프로세스 수)"""
+    _init_worker(settings)
+    count = min(workers or os.cpu_count() or 1, len(jobs))
+    if count <= 1:
+        return [run_learner(job) for job in jobs], 1
+    with ProcessPoolExecutor(
+        max_workers=count,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(settings,),
+    ) as pool:
+        return list(pool.map(run_learner, jobs, chunksize=max(len(jobs) // (count * 4), 1))), count
+
+
+def _quantile(values: List[float], q: float) -> Optional[float]:
+    return float(np.quantile(values, q)) if values else None
+
+
+def summarize(results: List[Dict[str, object]], wall: float, workers: int) -> Dict[str, object]:
+    final = [r["retention"][-1] for r in results if r["retention"]]
+    corr = [r["rank_corr"][-1] for r in results if r["rank_corr"] and r["rank_corr"][-1] is not None]
+    reached = [r["steps_to_target"] for r in results if r["steps_to_target"] is not None]
+    reviews = sum(r["reviews"] for r in results)
+    busy = sum(r["seconds"] for r in results)
+    curve_len = min((len(r["retention"]) for r in results), default=0)
+    return {
+        "sessions": len(results),
+        "retention": _quantile(final, 0.5) if final else None,
+        "retention_mean": float(np.mean(final)) if final else None,
+        "retention_p10": _quantile(final, 0.1),
+        "retention_p90": _quantile(final, 0.9),
+        "retention_curve": [float(np.mean([r["retention"][i] for r in results])) for i in range(curve_len)],
+        "accuracy": float(np.mean([r["accuracy"] for r in results if r["accuracy"] is not None] or [np.nan])),
+        "coverage": float(np.mean([r["coverage"] for r in results])) if results else None,
+        "rank_corr": float(np.mean(corr)) if corr else None,
+        "steps_to_target": _quantile(reached, 0.5),
+        "reached_target": len(reached),
+        "reviews": reviews,
+        "seconds": wall,
+        "workers": workers,
+        "cards_per_sec": reviews / wall if wall > 0 else None,
+        "cards_per_sec_per_worker": reviews / busy if busy > 0 else None,
+    }
+
+
+def _fmt(value, spec: str = ".3f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="가상 학습자로 StudySession을 돌려 기억률·수렴·처리량을 잰다")
+    parser.add_argument("--learners", type=int, default=16, help="덱마다 학습자 수")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--cards", type=int, default=300, help="덱마다 카드 수")
+    parser.add_argument("--reviews", type=int, default=1500, help="학습자마다 답안 수")
+    parser.add_argument("--every", type=int, default=0, help="지표를 잴 간격(답안 수, 0이면 reviews/10)")
+    parser.add_argument("--target", type=float, default=0.8, help="도달 step을 잴 기억률")
+    parser.add_argument("--model", default="forgetting", help=f"기억 모델({', '.join(MODELS)} 또는 모듈:클래스)")
+    parser.add_argument("--k", type=float, default=None, help="K 대신 쓸 값")
+    parser.add_argument("--prior", default=None, help="PRIOR_MAP 1~4 대신 쓸 값(예: 0,0.3,0.6,0.9)")
+    parser.add_argument("--schedule", choices=("greedy", "sample"), default=None, help="SCHEDULE 대신 쓸 출제 방식")
+    parser.add_argument("--temperature", type=float, default=None, help="SAMPLE_TEMPERATURE 대신 쓸 값")
+    parser.add_argument("--workers", type=int, default=0, help="프로세스 수(0=CPU 수, 1=이 프로세스에서 차례로)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--out", default=None, help="결과 JSON 파일(학습자별 결과 포함)")
+    args = parser.parse_args(argv)
+
+    try:
+        load_model(args.model)  # 이름이 틀렸으면 프로세스를 띄우기 전에 알린다
+    except (ValueError, ImportError, AttributeError) as exc:
+        parser.error(str(exc))
+    # 작업 프로세스는 영단어.py를 새로 import하므로 맞춘 값도 설정으로 넘긴다
+    core.load_params()
+    settings: Dict[str, object] = {"K": core.K, "PRIOR_MAP": core.PRIOR_MAP}
+    if args.k is not None:
+        settings["K"] = args.k
+    if args.prior is not None:
+        values = [float(v) for v in args.prior.split(",")]
+        if len(values) != 4:
+            parser.error("--prior는 난이도 1~4에 해당하는 값 4개여야 합니다.")
+        settings["PRIOR_MAP"] = dict(zip(range(1, 5), values))
+    if args.schedule is not None:
+        settings["SCHEDULE"] = args.schedule
+    if args.temperature is not None:
+        if not args.temperature > 0:
+            parser.error("--temperature는 0보다 커야 합니다.")
+        settings["SAMPLE_TEMPERATURE"] = args.temperature
+
+    every = args.every or max(args.reviews // 10, 1)
+    jobs = [
+        {
+            "deck": args.seed + deck,
+            "learner": learner,
+            "cards": args.cards,
+            "reviews": args.reviews,
+            "every": every,
+            "target": args.target,
+            "model": args.model,
+        }
+        for deck in range(args.decks)
+        for learner in range(args.learners)
+    ]
+
+    started = time.perf_counter()
+    results, workers = run_all(jobs, args.workers, settings)
+    summary = summarize(results, time.perf_counter() - started, workers)
+    report = {
+        "model": args.model,
+        "K": core.K,
+        "PRIOR_MAP": {str(k): v for k, v in core.PRIOR_MAP.items()},
+        "schedule": core.SCHEDULE,
+        "temperature": core.SAMPLE_TEMPERATURE if core.SCHEDULE == "sample" else None,
+        "cards": args.cards,
+        "every": every,
+        "target": args.target,
+        "summary": summary,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({**report, "sessions": results}, fh, ensure_ascii=False, indent=2)
+            fh.write("\n")
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    print(
+        f"학습자 {args.learners}명 × 덱 {args.decks}개, 카드 {args.cards}장, 답안 {args.reviews}회, "
+        f"모델 {args.model} (K={core.K}, PRIOR_MAP={core.PRIOR_MAP}), 출제 {core.SCHEDULE}"
+        + (f"(온도 {core.SAMPLE_TEMPERATURE:g})" if core.SCHEDULE == "sample" else "")
+    )
+    print(
+        f"최종 기억률 {_fmt(summary['retention'])} (p10 {_fmt(summary['retention_p10'])}, "
+        f"p90 {_fmt(summary['retention_p90'])}) | 정답률 {_fmt(summary['accuracy'])} | "
+        f"본 카드 {_fmt(summary['coverage'], '.0%')}"
+    )
+    print(
+        f"난이도 추정 순위상관 {_fmt(summary['rank_corr'])} | 기억률 {args.target:g} 도달 step 중앙값 "
+        f"{_fmt(summary['steps_to_target'], '.0f')} ({summary['sessions']}명 중 {summary['reached_target']}명)"
+    )
+    print("기억률 추이: " + " ".join(f"{v:.2f}" for v in summary["retention_curve"]))
+    print(
+        f"처리량 {_fmt(summary['cards_per_sec'], ',.0f')}장/초 (프로세스 {workers}개, 1개당 "
+        f"{_fmt(summary['cards_per_sec_per_worker'], ',.0f')}장/초), 걸린 시간 {summary['seconds']:.1f}초"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
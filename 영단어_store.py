@@ -0,0 +1,1689 @@
+"""단어장 저장 계층.
+
+Tk 메인 루프가 엑셀 저장(to_excel) 때문에 멈추지 않도록 저장은 전용 스레드가 맡는다.
+학습 상태를 어디에 두는지는 백엔드가 정한다.
+
+- ExcelBackend  : 엑셀이 원본. 답안은 저널에 한 줄씩 먼저 쓰고 엑셀에는 가끔 합친다.
+- SqliteBackend : 엑셀 옆 .sqlite3가 원본. 답안마다 한 행 UPDATE, 엑셀은 가져오기/내보내기용.
+- MmapBackend   : 엑셀 옆 .state.bin(카드마다 고정 길이 레코드)을 mmap으로 열어 답안마다 레코드 하나만 고친다.
+- DeckSet       : 단어장 폴더의 여러 엑셀(덱)을 한 표로 묶고, 기록·저장은 덱마다 위 백엔드에 넘긴다.
+- ProfileBackend: 학습자별 상태. 단어장은 위 백엔드로 읽기만 하고, 상태는 학습자 파일에만 쓴다.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+core = importlib.import_module("영단어")
+xlsx = importlib.import_module("영단어_xlsx")
+np = core.lazy_import("numpy")
+pd = core.lazy_import("pandas")
+
+
+class WorkbookWriter:
+    """엑셀 저장 전용 스레드.
+
+    submit()은 호출 시점의 DataFrame 사본(스냅샷)만 넘겨 두고 바로 돌아온다.
+    저장 중에 같은 파일·시트로 요청이 여러 번 쌓이면 마지막 스냅샷 하나만 쓴다(덱이 여러 개면 덱마다).
+    파일은 core.write_excel_atomic(또는 submit에 준 write)으로 임시 파일 → 교체 방식으로 쓴다.
+    결과는 events 큐에 ("saved", seq, 걸린 초) / ("error", seq, 예외)로 쌓이고,
+    UI는 after()로 drain()을 주기적으로 불러 상태를 표시한다. 실패한 저장은 같은 파일·시트가
+    나중에 저장될 때까지 errors에 남으므로, 종료할 때 raise_errors()로 확인한다.
+    """
+
+    def __init__(self, path, sheet_name: str) -> None:
+        self.path = path
+        self.sheet_name = sheet_name
+        self.events: "queue.Queue[Tuple[str, int, object]]" = queue.Queue()
+        # (경로, 시트) → 마지막 저장에서 난 예외. 그 대상이 다시 저장되면 지운다
+        self.errors: Dict[Tuple[str, str], BaseException] = {}
+        self._cond = threading.Condition()
+        # (경로, 시트) → (처음 요청 번호, 마지막 요청 번호, 스냅샷, 콜백들, 쓰는 함수)
+        self._pending: Dict[Tuple[str, str], Tuple[int, int, object, list, Callable]] = {}
+        self._seq = 0
+        self._done_seq = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="workbook-writer", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        df,
+        on_saved: Optional[Callable[[object], None]] = None,
+        path=None,
+        sheet_name: Optional[str] = None,
+        write: Optional[Callable[[object, str, str], None]] = None,
+    ) -> int:
+        """on_saved(스냅샷)는 이 스냅샷(또는 이를 덮어쓴 더 새 스냅샷)이 저장된 뒤 저장 스레드에서 불린다.
+
+        path/sheet_name을 주지 않으면 만들 때 받은 엑셀에 쓴다. write(스냅샷, 경로, 시트)를 주면
+        엑셀 대신 그 함수로 쓴다(학습자 파일 등).
+        """
+        snapshot = df.copy()
+        target = (str(path if path is not None else self.path), sheet_name or self.sheet_name)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("저장 스레드가 이미 종료되었습니다.")
+            self._seq += 1
+            first, _, _, callbacks, _ = self._pending.get(target, (self._seq, 0, None, [], None))
+            if on_saved is not None:
+                callbacks.append(on_saved)
+            self._pending[target] = (first, self._seq, snapshot, callbacks, write or core.write_excel_atomic)
+            self._cond.notify_all()
+            return self._seq
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._done_seq < self._seq
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # 가장 오래 기다린 요청부터
+                target = min(self._pending, key=lambda t: self._pending[t][0])
+                _, seq, snapshot, callbacks, write = self._pending.pop(target)
+
+            started = time.perf_counter()
+            try:
+                write(snapshot, target[0], target[1])
+            except Exception as exc:
+                with self._cond:
+                    self.errors[target] = exc
+                self.events.put(("error", seq, exc))
+            else:
+                with self._cond:
+                    self.errors.pop(target, None)
+                for callback in callbacks:
+                    with contextlib.suppress(Exception):
+                        callback(snapshot)
+                elapsed = time.perf_counter() - started
+                core.TIMINGS.add("save_write", elapsed)
+                self.events.put(("saved", seq, elapsed))
+
+            with self._cond:
+                # 아직 남은 요청이 있으면 그중 가장 이른 요청 직전까지만 끝난 것으로 본다
+                self._done_seq = min((entry[0] for entry in self._pending.values()), default=self._seq + 1) - 1
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 들어온 요청이 모두 쓰일 때까지 최대 timeout초 기다린다."""
+        with self._cond:
+            target = self._seq
+            return self._cond.wait_for(lambda: self._done_seq >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        done = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return done
+
+    def raise_errors(self) -> None:
+        """저장에 실패한 채 남은 대상이 있으면 그 예외를 낸다. 여럿이면 파일마다 한 줄로 모은다."""
+        with self._cond:
+            errors = list(self.errors.items())
+        if len(errors) == 1:
+            raise errors[0][1]
+        if errors:
+            raise RuntimeError("\n".join(f"{Path(path).name} ({sheet}): {exc}" for (path, sheet), exc in errors))
+
+    def drain(self) -> List[Tuple[str, int, object]]:
+        items = []
+        while True:
+            try:
+                items.append(self.events.get_nowait())
+            except queue.Empty:
+                return items
+
+
+def sidecar_path(workbook_path, sheet_name: Optional[str], suffix: str) -> Path:
+    """엑셀 옆 보조 파일 경로. SHEET_NAME이 아닌 시트(ALL_SHEETS 덱)는 이름에 시트 이름을 넣는다."""
+    workbook_path = Path(workbook_path)
+    name = workbook_path.name
+    if sheet_name is not None and sheet_name != core.SHEET_NAME:
+        name += "." + "".join("_" if ch in '<>"|' else ch for ch in sheet_name)
+    return workbook_path.with_name(name + suffix)
+
+
+class AnswerJournal:
+    """답안 저널(JSON Lines). 엑셀 옆에 `<엑셀 파일명>.journal`로 쌓인다.
+
+    한 줄이 답안 한 건이다. 키(단어, 뜻)·원본 행 번호·step·정답 여부·시각과 함께
+    갱신 후 Tries/Fails/LastSeen/Due 값을 그대로 적어 두므로, 같은 줄을 두 번 재생해도 결과가 같다.
+    저장 직전에 rotate()로 지금까지의 저널을 번호 붙은 조각으로 봉인하고,
+    엑셀 저장이 끝나면 discard()로 그 조각까지 지운다.
+    """
+
+    SUFFIX = ".journal"
+
+    def __init__(self, path, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self._fh = None
+        self._last_segment = 0
+
+    @classmethod
+    def for_workbook(cls, workbook_path, fsync: bool = False, sheet_name: Optional[str] = None) -> "AnswerJournal":
+        return cls(sidecar_path(workbook_path, sheet_name, cls.SUFFIX), fsync=fsync)
+
+    # --- 기록 ---
+    def _write(self, *records: Dict[str, object]) -> None:
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write("".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records))
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+
+    @staticmethod
+    def _key_fields(key, row: int) -> Dict[str, object]:
+        fields: Dict[str, object] = {"r": int(row)}
+        if key is not None:
+            word, meaning = _json_value(key[0]), _json_value(key[1])
+            # 날짜 등 JSON으로 되살릴 수 없는 키는 행 번호로만 찾는다
+            if isinstance(word, (str, int, float)) and isinstance(meaning, (str, int, float)):
+                fields["w"], fields["m"] = word, meaning
+        return fields
+
+    def append_answer(
+        self, key, row: int, step: int, correct: bool, tries: int, fails: int, seen: int, due: int
+    ) -> None:
+        record = self._key_fields(key, row)
+        record.update(
+            s=int(step), c=int(bool(correct)), t=round(time.time(), 3), tr=int(tries), fa=int(fails),
+            ls=int(seen), du=int(due),
+        )
+        self._write(record)
+
+    def append_level(self, key, row: int, level: int) -> None:
+        self.append_levels([(key, row, level)])
+
+    def append_levels(self, entries) -> None:
+        """(키, 행, 난이도) 여러 건을 한 번에 쓴다(flush/fsync 한 번)."""
+        now = round(time.time(), 3)
+        records = []
+        for key, row, level in entries:
+            record = self._key_fields(key, row)
+            record.update(lv=int(level), t=now)
+            records.append(record)
+        if records:
+            self._write(*records)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # --- 봉인 / 정리 ---
+    def _segments(self) -> List[Tuple[int, Path]]:
+        found = []
+        for path in self.path.parent.glob(self.path.name + ".*"):
+            suffix = path.name[len(self.path.name) + 1:]
+            if suffix.isdigit():
+                found.append((int(suffix), path))
+        return sorted(found)
+
+    def rotate(self) -> Optional[int]:
+        """현재 저널을 번호 붙은 조각으로 봉인하고 그 번호를 돌려준다. 비어 있으면 None."""
+        self.close()
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        segments = self._segments()
+        # 저장 스레드가 옛 조각을 지우는 중이어도 번호가 겹치지 않게 메모리의 최댓값도 본다
+        number = max(segments[-1][0] if segments else 0, self._last_segment) + 1
+        self._last_segment = number
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.{number}"))
+        return number
+
+    def discard(self, upto: Optional[int]) -> None:
+        """번호가 upto 이하인 봉인 조각을 지운다(엑셀 저장이 끝난 뒤 호출)."""
+        if upto is None:
+            return
+        for number, path in self._segments():
+            if number <= upto:
+                with contextlib.suppress(OSError):
+                    path.unlink()
+
+    def pending(self) -> bool:
+        """엑셀에 아직 합쳐지지 않은 기록이 있는지."""
+        if self._segments():
+            return True
+        return self.path.exists() and self.path.stat().st_size > 0
+
+    # --- 재생 ---
+    def records(self) -> Iterator[Dict[str, object]]:
+        paths = [path for _, path in self._segments()]
+        if self.path.exists():
+            paths.append(self.path)
+        for path in paths:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # 강제 종료로 잘린 마지막 줄
+                        continue
+
+    def replay_into(self, df, word_col: str, meaning_col: str) -> int:
+        """저널을 df(상태 컬럼 포함)에 덮어쓴다. 적용한 기록 수를 돌려준다."""
+        key_rows = core.build_key_index(df[word_col], df[meaning_col])
+        cols = {name: df.columns.get_loc(name) for name in STATE_FIELDS}
+        applied = 0
+        for rec in self.records():
+            if "w" in rec:
+                rows = key_rows.get((rec["w"], rec["m"]), [])
+            else:
+                row = rec.get("r", -1)
+                rows = [row] if isinstance(row, int) and 0 <= row < len(df) else []
+            if not rows:
+                continue
+            if "lv" in rec:
+                values = {"InitLevel": rec["lv"]}
+            else:
+                values = {"Tries": rec["tr"], "Fails": rec["fa"], "LastStep": rec["s"]}
+                if "du" in rec:
+                    values.update(LastSeen=rec["ls"], Due=rec["du"])
+            for name, value in values.items():
+                for row in rows:
+                    df.iat[row, cols[name]] = value
+            applied += 1
+        return applied
+
+
+def _json_value(value):
+    """numpy 스칼라 등을 JSON에 쓸 수 있는 기본 타입으로."""
+    return value.item() if hasattr(value, "item") else value
+
+
+STATE_FIELDS = {
+    "Tries": "tries",
+    "Fails": "fails",
+    "LastStep": "last_step",
+    "InitLevel": "init_level",
+    "LastSeen": "last_seen",
+    "Due": "due",
+}
+
+
+class WorkbookCache:
+    """파싱이 끝난 단어장을 엑셀 옆 `<엑셀 파일명>.cache.pkl`에 보관한다.
+
+    상태 컬럼은 normalize_state_cols로 정리한 뒤 넣고, 감지한 단어/뜻 열과
+    to_chapter_num으로 뽑은 챕터 번호도 함께 둔다. 엑셀의 크기·수정 시각이 같으면
+    바로 쓰고, 다르면 내용 해시를 비교해 실제로 바뀐 경우에만 다시 만든다.
+    STREAM_LOAD 설정이 만들 때와 다르면(열을 추린 표인지 아닌지) 다시 만든다.
+    파일 앞에는 표 없이 비교용 정보만 담은 머리(pickle 하나)를 두어 fresh()가 표를 읽지 않고 확인한다.
+    """
+
+    VERSION = 4
+    HEADER_KEYS = ("version", "sheet", "stream", "size", "mtime_ns", "sha256")
+    SUFFIX = ".cache.pkl"
+
+    def __init__(self, workbook_path, sheet_name: str) -> None:
+        self.workbook_path = Path(workbook_path)
+        self.sheet_name = sheet_name
+        self.path = sidecar_path(self.workbook_path, sheet_name, self.SUFFIX)
+
+    def _header(self, fh, st) -> Optional[Dict[str, object]]:
+        header = pickle.load(fh)
+        if not isinstance(header, dict) or header.get("version") != self.VERSION:
+            return None
+        if header.get("sheet") != self.sheet_name or header.get("stream") != bool(core.STREAM_LOAD):
+            return None
+        if header["size"] != st.st_size:
+            return None
+        return header
+
+    def fresh(self) -> bool:
+        """엑셀 크기·수정 시각이 캐시와 같은지(표는 읽지 않는다)."""
+        try:
+            st = self.workbook_path.stat()
+            with open(self.path, "rb") as fh:
+                header = self._header(fh, st)
+        except Exception:
+            return False
+        return header is not None and header["mtime_ns"] == st.st_mtime_ns
+
+    def load(self) -> Optional[Dict[str, object]]:
+        try:
+            st = self.workbook_path.stat()
+            with open(self.path, "rb") as fh:
+                header = self._header(fh, st)
+                if header is None:
+                    return None
+                if header["mtime_ns"] != st.st_mtime_ns and header["sha256"] != file_sha256(self.workbook_path):
+                    return None
+                entry = pickle.load(fh)
+        except Exception:
+            return None
+        if entry["mtime_ns"] != st.st_mtime_ns:
+            # 내용은 같고 수정 시각만 바뀐 경우(복사 등): 시각만 갱신해 둔다
+            entry["mtime_ns"] = st.st_mtime_ns
+            with contextlib.suppress(OSError):
+                self._write(entry)
+        return entry
+
+    def store(self, df, parse_seconds: Optional[float] = None) -> Dict[str, object]:
+        df = core.normalize_state_cols(df.copy())
+        word_col, meaning_col = core.detect_card_columns(df)
+        chapters = core.chapter_numbers(df["Day"]) if "Day" in df.columns else None
+        st = self.workbook_path.stat()
+        entry = {
+            "version": self.VERSION,
+            "sheet": self.sheet_name,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": file_sha256(self.workbook_path),
+            "stream": bool(core.STREAM_LOAD),
+            "parse_seconds": parse_seconds,
+            "frame": df,
+            "word_col": word_col,
+            "meaning_col": meaning_col,
+            "chapters": chapters,
+        }
+        self._write(entry)
+        return entry
+
+    def _write(self, entry: Dict[str, object]) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump({key: entry[key] for key in self.HEADER_KEYS}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_workbook(path, sheet_name: str, use_cache: bool = True, scope=None):
+    """단어장을 읽어 (정규화된 DataFrame, 정보 dict)를 돌려준다.
+
+    STREAM_LOAD면 필요한 열만 스트리밍으로 읽고, scope=(모드, 범위)가 있으면 범위 밖 행도 건너뛴다.
+    캐시가 맞으면 scope와 관계없이 캐시된 전체 표를 쓴다.
+    정보: seconds(이번 불러오기), cache_hit, parse_seconds(엑셀 파싱에 걸린 시간),
+    word_col, meaning_col, chapters(챕터 번호 배열 또는 None),
+    row_filtered(범위 밖 행을 건너뛰었는지), total_tries(건너뛰었을 때 엑셀 전체 Tries 합)
+    """
+    started = time.perf_counter()
+    source = xlsx.file_signature(path)
+    cache = WorkbookCache(path, sheet_name) if use_cache else None
+    entry = cache.load() if cache is not None else None
+    hit = entry is not None
+    total_tries = None
+    if entry is None:
+        if core.STREAM_LOAD:
+            df, total_tries = xlsx.read_streaming(path, sheet_name, scope=scope)
+        else:
+            df = pd.read_excel(path, sheet_name=sheet_name)
+        parse_seconds = time.perf_counter() - started
+        # 일부 행만 읽은 표는 캐시하지 않는다
+        if cache is not None and total_tries is None:
+            try:
+                entry = cache.store(df, parse_seconds)
+            except Exception:
+                entry = None
+        if entry is None:
+            df = core.normalize_state_cols(df)
+            word_col, meaning_col = core.detect_card_columns(df)
+            entry = {
+                "frame": df,
+                "parse_seconds": parse_seconds,
+                "word_col": word_col,
+                "meaning_col": meaning_col,
+                "chapters": core.chapter_numbers(df["Day"]) if "Day" in df.columns else None,
+            }
+    info = {
+        "seconds": time.perf_counter() - started,
+        "cache_hit": hit,
+        "parse_seconds": entry["parse_seconds"],
+        "word_col": entry["word_col"],
+        "meaning_col": entry["meaning_col"],
+        "chapters": entry["chapters"],
+        "row_filtered": total_tries is not None,
+        "total_tries": total_tries,
+    }
+    # 캐시된 표도 지금 파일과 같은 행 배치이므로 저장 시 빠른 병합을 쓸 수 있다
+    entry["frame"].attrs["source"] = source
+    return entry["frame"], info
+
+
+class StateBackend:
+    """학습 상태 저장소. StudySession은 이 인터페이스만 쓴다."""
+
+    #: 몇 문제마다 checkpoint를 부를지(0이면 답안마다 이미 영구 저장됨)
+    autosave_every = 0
+    #: load() 때 저널 등에서 되살린 기록 수
+    recovered = 0
+    #: load()에 걸린 시간 등 (read_workbook 정보 형식)
+    load_info: Dict[str, object] = {}
+    #: (chapters 배열, 그걸로 만든 ChapterIndex)
+    _chapter_index: Optional[tuple] = None
+
+    @property
+    def chapters(self):
+        """행별 챕터 번호 배열(결측=NaN). 미리 계산해 둔 것이 없으면 None."""
+        return self.load_info.get("chapters")
+
+    @property
+    def chapter_index(self):
+        """chapters로 만든 core.ChapterIndex(없으면 None). 다시 불러오기 전까지 한 번만 만든다."""
+        chapters = self.chapters
+        if chapters is None:
+            return None
+        if self._chapter_index is None or self._chapter_index[0] is not chapters:
+            self._chapter_index = (chapters, core.ChapterIndex(chapters))
+        return self._chapter_index[1]
+
+    def describe_load(self) -> str:
+        info = self.load_info
+        if not info:
+            return ""
+        text = f"단어장 불러오기 {info['seconds']:.2f}초"
+        if info.get("cache_hit"):
+            parse = info.get("parse_seconds")
+            text += " (캐시 사용" + (f", 엑셀 직접 파싱 {parse:.2f}초)" if parse else ")")
+        return text
+
+    def load(self, scope=None):
+        """DataFrame을 돌려준다. scope=(모드, 범위)는 그 범위만 쓸 것이라는 힌트(일부 행만 읽을 수 있음)."""
+        raise NotImplementedError
+
+    def read_args(self, scope=None) -> Optional[tuple]:
+        """load()가 쓸 read_workbook 인자. 여러 덱을 다른 프로세스에서 파싱할 때 쓴다.
+
+        None이면 나눠 파싱할 수 없으므로 load()를 그대로 부른다. 인자를 돌려줬다면
+        read_workbook 결과를 attach()에 넘긴 것이 load()와 같다.
+        """
+        return None
+
+    def attach(self, df, info, scope=None):
+        raise NotImplementedError
+
+    def start_step(self, df) -> int:
+        """cur_step 시작값(엑셀 전체 Tries 합). 일부 행만 읽었으면 읽으면서 센 합계를 쓴다."""
+        total = self.load_info.get("total_tries")
+        if total is not None:
+            return int(total)
+        return int(core.int_array(df["Tries"]).sum())
+
+    def select_positions(self, mode: str, spec: str) -> Optional[Sequence[int]]:
+        """범위에 해당하는 0-based 행 위치(오름차순). None이면 세션이 DataFrame에서 직접 고른다."""
+        return None
+
+    def record_answer(
+        self, key, rows: List[int], step: int, correct: bool, tries: int, fails: int, seen: int, due: int
+    ) -> None:
+        """답안 한 건. seen은 답한 시각, due는 다음 복습 시각(유닉스 초)."""
+
+    def remember_sync(self, key, values: Dict[str, object]) -> None:
+        """이 저장소의 읽지 않은 행 중 같은 (단어, 뜻) 행에 저장 시 함께 쓸 값(범위만 읽은 경우)."""
+
+    def record_level(self, key, rows: List[int], level: int) -> None:
+        pass
+
+    def record_levels(self, entries: List[Tuple[object, List[int], int]]) -> None:
+        """(키, 행 목록, 난이도) 여러 건. 한꺼번에 쓸 수 있는 저장소는 덮어쓴다."""
+        for key, rows, level in entries:
+            self.record_level(key, rows, level)
+
+    def checkpoint(self, df, writer: Optional[WorkbookWriter] = None, final: bool = False) -> Optional[int]:
+        """전체 상태를 엑셀에 반영한다. writer가 있으면 백그라운드로 넘기고 요청 번호를 돌려준다."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ExcelBackend(StateBackend):
+    def __init__(self, path, sheet_name: str, journal: bool = True, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.sheet_name = sheet_name
+        self.journal = AnswerJournal.for_workbook(self.path, fsync=fsync, sheet_name=sheet_name) if journal else None
+        self.autosave_every = core.JOURNAL_COMPACT if journal else core.AUTOSAVE
+        self._scope = None
+        # 범위만 읽었을 때: df 위치 → 엑셀 행 위치, 저장 때 범위 밖 같은 카드 행에 쓸 값
+        self._rows = None
+        self._sync: Dict[tuple, Dict[str, object]] = {}
+
+    def load(self, scope=None):
+        args = self.read_args(scope)
+        return self.attach(*read_workbook(*args), scope=args[3])
+
+    def read_args(self, scope=None):
+        if scope is not None and self.journal is not None and self.journal.pending():
+            # 저널은 범위 밖 카드 기록도 담고 있으므로 전체를 읽어 모두 되살린다
+            scope = None
+        return (str(self.path), self.sheet_name, core.PARSE_CACHE, scope)
+
+    def attach(self, df, info, scope=None):
+        self.load_info = info
+        if self.load_info["row_filtered"]:
+            self._scope = scope
+            self._rows = df.index.to_numpy()
+        if self.journal is not None:
+            # 지난 실행에서 엑셀에 합쳐지지 못한 답안을 먼저 되살린다
+            self.recovered = self.journal.replay_into(df, *core.detect_card_columns(df))
+        return df
+
+    def select_positions(self, mode, spec):
+        if self._rows is not None and self._scope == (mode, spec):
+            return np.arange(len(self._rows))
+        return None
+
+    def _source_row(self, rows) -> int:
+        return int(self._rows[rows[0]]) if self._rows is not None else int(rows[0])
+
+    def remember_sync(self, key, values: Dict[str, object]) -> None:
+        """범위만 읽었을 때, 저장 시 범위 밖 같은 (단어, 뜻) 행에도 쓸 값을 모아 둔다."""
+        if self._rows is not None and key is not None:
+            self._sync.setdefault(key, {}).update(values)
+
+    def record_answer(self, key, rows, step, correct, tries, fails, seen, due) -> None:
+        self.remember_sync(key, {"Tries": tries, "Fails": fails, "LastStep": step, "LastSeen": seen, "Due": due})
+        if self.journal is not None:
+            self.journal.append_answer(key, self._source_row(rows), step, correct, tries, fails, seen, due)
+
+    def record_level(self, key, rows, level) -> None:
+        self.remember_sync(key, {"InitLevel": level})
+        if self.journal is not None:
+            self.journal.append_level(key, self._source_row(rows), level)
+
+    def record_levels(self, entries) -> None:
+        for key, _, level in entries:
+            self.remember_sync(key, {"InitLevel": level})
+        if self.journal is not None:
+            self.journal.append_levels([(key, self._source_row(rows), level) for key, rows, level in entries])
+
+    def checkpoint(self, df, writer=None, final=False):
+        journal = self.journal
+        sealed = journal.rotate() if journal is not None else None
+        sync = dict(self._sync) if self._rows is not None else None
+
+        def on_saved(snapshot) -> None:
+            if sealed is not None:
+                journal.discard(sealed)
+            self._after_save(snapshot)
+
+        if writer is None:
+            core.write_excel_atomic(df, self.path, self.sheet_name, sync=sync)
+            on_saved(df)
+            return None
+        return writer.submit(df, on_saved=on_saved, path=self.path, sheet_name=self.sheet_name)
+
+    def _after_save(self, snapshot) -> None:
+        """엑셀 저장이 끝난 뒤(저장 스레드에서도) 불린다."""
+        if core.PARSE_CACHE and self._rows is None:
+            # 방금 쓴 내용 그대로 캐시를 갱신해 다음 실행에서 다시 파싱하지 않게 한다
+            WorkbookCache(self.path, self.sheet_name).store(snapshot, self.load_info.get("parse_seconds"))
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+
+
+class SqliteBackend(StateBackend):
+    """엑셀 옆 `<엑셀 파일명>.sqlite3`에 카드와 상태를 둔다.
+
+    cards(pos, chapter, c0..cN) : 엑셀의 상태 외 열을 c0.. 열로 그대로 보관, pos=엑셀 행 순서
+    state(pos, tries, fails, last_step, init_level, last_seen, due, dirty) : 답안마다 해당 행만 UPDATE
+    엑셀 크기·수정 시각이 마지막 가져오기/내보내기 때와 다르면(엑셀에서 편집) 다시 가져온다.
+    dirty는 마지막 내보내기 뒤 DB에만 기록된 행이다. 다시 가져올 때 이 행들의 상태는
+    (단어, 뜻)이 같은 새 행으로(키가 없으면 같은 행 번호로) 옮기므로 엑셀을 편집해도 답안을 잃지 않는다.
+    """
+
+    SUFFIX = ".sqlite3"
+
+    def __init__(self, path, sheet_name: str) -> None:
+        self.path = Path(path)
+        self.sheet_name = sheet_name
+        self.db_path = sidecar_path(self.path, sheet_name, self.SUFFIX)
+        self.conn = self._connect(self.db_path)
+
+    @staticmethod
+    def _connect(db_path):
+        # UI는 불러오기 스레드에서 연결을 만들고 메인 스레드에서 쓴다(동시에 쓰지는 않음)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS state (
+                pos INTEGER PRIMARY KEY,
+                tries INTEGER NOT NULL DEFAULT 0,
+                fails INTEGER NOT NULL DEFAULT 0,
+                last_step INTEGER NOT NULL DEFAULT 0,
+                init_level INTEGER,
+                last_seen INTEGER NOT NULL DEFAULT 0,
+                due INTEGER NOT NULL DEFAULT 0,
+                dirty INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+        # LastSeen/Due·dirty가 생기기 전에 만든 DB
+        have = {row[1] for row in conn.execute("PRAGMA table_info(state)")}
+        with conn:
+            for column in ("last_seen", "due", "dirty"):
+                if column not in have:
+                    conn.execute(f"ALTER TABLE state ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            if "dirty" not in have:
+                # 어느 행이 내보내졌는지 모르므로 모두 옮길 대상으로 둔다
+                conn.execute("UPDATE state SET dirty = 1")
+        return conn
+
+    # --- 메타 ---
+    def _meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_meta(conn, **items) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()],
+        )
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[List[int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    # --- 가져오기 / 불러오기 ---
+    def load(self, scope=None):
+        started = time.perf_counter()
+        signature = self._signature(self.path)
+        if self._meta("columns") is None or (signature is not None and signature != self._meta("source")):
+            self.import_workbook()
+        df, chapters = self._read_frame()
+        self.load_info = {"seconds": time.perf_counter() - started, "cache_hit": False, "chapters": chapters}
+        return df
+
+    def import_workbook(self) -> None:
+        carried = self._unexported()
+        df = core.ensure_state_cols(pd.read_excel(self.path, sheet_name=self.sheet_name))
+        columns = [str(c) for c in df.columns]
+        df.columns = columns
+        data_cols = [c for c in columns if c not in STATE_FIELDS]
+        word_col, meaning_col = core.detect_card_columns(df)
+        chapters = core.chapter_numbers(df["Day"] if "Day" in df.columns else [None] * len(df))
+
+        def column_values(col):
+            series = df[col].astype(object)
+            return [_sql_value(v) for v in series.tolist()]
+
+        data = [column_values(c) for c in data_cols]
+        state = [core.int_array(df[c]).tolist() for c in ("Tries", "Fails", "LastStep", "LastSeen", "Due")]
+        levels = [_sql_value(v) for v in df["InitLevel"].astype(object).tolist()]
+        chapter_values = [_sql_value(v) for v in chapters.tolist()]
+        dirty = [0] * len(df)
+        if carried:
+            keys = (
+                zip(data[data_cols.index(word_col)], data[data_cols.index(meaning_col)])
+                if word_col in data_cols and meaning_col in data_cols
+                else [(None, None)] * len(df)
+            )
+            key_rows: Dict[tuple, List[int]] = {}
+            unkeyed = set()
+            for pos, key in enumerate(keys):
+                if None in key:
+                    unkeyed.add(pos)
+                else:
+                    key_rows.setdefault(key, []).append(pos)
+            for old_pos, word, meaning, tries, fails, last_step, level, seen, due in carried:
+                if word is not None and meaning is not None:
+                    targets = key_rows.get((word, meaning), [])
+                else:
+                    # 키가 없는 카드는 그 행 번호도 키가 없는 행일 때만 같은 카드로 본다
+                    targets = [old_pos] if old_pos in unkeyed else []
+                for pos in targets:
+                    for values, value in zip(state, (tries, fails, last_step, seen, due)):
+                        values[pos] = value
+                    levels[pos] = level
+                    dirty[pos] = 1
+
+        names = [f"c{i}" for i in range(len(data_cols))]
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS cards")
+            self.conn.execute("DELETE FROM state")
+            col_defs = "".join(f", {name}" for name in names)
+            self.conn.execute(f"CREATE TABLE cards (pos INTEGER PRIMARY KEY, chapter INTEGER{col_defs})")
+            placeholders = ", ".join("?" * (len(names) + 2))
+            self.conn.executemany(
+                f"INSERT INTO cards VALUES ({placeholders})",
+                zip(range(len(df)), chapter_values, *data),
+            )
+            self.conn.executemany(
+                "INSERT INTO state (pos, tries, fails, last_step, last_seen, due, init_level, dirty)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(range(len(df)), *state, levels, dirty),
+            )
+            self.conn.execute("CREATE INDEX cards_chapter ON cards (chapter)")
+            word_sql = names[data_cols.index(word_col)] if word_col in data_cols else None
+            meaning_sql = names[data_cols.index(meaning_col)] if meaning_col in data_cols else None
+            if word_sql and meaning_sql:
+                self.conn.execute(f"CREATE INDEX cards_key ON cards ({word_sql}, {meaning_sql})")
+            self._set_meta(
+                self.conn,
+                columns=columns,
+                data_columns=data_cols,
+                source=self._signature(self.path),
+            )
+
+    def _unexported(self) -> List[tuple]:
+        """마지막 내보내기 뒤 DB에만 기록된 행: (pos, 단어, 뜻, tries, fails, last_step, init_level, last_seen, due)"""
+        columns = self._meta("columns")
+        if columns is None:
+            return []
+        data_cols = self._meta("data_columns")
+        names = {col: f"c.c{i}" for i, col in enumerate(data_cols)}
+        word_col, meaning_col = core.detect_card_columns(pd.DataFrame(columns=columns))
+        word_sql, meaning_sql = names.get(word_col, "NULL"), names.get(meaning_col, "NULL")
+        return self.conn.execute(
+            f"SELECT s.pos, {word_sql}, {meaning_sql}, s.tries, s.fails, s.last_step, s.init_level, s.last_seen, s.due"
+            " FROM state s JOIN cards c ON c.pos = s.pos WHERE s.dirty ORDER BY s.pos"
+        ).fetchall()
+
+    def _read_frame(self):
+        """(DataFrame, 가져올 때 뽑아 둔 챕터 번호 배열)"""
+        columns = self._meta("columns")
+        data_cols = self._meta("data_columns")
+        names = [f"c{i}" for i in range(len(data_cols))]
+        select = ", ".join(["c." + n for n in names] + [f"s.{f}" for f in STATE_FIELDS.values()] + ["c.chapter"])
+        df = pd.read_sql_query(
+            f"SELECT {select} FROM cards c JOIN state s ON s.pos = c.pos ORDER BY c.pos", self.conn
+        )
+        df.columns = data_cols + list(STATE_FIELDS) + ["__chapter"]
+        chapters = core.float_array(df.pop("__chapter"), fill=np.nan) if "Day" in columns else None
+        # 상태 열이 엑셀에 없던 때 가져온 DB도 상태 열은 모두 돌려준다
+        return df[columns + [c for c in STATE_FIELDS if c not in columns]], chapters
+
+    # --- 범위 선택 ---
+    def select_positions(self, mode, spec):
+        # 구간마다 BETWEEN 한 번(chapter, pos 모두 색인이 있다)
+        if mode == "chapter":
+            column, spans = "chapter", core.parse_chapter_spec(spec).spans
+        elif mode == "count":
+            column, spans = "pos", core.parse_count_spec(spec).shift(-1).spans
+        else:
+            return None
+        positions = []
+        for a, b in spans:
+            positions.extend(
+                r[0] for r in self.conn.execute(f"SELECT pos FROM cards WHERE {column} BETWEEN ? AND ?", (a, b))
+            )
+        return sorted(positions)
+
+    # --- 답안 기록 ---
+    def record_answer(self, key, rows, step, correct, tries, fails, seen, due) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE state SET tries = ?, fails = ?, last_step = ?, last_seen = ?, due = ?, dirty = 1 WHERE pos = ?",
+                [(int(tries), int(fails), int(step), int(seen), int(due), int(r)) for r in rows],
+            )
+
+    def record_level(self, key, rows, level) -> None:
+        self.record_levels([(key, rows, level)])
+
+    def record_levels(self, entries) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE state SET init_level = ?, dirty = 1 WHERE pos = ?",
+                [(int(level), int(r)) for _, rows, level in entries for r in rows],
+            )
+
+    # --- 엑셀 내보내기 ---
+    def checkpoint(self, df, writer=None, final=False):
+        # 답안은 이미 DB에 있으므로 엑셀 내보내기는 종료 때만 한다
+        if not final:
+            return None
+        if writer is None:
+            self.export_workbook(df)
+            return None
+        return writer.submit(df, on_saved=self._mark_exported, path=self.path, sheet_name=self.sheet_name)
+
+    def export_workbook(self, df) -> None:
+        core.write_excel_atomic(df, self.path, self.sheet_name)
+        self._mark_exported()
+
+    def _mark_exported(self, _snapshot=None) -> None:
+        # 저장 스레드에서도 불리므로 연결을 따로 연다
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                self._set_meta(conn, source=self._signature(self.path))
+                conn.execute("UPDATE state SET dirty = 0")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class MmapBackend(ExcelBackend):
+    """엑셀 옆 `<엑셀 파일명>.state.bin`에 카드 상태를 고정 길이 레코드로 두고 mmap으로 연다.
+
+    파일은 머리 STATE_HEADER_SIZE바이트 뒤에 엑셀 행 순서대로 레코드(STATE_FIELDS 순서의 8바이트 값,
+    (단어, 뜻) 해시 key, 마지막 내보내기 뒤 고쳤는지 dirty)가 이어진다. 불러올 때는 매핑한 레코드
+    배열에서 상태 열을 통째로 복사할 뿐 파싱하지 않고, 답안 한 건은 그 카드 행의 레코드만 제자리에서
+    고친다. 고친 페이지는 MMAP_FLUSH 답안마다(0이면 종료할 때만) 디스크에 내리고, 엑셀에는 종료할
+    때만 상태를 맞춰 쓴다. 엑셀 크기·수정 시각이 마지막으로 맞춘 때와 다르면(엑셀에서 편집) 엑셀에서
+    다시 만들되, dirty 레코드는 SqliteBackend처럼 같은 (단어, 뜻) 카드로 옮긴다.
+    """
+
+    SUFFIX = ".state.bin"
+    MAGIC = b"VOCABST1"
+    VERSION = 2
+
+    def __init__(self, path, sheet_name: str) -> None:
+        super().__init__(path, sheet_name, journal=False)
+        self.state_path = sidecar_path(self.path, sheet_name, self.SUFFIX)
+        # 답안마다 이미 상태 파일에 있으므로 중간 저장(checkpoint)은 필요 없다
+        self.autosave_every = 0
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self._records = None
+        self._unflushed = 0
+        # 마지막 flush 뒤 고친 바이트 구간 [시작, 끝)
+        self._dirty: Optional[Tuple[int, int]] = None
+
+    # --- 불러오기 ---
+    def read_args(self, scope=None):
+        # 상태 파일은 엑셀 행 전체와 1:1이므로 범위와 관계없이 다 읽는다
+        return super().read_args(None)
+
+    def attach(self, df, info, scope=None):
+        df = super().attach(df, info)
+        signature = SqliteBackend._signature(self.path) or [0, 0]
+        if not self._open(len(df), signature):
+            self._create(df, signature)
+        for col, field in STATE_FIELDS.items():
+            # 매핑을 닫아도 df는 남아야 하므로 사본으로
+            df[col] = self._records[field].copy()
+        return df
+
+    def _open(self, count: int, signature: List[int]) -> bool:
+        """상태 파일이 이 엑셀(count행, signature)과 맞으면 매핑하고 True."""
+        header, record = _state_dtypes()
+        try:
+            fh = open(self.state_path, "r+b")
+        except FileNotFoundError:
+            return False
+        size = os.fstat(fh.fileno()).st_size
+        head = np.frombuffer(fh.read(header.itemsize), header)[0] if size >= STATE_HEADER_SIZE else None
+        if (
+            head is None
+            or head["magic"] != self.MAGIC
+            or head["version"] != self.VERSION
+            or head["record_size"] != record.itemsize
+            or head["count"] != count
+            or size != STATE_HEADER_SIZE + count * record.itemsize
+            or [int(head["source_size"]), int(head["source_mtime"])] != signature
+        ):
+            fh.close()
+            return False
+        self._map(fh, count)
+        return True
+
+    def _create(self, df, signature: List[int]) -> None:
+        """df(엑셀에서 읽은 상태)로 상태 파일을 새로 만들어 매핑한다. 임시 파일에 다 쓴 뒤 교체한다.
+
+        옛 파일에만 있는(내보내지 않은) 레코드는 새 파일의 같은 카드로 옮기고 df에도 반영한다.
+        """
+        carried = self._unexported()
+        self._unmap()
+        header, record = _state_dtypes()
+        head = np.zeros(1, header)
+        head[0] = (self.MAGIC, self.VERSION, record.itemsize, len(df), *signature)
+        records = np.zeros(len(df), record)
+        for col, field in STATE_FIELDS.items():
+            records[field] = df[col].to_numpy()
+        records["key"] = _card_keys(df)
+        if len(carried):
+            _carry_records(records, carried)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp, "wb") as out:
+            out.write(head.tobytes().ljust(STATE_HEADER_SIZE, b"\0"))
+            out.write(records.tobytes())
+        os.replace(tmp, self.state_path)
+        self._map(open(self.state_path, "r+b"), len(df))
+
+    def _unexported(self):
+        """옛 상태 파일에서 dirty인 레코드(행 번호 row 필드를 붙여서). 파일이 없거나 형식이 다르면 빈 배열."""
+        header, record = _state_dtypes()
+        carried = np.dtype([("row", "<i8")] + [(name, record.fields[name][0]) for name in record.names])
+        try:
+            data = np.fromfile(self.state_path, np.uint8)
+        except FileNotFoundError:
+            return np.zeros(0, carried)
+        if len(data) < STATE_HEADER_SIZE:
+            return np.zeros(0, carried)
+        head = data[: header.itemsize].view(header)[0]
+        count = int(head["count"])
+        if (
+            head["magic"] != self.MAGIC
+            or head["version"] != self.VERSION
+            or head["record_size"] != record.itemsize
+            or len(data) != STATE_HEADER_SIZE + count * record.itemsize
+        ):
+            return np.zeros(0, carried)
+        old = data[STATE_HEADER_SIZE:].view(record)
+        rows = np.flatnonzero(old["dirty"])
+        out = np.zeros(len(rows), carried)
+        out["row"] = rows
+        for name in record.names:
+            out[name] = old[name][rows]
+        return out
+
+    def _map(self, fh, count: int) -> None:
+        self._fh = fh
+        self._mm = mmap.mmap(fh.fileno(), 0)
+        self._records = np.frombuffer(self._mm, _state_dtypes()[1], count=count, offset=STATE_HEADER_SIZE)
+
+    def _unmap(self) -> None:
+        # 레코드 배열이 매핑을 참조하는 동안에는 mmap을 닫을 수 없다
+        self._records = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # --- 답안 기록 ---
+    def record_answer(self, key, rows, step, correct, tries, fails, seen, due) -> None:
+        records = self._records
+        for row in rows:
+            records[row] = (tries, fails, step, records["init_level"][row], seen, due, records["key"][row], 1)
+        self._written(rows)
+
+    def record_level(self, key, rows, level) -> None:
+        self.record_levels([(key, rows, level)])
+
+    def record_levels(self, entries) -> None:
+        levels, dirty = self._records["init_level"], self._records["dirty"]
+        touched: List[int] = []
+        for _, rows, level in entries:
+            levels[rows] = level
+            dirty[rows] = 1
+            touched.extend(rows)
+        if touched:
+            self._written(touched)
+
+    def _written(self, rows) -> None:
+        size = self._records.itemsize
+        lo = STATE_HEADER_SIZE + int(min(rows)) * size
+        hi = STATE_HEADER_SIZE + (int(max(rows)) + 1) * size
+        if self._dirty is not None:
+            lo, hi = min(lo, self._dirty[0]), max(hi, self._dirty[1])
+        self._dirty = (lo, hi)
+        self._unflushed += 1
+        if core.MMAP_FLUSH and self._unflushed >= core.MMAP_FLUSH:
+            self.flush()
+
+    def flush(self) -> None:
+        """고친 구간의 페이지만 디스크에 내린다. 프로세스가 죽어도 페이지 캐시는 남으므로 정전 대비용이다."""
+        if self._mm is not None and self._dirty is not None:
+            lo, hi = self._dirty
+            # flush 시작 위치는 할당 단위(페이지)에 맞아야 한다
+            start = lo - lo % mmap.ALLOCATIONGRANULARITY
+            self._mm.flush(start, hi - start)
+        self._dirty = None
+        self._unflushed = 0
+
+    # --- 엑셀 내보내기 ---
+    def checkpoint(self, df, writer=None, final=False):
+        self.flush()
+        # 상태는 이미 파일에 있으므로 엑셀에는 종료할 때만 맞춘다
+        if not final:
+            return None
+        return super().checkpoint(df, writer, final)
+
+    def _after_save(self, snapshot) -> None:
+        super()._after_save(snapshot)
+        # 엑셀을 새로 썼으므로 dirty를 지우고 머리의 엑셀 크기·수정 시각을 바꿔 다음 실행에서 다시 만들지 않게 한다.
+        # 저장 스레드에서도 불리고 그때는 매핑이 닫혔을 수 있어 파일로 쓴다.
+        # 중간에 꺼지면 머리가 옛 엑셀 그대로여서 엑셀(이미 내보낸 값)에서 다시 만든다
+        header, record = _state_dtypes()
+        signature = np.array(SqliteBackend._signature(self.path) or [0, 0], dtype="<i8")
+        with open(self.state_path, "r+b") as fh:
+            head = np.frombuffer(fh.read(header.itemsize), header)[0]
+            count = int(head["count"])
+            if count:
+                records = np.memmap(fh, record, "r+", STATE_HEADER_SIZE, (count,))
+                records["dirty"] = 0
+                records.flush()
+                del records
+            fh.seek(header.fields["source_size"][1])
+            fh.write(signature.tobytes())
+
+    def close(self) -> None:
+        self.flush()
+        self._unmap()
+
+
+STATE_HEADER_SIZE = 64
+
+
+def _state_dtypes():
+    """MmapBackend 파일의 (머리, 레코드) dtype. numpy를 늦게 불러오려고 함수로 둔다."""
+    header = np.dtype(
+        [
+            ("magic", "S8"),
+            ("version", "<u4"),
+            ("record_size", "<u4"),
+            ("count", "<i8"),
+            ("source_size", "<i8"),
+            ("source_mtime", "<i8"),
+        ]
+    )
+    record = np.dtype(
+        [(field, "<f8" if field == "init_level" else "<i8") for field in STATE_FIELDS.values()]
+        + [("key", "<i8"), ("dirty", "<i8")]
+    )
+    return header, record
+
+
+def _card_keys(df):
+    """행마다 (단어, 뜻)의 64비트 해시. 단어나 뜻이 비었으면 0(키 없는 카드)."""
+    keys = np.zeros(len(df), "<i8")
+    word_col, meaning_col = core.detect_card_columns(df)
+    if word_col not in df.columns or meaning_col not in df.columns:
+        return keys
+    blank = (pd.isna(df[word_col]) | pd.isna(df[meaning_col])).to_numpy()
+    for pos, key in enumerate(zip(df[word_col].tolist(), df[meaning_col].tolist())):
+        if not blank[pos]:
+            digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+            keys[pos] = int.from_bytes(digest, "little", signed=True) or 1
+    return keys
+
+
+def _carry_records(records, carried) -> None:
+    """옛 파일의 dirty 레코드를 새 레코드 배열의 같은 (단어, 뜻) 카드(여럿이면 모두)로 옮긴다.
+
+    키가 없는 카드는 그 행 번호도 키가 없는 행일 때만 같은 카드로 본다.
+    """
+    keys = records["key"]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    for old in carried:
+        if old["key"]:
+            lo = np.searchsorted(sorted_keys, old["key"], "left")
+            hi = np.searchsorted(sorted_keys, old["key"], "right")
+            targets = order[lo:hi]
+        elif old["row"] < len(records) and keys[old["row"]] == 0:
+            targets = [old["row"]]
+        else:
+            continue
+        for field in STATE_FIELDS.values():
+            records[field][targets] = old[field]
+        records["dirty"][targets] = 1
+
+
+def open_backend(path, sheet_name: str, kind: Optional[str] = None) -> StateBackend:
+    kind = kind or core.STORAGE
+    if kind == "sqlite":
+        return SqliteBackend(path, sheet_name)
+    if kind == "mmap":
+        return MmapBackend(path, sheet_name)
+    if kind == "excel":
+        return ExcelBackend(path, sheet_name, journal=core.JOURNAL, fsync=core.JOURNAL_FSYNC)
+    raise ValueError("STORAGE는 'excel', 'sqlite', 'mmap' 중 하나여야 합니다.")
+
+
+# ===== 여러 덱 =====
+_POOL_MIN_BYTES = 1 << 20
+
+
+# read_workbook이 보는 영단어.py 설정. 파싱 프로세스에는 이것만 넘긴다
+_READER_SETTINGS = ("SHEET_NAME", "STREAM_LOAD", "WORD_CANDIDATES", "MEANING_CANDIDATES", "STATE_COLUMNS")
+
+
+def _settings() -> Dict[str, object]:
+    return {name: getattr(core, name) for name in _READER_SETTINGS}
+
+
+def _init_worker(settings: Dict[str, object]) -> None:
+    for name, value in settings.items():
+        setattr(core, name, value)
+
+
+def read_workbooks(jobs: List[tuple], workers: int = 0) -> Tuple[list, int]:
+    """read_workbook(*job)을 여러 번. 새로 파싱해야 하는 큰 엑셀(1MB 이상)이 둘 이상이면
+    프로세스 풀에서 나눠 파싱하고, 나머지는 그동안 이 프로세스에서 읽는다.
+
+    workers: 프로세스 수(0이면 CPU 수, 1이면 나누지 않음). 반환: (결과 목록, 파싱에 쓴 프로세스 수)
+    """
+    big = []
+    for i, (path, sheet_name, use_cache, _) in enumerate(jobs):
+        with contextlib.suppress(OSError):
+            if os.path.getsize(path) >= _POOL_MIN_BYTES and not (
+                use_cache and WorkbookCache(path, sheet_name).fresh()
+            ):
+                big.append(i)
+    count = min(workers or os.cpu_count() or 1, len(big))
+    if count < 2:
+        return [read_workbook(*job) for job in jobs], 1
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    results: list = [None] * len(jobs)
+    # Tk 스레드가 있는 프로세스를 fork하지 않도록 spawn으로 띄우고, 설정은 이 프로세스 값을 넘긴다
+    with ProcessPoolExecutor(
+        count,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(_settings(),),
+    ) as pool:
+        futures = {i: pool.submit(read_workbook, *jobs[i]) for i in big}
+        for i, job in enumerate(jobs):
+            if i not in futures:
+                results[i] = read_workbook(*job)
+        for i, future in futures.items():
+            results[i] = future.result()
+    return results, count
+
+
+class Deck:
+    """덱 하나(엑셀 파일의 시트 하나)와 그 저장 백엔드. 합친 표에서의 행 범위와 원래 모양도 둔다."""
+
+    def __init__(self, name: str, path, sheet_name: str, backend: StateBackend) -> None:
+        self.name = name
+        self.path = Path(path)
+        self.sheet_name = sheet_name
+        self.backend = backend
+        self.start = self.stop = 0
+        self.columns: list = []
+        # 합친 표의 열 이름 → 이 덱 엑셀의 열 이름(단어/뜻 열 이름이 다를 때)
+        self.renames: Dict[object, object] = {}
+        self.index = None
+        self.attrs: Dict[str, object] = {}
+        self.dtypes: Dict[object, object] = {}
+        self.dirty = False
+
+
+class DeckSet(StateBackend):
+    """여러 덱을 한 표로 합친다. StudySession에는 덱 하나짜리 백엔드와 똑같이 보인다.
+
+    행은 덱 순서대로 이어 붙이고 DECK_COLUMN 열에 덱 이름을 둔다. 단어/뜻 열 이름이 덱마다 다르면
+    첫 덱의 이름으로 맞춘다. 답안 기록과 저장은 행 범위로 나눠 덱마다 자기 백엔드(엑셀·저널·캐시)에 넘기고,
+    저장은 기록이 생긴 덱만 한다. 같은 (단어, 뜻)은 덱이 달라도 한 카드로 본다.
+    범위는 '덱이름:범위'를 ';'로 이어 덱별로 줄 수 있다(core.split_deck_spec). 덱 이름 없는 번호 범위는
+    합친 표의 순서 기준이다.
+    """
+
+    def __init__(self, decks: List[Deck], workers: int = 0) -> None:
+        self.decks = decks
+        self.workers = workers
+        self.autosave_every = decks[0].backend.autosave_every
+        self._starts: List[int] = []
+        self._deck_columns: set = set()
+        self._days = None
+        self._chapters = None
+
+    def _deck(self, name: str) -> Deck:
+        for deck in self.decks:
+            if deck.name == name:
+                return deck
+        names = ", ".join(deck.name for deck in self.decks)
+        raise ValueError(f"'{name}' 덱이 없습니다. (덱: {names})")
+
+    def _groups(self, spec: str) -> List[Tuple[Optional[str], str]]:
+        groups = core.split_deck_spec(spec)
+        for name, _ in groups:
+            if name is not None:
+                self._deck(name)
+        return groups
+
+    def _filtered(self) -> bool:
+        return any(deck.backend.load_info.get("row_filtered") for deck in self.decks)
+
+    # --- 불러오기 ---
+    def _deck_scopes(self, scope) -> List[Optional[tuple]]:
+        """덱마다 넘길 scope. 덱을 골라 지정했으면 고르지 않은 덱은 행을 담지 않고 Tries 합계만 센다."""
+        none = [None] * len(self.decks)
+        if scope is None:
+            return none
+        mode, spec = scope
+        groups = self._groups(spec)
+        if all(name is None for name, _ in groups):
+            # 덱 구분 없는 챕터 범위는 덱마다 같다. 번호 범위는 합친 표 기준이라 미리 거를 수 없다
+            return [scope] * len(self.decks) if mode == "chapter" else none
+        if any(name is None for name, _ in groups):
+            return none
+        scopes = []
+        for deck in self.decks:
+            specs = [sub for name, sub in groups if name == deck.name]
+            if not specs:
+                scopes.append(("count", ""))
+            elif len(specs) == 1 and specs[0]:
+                scopes.append((mode, specs[0]))
+            else:
+                scopes.append(None)
+        return scopes
+
+    def load(self, scope=None):
+        started = time.perf_counter()
+        scopes = self._deck_scopes(scope)
+        jobs = [deck.backend.read_args(deck_scope) for deck, deck_scope in zip(self.decks, scopes)]
+        parsed, workers = read_workbooks([job for job in jobs if job is not None], self.workers)
+        parsed = iter(parsed)
+        frames = []
+        for deck, deck_scope, job in zip(self.decks, scopes, jobs):
+            if job is None:
+                frames.append(deck.backend.load(deck_scope))
+            else:
+                frames.append(deck.backend.attach(*next(parsed), scope=job[3]))
+        df = self._combine(frames)
+        self.recovered = sum(deck.backend.recovered for deck in self.decks)
+        self.load_info = {
+            "seconds": time.perf_counter() - started,
+            "cache_hit": all(deck.backend.load_info.get("cache_hit") for deck in self.decks),
+            "workers": workers,
+            "row_filtered": self._filtered(),
+        }
+        return df
+
+    def _combine(self, frames: list):
+        word_col, meaning_col = core.detect_card_columns(frames[0])
+        parts = []
+        start = 0
+        for deck, frame in zip(self.decks, frames):
+            own_word, own_meaning = core.detect_card_columns(frame)
+            renames = {}
+            if own_word != word_col and word_col not in frame.columns:
+                renames[own_word] = word_col
+            if own_meaning != meaning_col and meaning_col not in frame.columns:
+                renames[own_meaning] = meaning_col
+            deck.renames = {new: old for old, new in renames.items()}
+            deck.columns = [renames.get(c, c) for c in frame.columns]
+            deck.dtypes = {renames.get(c, c): dtype for c, dtype in frame.dtypes.items()}
+            deck.index = frame.index
+            deck.attrs = dict(frame.attrs)
+            deck.start, deck.stop = start, start + len(frame)
+            # 저널에서 되살린 기록은 엑셀에 합쳐야 하므로 처음부터 저장 대상
+            deck.dirty = deck.backend.recovered > 0
+            start = deck.stop
+            part = frame.rename(columns=renames).reset_index(drop=True)
+            part[core.DECK_COLUMN] = deck.name
+            parts.append(part)
+        self._starts = [deck.start for deck in self.decks]
+        self._deck_columns = set().union(*(deck.columns for deck in self.decks))
+        df = pd.concat(parts, ignore_index=True, sort=False)
+        self._days = df["Day"] if "Day" in df.columns else None
+        self._chapters = None
+        return df
+
+    def describe_load(self) -> str:
+        info = self.load_info
+        if not info:
+            return ""
+        text = f"덱 {len(self.decks)}개 불러오기 {info['seconds']:.2f}초"
+        if info.get("workers", 1) > 1:
+            text += f" (프로세스 {info['workers']}개로 파싱)"
+        elif info.get("cache_hit"):
+            text += " (캐시 사용)"
+        return text
+
+    @property
+    def chapters(self):
+        if self._chapters is None and self._days is not None:
+            # 덱마다 불러올 때 뽑아 둔 번호가 있으면 이어 붙이고, 없는 덱만 Day에서 뽑는다
+            parts = []
+            for deck in self.decks:
+                own = deck.backend.chapters
+                if own is None or len(own) != deck.stop - deck.start:
+                    own = core.chapter_numbers(self._days.iloc[deck.start:deck.stop])
+                parts.append(own)
+            self._chapters = np.concatenate(parts) if parts else np.empty(0)
+        return self._chapters
+
+    def start_step(self, df) -> int:
+        tries = core.int_array(df["Tries"])
+        total = 0
+        for deck in self.decks:
+            known = deck.backend.load_info.get("total_tries")
+            total += int(known) if known is not None else int(tries[deck.start:deck.stop].sum())
+        return total
+
+    # --- 범위 선택 ---
+    def select_positions(self, mode, spec):
+        groups = self._groups(spec)
+        if all(name is None for name, _ in groups) and not self._filtered():
+            return None
+        total = self.decks[-1].stop
+        chosen = np.zeros(total, dtype=bool)
+        for name, sub in groups:
+            if mode == "count" and name is None:
+                for a, b in core.parse_count_spec(sub).shift(-1).clip(0, total - 1).spans:
+                    chosen[a:b + 1] = True
+                continue
+            rows = None
+            if mode == "chapter" and sub:
+                index = self.chapter_index
+                if index is None:
+                    raise ValueError("엑셀에 'Day' 컬럼이 없어 챕터 기준을 사용할 수 없습니다.")
+                rows = index.positions(core.parse_chapter_spec(sub))
+            for deck in self.decks if name is None else [self._deck(name)]:
+                if not sub:
+                    chosen[deck.start:deck.stop] = True
+                    continue
+                if rows is not None:
+                    lo, hi = np.searchsorted(rows, [deck.start, deck.stop])
+                    chosen[rows[lo:hi]] = True
+                    continue
+                # 범위만 읽은 덱도 번호는 덱 엑셀의 행 순서(색인) 기준
+                hit = core.parse_count_spec(sub).shift(-1).mask(np.asarray(deck.index))
+                chosen[deck.start:deck.stop] |= hit
+        return np.flatnonzero(chosen)
+
+    # --- 답안 기록 ---
+    def _by_deck(self, rows: List[int]) -> Dict[int, List[int]]:
+        groups: Dict[int, List[int]] = {}
+        for row in rows:
+            i = bisect.bisect_right(self._starts, row) - 1
+            groups.setdefault(i, []).append(row - self.decks[i].start)
+        return groups
+
+    def _record(self, key, rows, values: Dict[str, object], record: Callable[[StateBackend, List[int]], None]) -> None:
+        groups = self._by_deck(rows)
+        for i, deck in enumerate(self.decks):
+            if i in groups:
+                record(deck.backend, groups[i])
+                deck.dirty = True
+            elif key is not None and deck.backend.load_info.get("row_filtered"):
+                # 이 덱의 읽지 않은 행에 같은 카드가 있을 수 있다
+                deck.backend.remember_sync(key, values)
+                deck.dirty = True
+
+    def record_answer(self, key, rows, step, correct, tries, fails, seen, due) -> None:
+        self._record(
+            key,
+            rows,
+            {"Tries": tries, "Fails": fails, "LastStep": step, "LastSeen": seen, "Due": due},
+            lambda backend, local: backend.record_answer(key, local, step, correct, tries, fails, seen, due),
+        )
+
+    def record_level(self, key, rows, level) -> None:
+        self._record(key, rows, {"InitLevel": level}, lambda backend, local: backend.record_level(key, local, level))
+
+    def record_levels(self, entries) -> None:
+        # 덱별로 모아 덱마다 한 번에 기록한다
+        batches: Dict[StateBackend, list] = {}
+        for key, rows, level in entries:
+            self._record(
+                key,
+                rows,
+                {"InitLevel": level},
+                lambda backend, local: batches.setdefault(backend, []).append((key, local, level)),
+            )
+        for backend, batch in batches.items():
+            backend.record_levels(batch)
+
+    # --- 저장 ---
+    def _part(self, df, deck: Deck):
+        """합친 표에서 덱 하나를 떼어 불러올 때의 모양(열 이름·자료형·색인)으로 되돌린다."""
+        part = df.iloc[deck.start:deck.stop]
+        columns = [
+            c for c in part.columns
+            if c != core.DECK_COLUMN and (c in deck.columns or c not in self._deck_columns)
+        ]
+        part = part[columns]
+        changed = {c: dtype for c, dtype in deck.dtypes.items() if c in part.columns and part[c].dtype != dtype}
+        if changed:
+            with contextlib.suppress(TypeError, ValueError):
+                part = part.astype(changed)
+        if deck.renames:
+            part = part.rename(columns=deck.renames)
+        part.index = deck.index
+        part.attrs = dict(deck.attrs)
+        return part
+
+    def checkpoint(self, df, writer=None, final=False):
+        requested = None
+        for deck in self.decks:
+            if not deck.dirty:
+                continue
+            if not final and not deck.backend.autosave_every:
+                # 답안마다 이미 영구 저장되는 백엔드(SQLite)는 종료 때만 내보낸다
+                continue
+            seq = deck.backend.checkpoint(self._part(df, deck), writer, final=final)
+            deck.dirty = False
+            if seq is not None:
+                requested = seq
+        return requested
+
+    def close(self) -> None:
+        for deck in self.decks:
+            deck.backend.close()
+
+
+def find_decks() -> List[Tuple[str, Path, str]]:
+    """(덱 이름, 엑셀 경로, 시트) 목록. MULTI_DECK면 단어장 폴더의 엑셀 전부, ALL_SHEETS면 시트마다 덱.
+
+    덱 이름은 파일 이름(확장자 제외), 시트가 여럿이면 '파일/시트'.
+    """
+    paths = core.CONFIG.file_paths if core.MULTI_DECK else [core.CONFIG.file_path]
+    decks = []
+    for path in paths:
+        sheets = xlsx.sheet_names(path) if core.ALL_SHEETS else [core.SHEET_NAME]
+        for sheet in sheets:
+            decks.append((path.stem if len(sheets) == 1 else f"{path.stem}/{sheet}", path, sheet))
+    return decks
+
+
+def open_decks(kind: Optional[str] = None) -> StateBackend:
+    """find_decks()의 덱이 하나면 그 백엔드를, 여럿이면 DeckSet을 돌려준다."""
+    found = find_decks()
+    if len(found) == 1:
+        _, path, sheet_name = found[0]
+        return open_backend(path, sheet_name, kind)
+    decks = [Deck(name, path, sheet_name, open_backend(path, sheet_name, kind)) for name, path, sheet_name in found]
+    return DeckSet(decks, workers=core.LOAD_WORKERS)
+
+
+# ===== 학습자 =====
+LEARNER_COLUMNS = ("Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due")
+_BAD_NAME_CHARS = set('\\/:*?"<>|')
+
+
+def learner_path(name: str) -> Path:
+    """학습자 상태 파일 경로. 첫 단어장 엑셀과 같은 폴더의 `<이름>.learner.json`."""
+    name = name.strip()
+    if not name or name.startswith(".") or _BAD_NAME_CHARS & set(name):
+        raise ValueError(f"학습자 이름으로 쓸 수 없습니다: {name!r}")
+    return core.CONFIG.file_path.parent / f"{name}.learner.json"
+
+
+def find_learners() -> List[str]:
+    """상태 파일이나 저널이 있는 학습자 이름(이름순)."""
+    names = set()
+    for path in core.CONFIG.file_path.parent.glob("*.learner.*"):
+        names.add(path.name[: path.name.index(".learner.")])
+    return sorted(names)
+
+
+class ProfileBackend(StateBackend):
+    """학습자 한 명의 상태. 단어장(base)은 불러오기·범위 선택에만 쓰고 쓰지 않는다.
+
+    `<이름>.learner.json`에는 상태가 있는 카드만 [단어, 뜻, 행 번호, 상태 열...]로 적는다.
+    입힐 때는 (단어, 뜻)으로 같은 키의 행을 모두 찾고, 키로 쓸 수 없는 카드만 행 번호로 찾는다.
+    답안은 `<이름>.learner.journal`에 먼저 쓰고, checkpoint는 이 작은 파일만 다시 쓴다.
+    """
+
+    VERSION = 1
+
+    def __init__(self, base: StateBackend, name: str, journal: bool = True, fsync: bool = False) -> None:
+        self.base = base
+        self.name = name.strip()
+        self.path = learner_path(self.name)
+        self.journal = AnswerJournal(self.path.with_suffix(AnswerJournal.SUFFIX), fsync=fsync) if journal else None
+        self.autosave_every = core.JOURNAL_COMPACT if journal else core.AUTOSAVE
+
+    @property
+    def load_info(self) -> Dict[str, object]:
+        return self.base.load_info
+
+    @property
+    def chapters(self):
+        return self.base.chapters
+
+    @property
+    def chapter_index(self):
+        return self.base.chapter_index
+
+    def describe_load(self) -> str:
+        return f"{self.base.describe_load()} · 학습자 {self.name}"
+
+    # --- 불러오기 ---
+    def load(self, scope=None):
+        # 학습자 상태는 단어장 전체에 걸쳐 있으므로 범위와 관계없이 다 읽는다
+        return self.adopt(self.base.load())
+
+    def adopt(self, words):
+        """base가 불러온 단어장에 이 학습자의 상태 열을 입힌 표. 다른 열은 words와 같이 쓴다."""
+        df = words.copy(deep=False)
+        word_col, meaning_col = core.detect_card_columns(df)
+        n = len(df)
+        state = {col: np.zeros(n, dtype=np.int64) for col in LEARNER_COLUMNS}
+        state["InitLevel"] = np.full(n, np.nan)
+        cards = self._read()
+        if cards:
+            key_rows = core.build_key_index(df[word_col], df[meaning_col])
+            rows: List[int] = []
+            src: List[int] = []
+            for i, (word, meaning, row) in enumerate(card[:3] for card in cards):
+                found = key_rows.get((word, meaning), []) if word is not None else [row] if 0 <= row < n else []
+                rows.extend(found)
+                src.extend([i] * len(found))
+            values = np.array([card[3:] for card in cards], dtype=float)[src]
+            for j, col in enumerate(LEARNER_COLUMNS):
+                state[col][rows] = values[:, j]
+        for col, values in state.items():
+            df[col] = values
+        if self.journal is not None:
+            self.recovered = self.journal.replay_into(df, word_col, meaning_col)
+        return df
+
+    def _read(self) -> list:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return []
+        if data.get("version") != self.VERSION or data.get("columns") != list(LEARNER_COLUMNS):
+            raise ValueError(f"학습자 파일 형식을 읽을 수 없습니다: {self.path}")
+        return data["cards"]
+
+    def select_positions(self, mode, spec):
+        return self.base.select_positions(mode, spec)
+
+    def start_step(self, df) -> int:
+        return int(core.int_array(df["Tries"]).sum())
+
+    # --- 기록 ---
+    def record_answer(self, key, rows, step, correct, tries, fails, seen, due) -> None:
+        if self.journal is not None:
+            self.journal.append_answer(key, int(rows[0]), step, correct, tries, fails, seen, due)
+
+    def record_level(self, key, rows, level) -> None:
+        self.record_levels([(key, rows, level)])
+
+    def record_levels(self, entries) -> None:
+        if self.journal is not None:
+            self.journal.append_levels([(key, int(rows[0]), level) for key, rows, level in entries])
+
+    # --- 저장 ---
+    @staticmethod
+    def snapshot(df):
+        """상태가 있는 행만 [word, meaning, 상태 열]로 추린 표(색인=행 번호). 저장 스레드에는 이것만 넘긴다."""
+        word_col, meaning_col = core.detect_card_columns(df)
+        keep = np.flatnonzero(
+            (core.int_array(df["Tries"]) > 0)
+            | np.isfinite(core.float_array(df["InitLevel"], fill=np.nan))
+            | (core.int_array(df["Due"]) > 0)
+        )
+        part = df.iloc[keep][[word_col, meaning_col, *LEARNER_COLUMNS]]
+        part.columns = ["word", "meaning", *LEARNER_COLUMNS]
+        part.index = keep
+        return part
+
+    @classmethod
+    def write_file(cls, snapshot, path, _sheet_name: Optional[str] = None) -> None:
+        """snapshot(snapshot()의 결과)을 학습자 파일로. 임시 파일에 다 쓴 뒤 교체한다."""
+        blank = (snapshot["word"].isna() | snapshot["meaning"].isna()).to_numpy()
+        columns = {col: core.int_array(snapshot[col]).tolist() for col in LEARNER_COLUMNS}
+        levels = core.float_array(snapshot["InitLevel"], fill=np.nan)
+        columns["InitLevel"] = [int(v) if v == v else None for v in levels.tolist()]
+        cards = []
+        keys = zip(snapshot.index.tolist(), snapshot["word"].tolist(), snapshot["meaning"].tolist(), blank.tolist())
+        for i, (row, word, meaning, unkeyed) in enumerate(keys):
+            fields = AnswerJournal._key_fields(None if unkeyed else (word, meaning), row)
+            cards.append([fields.get("w"), fields.get("m"), row, *(columns[col][i] for col in LEARNER_COLUMNS)])
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"version": cls.VERSION, "columns": list(LEARNER_COLUMNS), "cards": cards},
+                fh,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, path)
+
+    def checkpoint(self, df, writer=None, final=False):
+        journal = self.journal
+        sealed = journal.rotate() if journal is not None else None
+        snapshot = self.snapshot(df)
+
+        def on_saved(_snapshot=None) -> None:
+            if sealed is not None:
+                journal.discard(sealed)
+
+        if writer is None:
+            self.write_file(snapshot, self.path)
+            on_saved()
+            return None
+        return writer.submit(snapshot, on_saved=on_saved, path=self.path, sheet_name=self.name, write=self.write_file)
+
+    def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+        self.base.close()
+
+
+def _sql_value(value):
+    """sqlite에 넣을 수 있는 값으로. 결측은 NULL, 날짜 등은 문자열."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, (str, int, float, bytes)):
+        return value
+    return str(value)
@@ -0,0 +1,239 @@
+"""K/PRIOR_MAP 맞추기.
+
+사용법:
+    python 영단어_tune.py [--file 엑셀 ...] [--workers 0] [--out 영단어_params.json] [--dry-run] [--json]
+
+diff = (prior*K + fails) / (K + tries)는 오답률에 Beta(prior*K, (1-prior)*K) 사전분포를 둔
+사후 평균이다. 그래서 카드마다 (InitLevel, Tries, Fails)가 주어지면 (K, prior_1..4)의
+베타-이항 우도를 바로 계산할 수 있다. 이 모형에서는 답안 순서와 상관없이 횟수만으로
+우도가 정해지므로, 저장된 Tries/Fails가 답안 기록 전체를 대신한다(저널에 남은 기록은
+불러올 때 이미 반영됨).
+
+- 같은 (난이도, Tries, Fails) 카드는 한 번만 계산하고 개수를 가중치로 곱한다.
+- K 격자 × prior 격자 전체를 NumPy 배열 한 번으로 평가하고, K 격자는 프로세스 풀에 나눈다.
+  K가 정해지면 난이도별 prior는 서로 독립이므로 난이도마다 따로 최댓값을 고른다.
+- 거친 격자에서 찾은 값 주변을 한 번 더 촘촘하게 찾는다.
+
+결과는 PARAMS_FILE(기본 영단어_params.json)에 쓰고, 영단어.py가 시작할 때 읽는다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+core = importlib.import_module("영단어")
+np = core.lazy_import("numpy")
+
+K_GRID = (0.25, 50.0, 60)       # 거친 K 격자(최소, 최대, 개수, 로그 간격)
+PRIOR_STEP = 0.005              # 거친 prior 간격(0 ~ 1-간격)
+POOL_MIN_CELLS = 20_000_000     # 격자 × 카드 묶음 × 최대 Tries가 이보다 크면 프로세스 풀 사용
+CHUNK_CELLS = 4_000_000         # 한 번에 만드는 배열 크기 상한(원소 수)
+
+
+# ===== 데이터 =====
+def card_counts(df) -> Dict[int, Tuple[object, object, object]]:
+    """난이도 → (Tries, Fails, 카드 수) 배열. 한 번도 안 푼 카드는 우도에 영향이 없어 뺀다."""
+    tries = core.int_array(df["Tries"])
+    fails = np.clip(core.int_array(df["Fails"]), 0, None)
+    fails = np.minimum(fails, tries)
+    levels = np.trunc(core.float_array(df["InitLevel"], fill=np.nan))
+    out = {}
+    for level in sorted(int(k) for k in core.PRIOR_MAP):
+        hit = (levels == level) & (tries > 0)
+        if not hit.any():
+            continue
+        pairs, counts = np.unique(np.stack([tries[hit], fails[hit]], axis=1), axis=0, return_counts=True)
+        out[level] = (pairs[:, 0], pairs[:, 1], counts)
+    return out
+
+
+def load_frames(files: List[str]) -> list:
+    """--file로 준 엑셀들, 없으면 앱과 같은 방식으로 찾은 덱 전체."""
+    store = importlib.import_module("영단어_store")
+    if not files:
+        backend = store.open_decks()
+        try:
+            return [backend.load()]
+        finally:
+            backend.close()
+    frames = []
+    for path in files:
+        backend = store.open_backend(path, core.SHEET_NAME)
+        try:
+            frames.append(backend.load())
+        finally:
+            backend.close()
+    return frames
+
+
+# ===== 우도 =====
+def loglik_grid(tries, fails, weights, ks, priors):
+    """베타-이항 로그우도(이항계수 제외) 격자 [len(ks), len(priors)].
+
+    log B(f+a, t-f+b) - log B(a, b) = Σ_{i<f} log(a+i) + Σ_{j<t-f} log(b+j) - Σ_{i<t} log(a+b+i)
+    Tries가 정수이므로 0..max(Tries) 누적합을 한 번 만들어 두고 카드 묶음마다 꺼내 쓴다.
+    """
+    ks = np.asarray(ks, dtype=float)[:, None, None]
+    priors = np.asarray(priors, dtype=float)[None, :, None]
+    steps = np.arange(int(tries.max()), dtype=float)[None, None, :]
+    a = priors * ks
+    b = (1.0 - priors) * ks
+
+    def cumulative(x):
+        with np.errstate(divide="ignore"):
+            logs = np.log(x + steps)
+        zero = np.zeros(logs.shape[:2] + (1,))
+        return np.concatenate([zero, np.cumsum(logs, axis=2)], axis=2)
+
+    # prior=0에서 틀린 적이 있는 카드는 -inf(그 prior는 불가능)
+    total = cumulative(a)[:, :, fails] + cumulative(b)[:, :, tries - fails] - cumulative(a + b)[:, :, tries]
+    return total @ weights.astype(float)
+
+
+def _grid_chunk(args) -> Dict[int, object]:
+    counts, ks, priors = args
+    out = {}
+    for level, (t, f, w) in counts.items():
+        # (K, prior, max Tries) 누적합 배열이 CHUNK_CELLS를 넘지 않게 K를 잘라 계산한다
+        rows = max(CHUNK_CELLS // (len(priors) * (int(t.max()) + 1 + len(t))), 1)
+        out[level] = np.concatenate(
+            [loglik_grid(t, f, w, ks[i:i + rows], priors) for i in range(0, len(ks), rows)]
+        )
+    return out
+
+
+def search(counts, ks, priors, workers: int = 1) -> Tuple[Dict[int, object], int]:
+    """난이도별 로그우도 격자. 크면 K 격자를 나눠 프로세스 풀에서 계산한다. 반환: (격자, 프로세스 수)"""
+    cells = len(ks) * len(priors) * sum(len(t) * int(t.max()) for t, _, _ in counts.values())
+    count = min(workers or os.cpu_count() or 1, len(ks))
+    if count <= 1 or cells < POOL_MIN_CELLS:
+        return _grid_chunk((counts, ks, priors)), 1
+    chunks = [(counts, part, priors) for part in np.array_split(np.asarray(ks), count)]
+    with ProcessPoolExecutor(max_workers=count, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = list(pool.map(_grid_chunk, chunks))
+    return {level: np.concatenate([part[level] for part in parts]) for level in counts}, count
+
+
+def best_fit(grid: Dict[int, object], ks, priors) -> Tuple[float, Dict[int, float], float]:
+    """K마다 난이도별 최대 prior를 골라 합이 가장 큰 K. 반환: (K, {난이도: prior}, 로그우도)"""
+    total = sum(values.max(axis=1) for values in grid.values())
+    i = int(np.argmax(total))
+    prior_map = {level: float(priors[int(np.argmax(values[i]))]) for level, values in grid.items()}
+    return float(ks[i]), prior_map, float(total[i])
+
+
+def loglik_at(counts, k: float, prior_map: Dict[int, float]) -> float:
+    return float(
+        sum(loglik_grid(t, f, w, [k], [prior_map.get(level, 0.5)])[0, 0] for level, (t, f, w) in counts.items())
+    )
+
+
+def fit(counts, workers: int = 0) -> Dict[str, object]:
+    lo, hi, n = K_GRID
+    ks = np.geomspace(lo, hi, n)
+    priors = np.arange(0.0, 1.0, PRIOR_STEP)
+    grid, used = search(counts, ks, priors, workers)
+    k, prior_map, _ = best_fit(grid, ks, priors)
+
+    # 찾은 K 양옆 격자 칸 사이와 prior ±한 칸을 촘촘히 다시 본다
+    i = int(np.argmin(np.abs(ks - k)))
+    fine_ks = np.geomspace(ks[max(i - 1, 0)], ks[min(i + 1, n - 1)], 41)
+    fine_priors = np.unique(
+        np.clip(
+            np.concatenate([np.linspace(p - PRIOR_STEP, p + PRIOR_STEP, 21) for p in prior_map.values()]),
+            0.0,
+            1.0 - PRIOR_STEP / 10,
+        )
+    )
+    fine, _ = search(counts, fine_ks, fine_priors, 1)
+    k, prior_map, loglik = best_fit(fine, fine_ks, fine_priors)
+    return {"K": k, "PRIOR_MAP": prior_map, "loglik": loglik, "workers": used}
+
+
+# ===== 명령 =====
+def _finite(value: float) -> Optional[float]:
+    return round(value, 3) if np.isfinite(value) else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="저장된 Tries/Fails/InitLevel로 K와 PRIOR_MAP을 맞춘다")
+    parser.add_argument("--file", action="append", default=[], help="읽을 엑셀(여러 번 가능, 없으면 단어장 전체)")
+    parser.add_argument("--workers", type=int, default=0, help="프로세스 수(0=CPU 수, 1=이 프로세스에서)")
+    parser.add_argument("--out", default=None, help=f"결과 파일(기본: {core.PARAMS_FILE}, 영단어.py 옆)")
+    parser.add_argument("--dry-run", action="store_true", help="파일에 쓰지 않고 결과만 보여 줌")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    core.load_params()
+
+    started = time.perf_counter()
+    frames = load_frames(args.file)
+    loaded = time.perf_counter() - started
+    counts: Dict[int, Tuple[object, object, object]] = {}
+    for df in frames:
+        for level, (t, f, w) in card_counts(df).items():
+            if level in counts:
+                t0, f0, w0 = counts[level]
+                t, f, w = np.concatenate([t0, t]), np.concatenate([f0, f]), np.concatenate([w0, w])
+            counts[level] = (t, f, w)
+    if not counts:
+        print("한 번 이상 푼 카드가 없어 맞출 수 없습니다.", file=sys.stderr)
+        return 1
+
+    before_k, before_prior = core.K, dict(core.PRIOR_MAP)
+    result = fit(counts, args.workers)
+    # 데이터가 없는 난이도는 지금 값을 그대로 둔다
+    prior_map = {level: result["PRIOR_MAP"].get(level, before_prior[level]) for level in sorted(before_prior)}
+    seconds = time.perf_counter() - started
+    cards = {level: int(w.sum()) for level, (_, _, w) in counts.items()}
+    report = {
+        "K": round(result["K"], 4),
+        "PRIOR_MAP": {str(level): round(value, 4) for level, value in prior_map.items()},
+        "fitted": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "cards": cards,
+            "answers": int(sum((t * w).sum() for t, _, w in counts.values())),
+            "loglik": _finite(result["loglik"]),
+            "previous": {"K": before_k, "PRIOR_MAP": {str(k): v for k, v in before_prior.items()}},
+            # prior 0에서 틀린 카드가 있으면 -inf라 JSON에는 null로
+            "previous_loglik": _finite(loglik_at(counts, before_k, before_prior)),
+            "load_seconds": round(loaded, 3),
+            "seconds": round(seconds, 3),
+            "workers": result["workers"],
+        },
+    }
+
+    out: Optional[Path] = None
+    if not args.dry_run:
+        out = Path(args.out) if args.out else core.params_path()
+        out.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    fitted = report["fitted"]
+    print(f"카드 {sum(cards.values()):,}장(난이도별 {cards}), 답안 {fitted['answers']:,}회")
+    print(f"K {before_k:g} → {report['K']:g}")
+    for level in sorted(prior_map):
+        note = "" if level in counts else " (푼 카드 없음, 유지)"
+        print(f"PRIOR_MAP[{level}] {before_prior[level]:g} → {prior_map[level]:g}{note}")
+    before, after = (
+        "-inf" if value is None else f"{value:,.1f}" for value in (fitted["previous_loglik"], fitted["loglik"])
+    )
+    print(f"로그우도 {before} → {after}")
+    print(f"불러오기 {loaded:.2f}초, 전체 {seconds:.2f}초 (프로세스 {fitted['workers']}개)")
+    print(f"저장: {out}" if out is not None else "(--dry-run: 저장하지 않음)")
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
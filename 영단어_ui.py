@@ -1,15 +1,21 @@
-﻿import importlib
+﻿from __future__ import annotations
+
+import copy
+import importlib
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
 from typing import Callable, Dict, List, Optional, Tuple
 
-import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, ttk
 
 core = importlib.import_module("영단어")
-
-WORD_CANDIDATES = ["영어", "단어", "Word", "단어(영어)", "단어(ENG)"]
-MEANING_CANDIDATES = ["뜻", "의미", "뜻풀이", "뜻(한국어)", "뜻(의미)", "Meaning"]
-STATE_COLUMNS = {"Tries", "Fails", "LastStep", "InitLevel", "Day", "챕터"}
+store = importlib.import_module("영단어_store")
+pd = core.lazy_import("pandas")
+np = core.lazy_import("numpy")
 
 INIT_LEVEL_LABELS = {
     1: "매우 익숙",
@@ -17,55 +23,214 @@ INIT_LEVEL_LABELS = {
     3: "애매함",
     4: "잘 모름",
 }
+BULK_PAGE_SIZE = 20  # 새 카드 난이도 표의 한 쪽 행 수
+NO_LEARNER = "(단어장에 저장)"  # 학습자 목록에서 학습자 없이 단어장에 바로 저장하는 항목
+# PROFILE=True일 때 상태 표시줄에 보일 단계(core.TIMINGS 이름 → 표시 이름)
+PROFILE_LABELS = {
+    "choose_next_card": "출제",
+    "record_answer": "기록",
+    "prefetch": "미리 출제",
+    "update_overall_summary": "요약",
+    "save": "저장 요청",
+    "save_write": "저장",
+    "load": "불러오기",
+}
+
+
+class Tally:
+    """카드 묶음의 누적 횟수. 정답 수는 행마다 max(0, Tries-Fails)를 더한 값."""
+
+    __slots__ = ("cards", "tries", "fails", "correct", "new", "unrated")
+
+    def __init__(
+        self, cards: int = 0, tries: int = 0, fails: int = 0, correct: int = 0, new: int = 0, unrated: int = 0
+    ) -> None:
+        self.cards = cards
+        self.tries = tries
+        self.fails = fails
+        self.correct = correct
+        self.new = new  # 한 번도 안 푼 카드
+        self.unrated = unrated  # 그중 InitLevel도 아직 정하지 않은 카드
+
+    def add(self, tries: int, fails: int, unrated: bool, sign: int = 1) -> None:
+        self.cards += sign
+        self.tries += sign * tries
+        self.fails += sign * fails
+        self.correct += sign * max(0, tries - fails)
+        self.new += sign * (tries == 0)
+        self.unrated += sign * bool(unrated)
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self.correct / self.tries if self.tries > 0 else None
+
+    def rate_text(self) -> str:
+        if self.tries <= 0:
+            return "-"
+        return f"{self.correct / self.tries * 100:.0f}% ({self.correct}/{self.tries})"
+
 
+class SessionStats:
+    """서브셋의 전체/챕터별 Tally.
 
-def detect_column(df: pd.DataFrame, candidates: List[str], exclude: set[str]) -> str:
-    for name in candidates:
-        if name in df.columns:
-            return name
-    for col in df.columns:
-        if col not in exclude:
-            return col
-    return df.columns[0]
+    처음에 열 전체를 한 번 세고, 그 뒤로는 바뀐 행의 예전 값을 빼고 새 값을 더한다.
+    챕터를 알 수 없는 카드는 None 챕터로 모은다.
+    """
+
+    def __init__(self, tries, fails, unrated, chapters=None) -> None:
+        tries = np.asarray(tries, dtype=np.int64)
+        fails = np.asarray(fails, dtype=np.int64)
+        if chapters is None:
+            nums = np.full(len(tries), np.nan)
+        else:
+            nums = core.float_array(chapters, fill=np.nan)
+        codes = np.where(np.isfinite(nums), np.trunc(nums), -1).astype(np.int64)
+        keys, inverse = np.unique(codes, return_inverse=True)
+        inverse = inverse.ravel()
+        columns = {
+            "cards": np.ones(len(tries)),
+            "tries": tries,
+            "fails": fails,
+            "correct": np.clip(tries - fails, 0, None),
+            "new": tries == 0,
+            "unrated": np.asarray(unrated, dtype=bool),
+        }
+        sums = {name: np.bincount(inverse, weights=values, minlength=len(keys)) for name, values in columns.items()}
+        self._keys: List[Optional[int]] = [int(key) if key >= 0 else None for key in keys]
+        self._row_chapter = inverse
+        self.total = Tally(**{name: int(values.sum()) for name, values in columns.items()})
+        self.chapters: Dict[Optional[int], Tally] = {
+            key: Tally(**{name: int(sums[name][i]) for name in columns}) for i, key in enumerate(self._keys)
+        }
+
+    def chapter_of(self, pos: int) -> Optional[int]:
+        return self._keys[self._row_chapter[pos]]
+
+    def replace(self, pos: int, before: Tuple[int, int, bool], after: Tuple[int, int, bool]) -> None:
+        """서브셋 pos 행의 (Tries, Fails, 난이도 미정)이 before → after로 바뀌었다."""
+        if before == after:
+            return
+        for tally in (self.total, self.chapters[self.chapter_of(pos)]):
+            tally.add(*before, sign=-1)
+            tally.add(*after)
 
 
 class StudySession:
-    def __init__(self, df: pd.DataFrame, filter_mode: str, chapter_spec: str, count_spec: str) -> None:
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        filter_mode: str,
+        chapter_spec: str,
+        count_spec: str,
+        backend: Optional["store.StateBackend"] = None,
+        due_index: Optional["core.DueIndex"] = None,
+    ) -> None:
+        self.backend = backend
+
+        # DataFrame은 불러오기/저장 때만 쓴다. 학습 중 상태는 self.cards 배열에 있다.
+        # 표와 표 전체 색인은 범위를 바꿔도(switch_range) 새 세션과 같이 쓴다.
+        self._frame = core.ensure_state_cols(df.copy())
+
+        self.word_col, self.meaning_col = core.detect_card_columns(self._frame)
+
+        self.chapter_index = self._load_chapter_index()
+        # 표 전체의 Due 색인(설정 창의 복습 수). 불러올 때 만든 것이 있으면 그대로 쓴다
+        if due_index is None or len(due_index) != len(self._frame):
+            due_index = core.DueIndex(self._frame["Due"])
+        self.due_index = due_index
+        self.cur_step = int(core.int_array(self._frame["Tries"]).sum())
+        self.asked = 0
+        self._select(filter_mode, chapter_spec, count_spec)
+
+        # 같은 (단어, 뜻) 행들은 한 카드로 보고 함께 갱신한다. 중복 키만 색인에 둔다.
+        self._df_dups = core.build_duplicate_index(self._frame[self.word_col], self._frame[self.meaning_col])
+        self.duplicate_keys = self._df_dups
+
+    def _select(self, filter_mode: str, chapter_spec: str, count_spec: str) -> None:
+        """범위를 고르고 범위 안 카드 배열·스케줄러·집계를 만든다."""
         self.filter_mode = filter_mode if filter_mode in {"chapter", "count"} else core.FILTER_MODE
         self.chapter_spec = (chapter_spec or str(core.CHAPTER_SPEC)).strip()
         self.count_spec = (count_spec or str(core.COUNT_SPEC)).strip()
 
-        self.df = core.ensure_state_cols(df.copy())
-
-        self.word_col = detect_column(self.df, WORD_CANDIDATES, STATE_COLUMNS)
-        meaning_exclude = STATE_COLUMNS | {self.word_col}
-        self.meaning_col = detect_column(self.df, MEANING_CANDIDATES, meaning_exclude)
-
-        self.sub, self.sel_desc = self._build_subset()
-        if self.sub.empty:
+        positions, self.sel_desc, labels = self._build_subset()
+        if not len(positions):
             raise ValueError("선택된 범위에 학습할 단어가 없습니다.")
-
-        self.cur_step = int(pd.to_numeric(self.df["Tries"], errors="coerce").fillna(0).sum())
-        self.asked = 0
+        self.cards = core.CardStore(self._frame, positions, self.word_col, self.meaning_col, labels)
         self.current_idx: Optional[int] = None
-
-    def _build_subset(self) -> Tuple[pd.DataFrame, str]:
+        # prefetch 결과 (색인, step, {정답 여부: (다음 위치, 그때 step)})와, 답안 기록 뒤 choose_next_card가 쓸 것
+        self._prefetched: Optional[Tuple[object, int, Dict[bool, Tuple[Optional[int], int]]]] = None
+        self._next_pick: Optional[Tuple[Optional[int], int]] = None
+
+        _, diffs, _ = self.cards.scores(self.cur_step)
+        self.scheduler = core.make_scheduler(diffs, self.cards.last, self.cur_step)
+        self._due = core.DueIndex(self.cards.due)
+        self._sub_dups = core.build_duplicate_index(self.cards.word, self.cards.meaning)
+
+        # InitLevel을 아직 정하지 않은 새 카드의 위치. 앞에서부터 꺼내고,
+        # 그사이 (중복 행 동기화 등으로) 정해진 카드는 꺼낼 때 건너뛴다.
+        need = (self.cards.tries == 0) & ~np.isin(np.trunc(self.cards.level), list(INIT_LEVEL_LABELS))
+        self._pending_init = deque(np.flatnonzero(need).tolist())
+
+        # 요약용 누적 집계. record_answer/set_init_levels가 바뀐 행만 반영한다.
+        if self.chapter_index is not None:
+            chapters = self.chapter_index.numbers[self.cards.rows]
+        elif "챕터" in self._frame.columns:
+            chapters = self._frame["챕터"].to_numpy()[self.cards.rows]
+        else:
+            chapters = None
+        self.stats = SessionStats(self.cards.tries, self.cards.fails, need, chapters)
+
+    def switch_range(self, filter_mode: str, chapter_spec: str, count_spec: str) -> "StudySession":
+        """같은 표를 쓰는 다른 범위의 세션. 표를 복사하거나 저장하지 않는다.
+
+        바뀐 상태를 표에 옮긴 뒤 표·중복 색인·챕터 색인·백엔드는 그대로 같이 쓰고,
+        범위 안 카드 배열과 스케줄러만 새로 만든다. step과 진행 수는 이어 간다.
+        범위가 비어 있으면 ValueError이고 이 세션은 그대로 쓸 수 있다.
+        """
+        self.cards.flush(self._frame)
+        session = copy.copy(self)
+        session._select(filter_mode, chapter_spec, count_spec)
+        return session
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """저장·범위 재설정에 넘길 DataFrame. 카드 배열에서 바뀐 상태를 먼저 옮겨 쓴다."""
+        self.cards.flush(self._frame)
+        return self._frame
+
+    def _load_chapter_index(self) -> Optional["core.ChapterIndex"]:
+        """행별 챕터 색인. 백엔드가 불러올 때 만들어 둔 것이 있으면 그대로 쓴다."""
+        if "Day" not in self._frame.columns:
+            return None
+        index = self.backend.chapter_index if self.backend is not None else None
+        if index is None or len(index) != len(self._frame):
+            index = core.ChapterIndex.from_days(self._frame["Day"])
+        return index
+
+    def _build_subset(self) -> Tuple["np.ndarray", str, object]:
+        """범위에 드는 DataFrame 행 위치, 설명, 세션 색인(카드를 부르는 이름)."""
+        df = self._frame
+        spec = self.chapter_spec if self.filter_mode == "chapter" else self.count_spec
+        selected = self.backend.select_positions(self.filter_mode, spec) if self.backend else None
         if self.filter_mode == "chapter":
-            if "Day" not in self.df.columns:
+            if self.chapter_index is None:
                 raise ValueError("엑셀에 'Day' 컬럼이 없어 챕터 기준을 사용할 수 없습니다.")
-            self.df["챕터"] = self.df["Day"].apply(core.to_chapter_num)
-            want = core.parse_chapter_spec(self.chapter_spec)
-            subset = self.df[self.df["챕터"].isin(want)].copy()
+            df["챕터"] = self.chapter_index.numbers
+            if selected is None:
+                selected = self.chapter_index.positions(core.parse_chapter_spec(self.chapter_spec))
+            positions = selected
+            labels = df.index[positions].to_numpy()
             desc = f"챕터 {self.chapter_spec}"
         elif self.filter_mode == "count":
-            positions = core.parse_count_spec(self.count_spec)
-            df_reset = self.df.reset_index(drop=True)
-            zero_based = [p - 1 for p in sorted(set(positions)) if 1 <= p <= len(df_reset)]
-            subset = df_reset.iloc[zero_based].copy()
+            if selected is None:
+                selected = core.parse_count_spec(self.count_spec).shift(-1).clip(0, len(df) - 1).array()
+            positions = selected
+            # 번호 모드는 0부터 센 행 번호가 색인
+            labels = np.asarray(positions, dtype=np.int64)
             desc = f"번호 {self.count_spec}"
         else:
             raise ValueError("FILTER_MODE는 'chapter' 또는 'count'만 지원합니다.")
-        return subset, desc
+        return positions, desc, labels
 
     @staticmethod
     def _is_valid_init_level(value: object) -> bool:
@@ -76,51 +241,133 @@ class StudySession:
         except (TypeError, ValueError):
             return False
 
-    @staticmethod
-    def _safe_int(value: object, default: int = 0) -> int:
-        if value is None or pd.isna(value):
-            return default
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return default
+    def _card_diff(self, pos: int, tries: Optional[int] = None, fails: Optional[int] = None) -> float:
+        cards = self.cards
+        prior = core.get_prior(float(cards.level[pos]))
+        tries = int(cards.tries[pos]) if tries is None else tries
+        fails = int(cards.fails[pos]) if fails is None else fails
+        return core.bayes_diff(prior, core.K, fails, tries)
+
+    def _reschedule(self, pos: int) -> None:
+        self.scheduler.update(pos, self._card_diff(pos), int(self.cards.last[pos]), self.cur_step)
+
+    def _card_rows(self, pos: int) -> Tuple[List[int], List[int]]:
+        """pos 카드와 같은 (단어, 뜻)인 (DataFrame 행, 세션 위치). 단어/뜻이 비었으면 자기 자신만."""
+        key = self.cards.key(pos)
+        return self._df_dups.get(key, [int(self.cards.rows[pos])]), self._sub_dups.get(key, [pos])
+
+    def _row_state(self, pos: int) -> Tuple[int, int, bool]:
+        """집계에 쓰는 카드 상태: (Tries, Fails, 난이도를 정해야 하는 새 카드인지)"""
+        tries = int(self.cards.tries[pos])
+        return tries, int(self.cards.fails[pos]), tries == 0 and not self._is_valid_init_level(
+            float(self.cards.level[pos])
+        )
 
-    def get_pending_init_card(self) -> Optional[Tuple[int, pd.Series]]:
-        for idx, row in self.sub.iterrows():
-            if self._safe_int(row["Tries"]) == 0 and not self._is_valid_init_level(row.get("InitLevel")):
-                return idx, row
+    def _row_states(self, positions: List[int]) -> List[Tuple[int, int, bool]]:
+        tries = self.cards.tries[positions]
+        unrated = (tries == 0) & ~np.isin(np.trunc(self.cards.level[positions]), list(INIT_LEVEL_LABELS))
+        return list(zip(tries.tolist(), self.cards.fails[positions].tolist(), unrated.tolist()))
+
+    def _write_state(self, pos: int, tries: int, fails: int, last: int, seen: int, due: int) -> List[int]:
+        """pos 카드(와 같은 키의 행)에 답안 결과를 쓰고 집계·스케줄러·Due 색인을 고친다. 반환: DataFrame 행."""
+        df_rows, sub_rows = self._card_rows(pos)
+        before = [self._row_state(p) for p in sub_rows]
+        self.cards.set_state(sub_rows, tries, fails, last, seen, due, df_rows)
+        self._due.set(sub_rows, due)
+        self.due_index.set(df_rows, due)
+        for p, state in zip(sub_rows, before):
+            self.stats.replace(p, state, self._row_state(p))
+            self._reschedule(p)
+        return df_rows
+
+    def _needs_init(self, pos: int) -> bool:
+        return self._row_state(pos)[2]
+
+    def get_pending_init_card(self) -> Optional[Tuple[int, "core.Card"]]:
+        pending = self._pending_init
+        while pending:
+            pos = pending[0]
+            if self._needs_init(pos):
+                card = self.cards.card(pos)
+                return card.idx, card
+            pending.popleft()
         return None
 
+    def pending_init_cards(self) -> List[Tuple[int, object, object]]:
+        """아직 난이도를 정하지 않은 카드 (색인, 단어, 뜻). 같은 (단어, 뜻)은 한 번만."""
+        self._pending_init = deque(pos for pos in self._pending_init if self._needs_init(pos))
+        cards = self.cards
+        out: List[Tuple[int, object, object]] = []
+        seen = set()
+        for pos in self._pending_init:
+            key = cards.key(pos)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            out.append((cards.index[pos], cards.word[pos], cards.meaning[pos]))
+        return out
+
+    def pending_init_count(self) -> int:
+        """난이도를 아직 정하지 않은 새 카드 행 수(중복 행은 따로 셈)."""
+        return self.stats.total.unrated
+
     def set_init_level(self, idx: int, level: int) -> None:
-        self.sub.loc[idx, "InitLevel"] = level
-        mask = (
-            (self.df[self.word_col] == self.sub.loc[idx, self.word_col])
-            & (self.df[self.meaning_col] == self.sub.loc[idx, self.meaning_col])
-        )
-        self.df.loc[mask, "InitLevel"] = level
+        self.set_init_levels({idx: level})
 
-    def choose_next_card(self) -> Optional[Tuple[int, pd.Series]]:
-        if self.sub.empty:
+    def set_init_levels(self, levels: Dict[int, int]) -> None:
+        """여러 카드의 InitLevel을 한 번에 쓰고 저장소에도 한 묶음으로 기록한다."""
+        if not levels:
+            return
+        targets = []
+        entries = []
+        for idx, level in levels.items():
+            pos = self.cards.position(idx)
+            df_rows, sub_rows = self._card_rows(pos)
+            targets.append((sub_rows, df_rows, level))
+            entries.append((self.cards.key(pos), df_rows, level))
+        self._prefetched = self._next_pick = None
+        touched = sorted({p for sub_rows, _, _ in targets for p in sub_rows})
+        before = self._row_states(touched)
+        for sub_rows, df_rows, level in targets:
+            self.cards.set_level(sub_rows, level, df_rows)
+        for pos, state, after in zip(touched, before, self._row_states(touched)):
+            self.stats.replace(pos, state, after)
+
+        _, diffs, _ = self.cards.scores(self.cur_step, touched)
+        for pos, diff in zip(touched, diffs.tolist()):
+            self.scheduler.update(pos, diff, int(self.cards.last[pos]), self.cur_step)
+        if self.backend is not None:
+            self.backend.record_levels(entries)
+
+    @core.timed("choose_next_card")
+    def choose_next_card(self) -> Optional[Tuple[int, "core.Card"]]:
+        if not len(self.cards):
             return None
+        ahead, self._next_pick = self._next_pick, None
+        if core.DUE_MODE:
+            # 복습 시각이 지난 카드가 먼저다. 미리 구한 카드는 이때 버린다
+            pos = self._due.next_due(int(time.time()))
+            if pos is not None:
+                card = self.cards.card(pos)
+                self.current_idx = card.idx
+                return card.idx, card
+        if ahead is not None:
+            pos, self.cur_step = ahead
+            if pos is None:
+                self.current_idx = None
+                return None
+            self.scheduler.taken(pos)
+            card = self.cards.card(pos)
+            self.current_idx = card.idx
+            return card.idx, card
         attempts = 0
-        while attempts <= len(self.sub):
-            scored: List[Tuple[int, float, float, float]] = []
-            for idx, row in self.sub.iterrows():
-                tries = self._safe_int(row["Tries"])
-                fails = self._safe_int(row["Fails"])
-                last = self._safe_int(row["LastStep"])
-                prior = core.get_prior(row["InitLevel"])
-                diff = core.bayes_diff(prior, core.K, fails, tries)
-                recn = core.recency_norm(self.cur_step, last)
-                risk = diff * recn
-                scored.append((idx, risk, diff, recn))
-
-            scored.sort(key=lambda x: (x[1], x[3]), reverse=True)
-            pick = next((r for r in scored if r[1] > 0), None)
-            if pick is not None:
-                idx_top = pick[0]
-                self.current_idx = idx_top
-                return idx_top, self.sub.loc[idx_top].copy()
+        while attempts <= len(self.cards):
+            pos = self.scheduler.best(self.cur_step)
+            if pos is not None and self.scheduler.risk(pos, self.cur_step)[0] > 0:
+                card = self.cards.card(pos)
+                self.current_idx = card.idx
+                return card.idx, card
 
             self.cur_step += 1
             attempts += 1
@@ -128,42 +375,67 @@ class StudySession:
         self.current_idx = None
         return None
 
+    @core.timed("prefetch")
+    def prefetch(self, idx) -> None:
+        """idx 카드를 맞혔을 때와 틀렸을 때 choose_next_card가 낼 카드를 미리 구해 둔다.
+
+        상태는 바꾸지 않는다. 그사이 상태가 바뀌면(난이도 설정, 다른 답안, 범위 변경) 결과는 버려진다.
+        """
+        pos = self.cards.position(idx)
+        _, sub_rows = self._card_rows(pos)
+        # 미리 구한 카드를 낼 때 미뤄 둔 step 진행도 여기서 해 둔다
+        self.scheduler.advance(self.cur_step)
+        tries = int(self.cards.tries[pos]) + 1
+        picks: Dict[bool, Tuple[Optional[int], int]] = {}
+        for correct in (True, False):
+            fails = int(self.cards.fails[pos]) + (0 if correct else 1)
+            changes = {p: (self._card_diff(p, tries, fails), self.cur_step) for p in sub_rows}
+            step = self.cur_step + 1
+            pick: Optional[int] = None
+            # choose_next_card처럼 risk가 0이면 step을 넘기며 다시 본다
+            for _ in range(len(self.cards) + 1):
+                pos_next, risk = self.scheduler.peek(step, changes)
+                if pos_next is not None and risk > 0:
+                    pick = pos_next
+                    break
+                step += 1
+            picks[correct] = (pick, step)
+        self._prefetched = (idx, self.cur_step, picks)
+
+    @core.timed("record_answer")
     def record_answer(self, idx: int, correct: bool) -> None:
-        row = self.sub.loc[idx]
-        mask = (
-            (self.df[self.word_col] == row[self.word_col])
-            & (self.df[self.meaning_col] == row[self.meaning_col])
-        )
-        self.df.loc[mask, "Tries"] = (
-            self.df.loc[mask, "Tries"].fillna(0).astype(int) + 1
-        )
-        self.sub.loc[idx, "Tries"] = self._safe_int(row["Tries"]) + 1
-
-        if not correct:
-            self.df.loc[mask, "Fails"] = (
-                self.df.loc[mask, "Fails"].fillna(0).astype(int) + 1
-            )
-            self.sub.loc[idx, "Fails"] = self._safe_int(row["Fails"]) + 1
-
-        self.df.loc[mask, "LastStep"] = self.cur_step
-        self.sub.loc[idx, "LastStep"] = self.cur_step
-
+        ahead, self._prefetched = self._prefetched, None
+        pos = self.cards.position(idx)
+        tries = int(self.cards.tries[pos]) + 1
+        fails = int(self.cards.fails[pos]) + (0 if correct else 1)
+        seen = int(time.time())
+        due = seen + core.due_interval(self._card_diff(pos, tries, fails), tries, fails)
+        df_rows = self._write_state(pos, tries, fails, self.cur_step, seen, due)
+        if self.backend is not None:
+            self.backend.record_answer(self.cards.key(pos), df_rows, self.cur_step, correct, tries, fails, seen, due)
+
+        if ahead is not None and ahead[0] == idx and ahead[1] == self.cur_step:
+            self._next_pick = ahead[2][correct]
+        else:
+            self._next_pick = None
         self.cur_step += 1
         self.asked += 1
         self.current_idx = None
 
-    def describe_card_stats(self, row: pd.Series) -> Tuple[str, str]:
-        tries = self._safe_int(row.get("Tries"))
-        fails = self._safe_int(row.get("Fails"))
+    def describe_card_stats(self, card: "core.Card") -> Tuple[str, str]:
+        tries = card.tries
+        fails = card.fails
         if tries > 0:
             correct = max(0, tries - fails)
             rate = f"{correct / tries * 100:.0f}% ({correct}/{tries})"
         else:
             rate = "-"
 
-        last = self._safe_int(row.get("LastStep"))
+        last = card.last
         if last <= 0:
             last_seen = "처음 진행"
+        elif core.DUE_MODE and card.seen > 0:
+            last_seen = describe_elapsed(time.time() - card.seen)
         else:
             delta = max(0, self.cur_step - last)
             if delta == 0:
@@ -174,72 +446,202 @@ class StudySession:
                 last_seen = f"{delta}문제 전"
         return rate, last_seen
 
-    def needs_autosave(self) -> bool:
-        return bool(core.AUTOSAVE) and self.asked > 0 and self.asked % core.AUTOSAVE == 0
+    def due_count(self) -> int:
+        """범위 안에서 지금 복습 시각이 지난 카드 행 수."""
+        return self._due.count(int(time.time()))
 
-    def save(self) -> None:
-        self.df.to_excel(core.FILE_PATH, sheet_name=core.SHEET_NAME, index=False)
+    def needs_autosave(self) -> bool:
+        every = self.backend.autosave_every if self.backend is not None else core.AUTOSAVE
+        return bool(every) and self.asked > 0 and self.asked % every == 0
 
-    def finalize(self) -> List[str]:
-        self.save()
+    @core.timed("save")
+    def save(self, final: bool = False) -> None:
+        if self.backend is None:
+            core.write_excel_atomic(self.df, core.CONFIG.file_path, core.SHEET_NAME)
+        else:
+            self.backend.checkpoint(self.df, final=final)
+
+    @core.timed("save")
+    def submit_save(self, writer: "store.WorkbookWriter", final: bool = False) -> Optional[int]:
+        """스냅샷을 저장 스레드에 넘긴다. 백엔드가 저장할 것이 없다고 하면 None."""
+        if self.backend is None:
+            return writer.submit(self.df)
+        return self.backend.checkpoint(self.df, writer, final=final)
+
+    def finalize(self, writer: Optional["store.WorkbookWriter"] = None) -> List[str]:
+        if writer is None:
+            self.save(final=True)
+        else:
+            self.submit_save(writer, final=True)
+            if not writer.close(timeout=core.SAVE_FLUSH_TIMEOUT):
+                raise TimeoutError(f"{core.SAVE_FLUSH_TIMEOUT}초 안에 저장을 마치지 못했습니다.")
+            writer.raise_errors()
+        if self.backend is not None:
+            self.backend.close()
         return self.get_top10_report() if core.SHOW_TOP10 else []
 
     def get_top10_report(self) -> List[str]:
-        sub = self.sub.copy()
-        sub["diff_est"] = sub.apply(
-            lambda r: core.bayes_diff(
-                core.get_prior(r["InitLevel"]),
-                core.K,
-                self._safe_int(r["Fails"]),
-                self._safe_int(r["Tries"], default=0),
-            ),
-            axis=1,
-        )
-        rep = sub.sort_values("diff_est", ascending=False)[
-            [self.word_col, self.meaning_col, "Tries", "Fails", "diff_est"]
-        ].head(10)
-
+        cards = self.cards
+        _, diffs, _ = cards.scores(self.cur_step)
         lines: List[str] = []
-        for _, r in rep.iterrows():
-            fails = self._safe_int(r["Fails"])
-            tries = self._safe_int(r["Tries"], default=1)
+        for pos in np.argsort(-diffs, kind="stable")[:10].tolist():
             lines.append(
-                f"{r[self.word_col]}: {fails}/{tries} (diff={r['diff_est']:.2f})"
+                f"{cards.word[pos]}: {cards.fails[pos]}/{cards.tries[pos]} (diff={diffs[pos]:.2f})"
             )
         return lines
 
 
+def describe_elapsed(seconds: float) -> str:
+    """'방금 전', '5분 전', '3시간 전', '2일 전'"""
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "방금 전"
+    if minutes < 60:
+        return f"{minutes}분 전"
+    if minutes < 60 * 24:
+        return f"{minutes // 60}시간 전"
+    return f"{minutes // (60 * 24)}일 전"
+
+
 class ConfigFrame(ttk.Frame):
-    def __init__(self, parent: tk.Tk, df: pd.DataFrame, on_start, on_cancel: Optional[Callable[[], None]] = None) -> None:
+    def __init__(
+        self,
+        parent: tk.Tk,
+        df: Optional[pd.DataFrame],
+        on_start,
+        on_cancel: Optional[Callable[[], None]] = None,
+        note: str = "",
+        chapters: Optional["core.ChapterIndex"] = None,
+        due: Optional["core.DueIndex"] = None,
+        on_learner: Optional[Callable[[str], bool]] = None,
+    ) -> None:
         super().__init__(parent, padding=20)
         self.parent = parent
         self.df = df
+        self.chapters = chapters
         self.on_start = on_start
         self.on_cancel = on_cancel
+        # 학습자를 바꿀 때 부름(빈 이름 = 단어장에 저장). None이면 학습자 칸을 두지 않는다
+        self.on_learner = on_learner
+        self.learner = core.LEARNER.strip()
+        self.learner_var = tk.StringVar(value=self.learner or NO_LEARNER)
+        self.learner_combo: Optional[ttk.Combobox] = None
+        self.note_var = tk.StringVar(value=note)
+        self.deck_var = tk.StringVar(value="")
+        self.due_var = tk.StringVar(value="")
+        self.chapter_combo: Optional[ttk.Combobox] = None
+        # 목록에 보이는 글자 → 범위 입력칸에 넣을 값
+        self._choice_specs: Dict[str, str] = {}
 
         default_mode = core.FILTER_MODE if core.FILTER_MODE in {"chapter", "count"} else "count"
         self.mode_var = tk.StringVar(value=default_mode)
         self.chapter_var = tk.StringVar(value=str(core.CHAPTER_SPEC))
         self.count_var = tk.StringVar(value=str(core.COUNT_SPEC))
 
-        self._chapter_choices = self._collect_chapter_choices()
         self._build_widgets()
+        if df is not None:
+            self.set_workbook(df, note, chapters, due)
         self._update_mode()
         self.parent.protocol("WM_DELETE_WINDOW", self._cancel)
 
-    def _collect_chapter_choices(self) -> List[str]:
-        if "Day" not in self.df.columns:
+    def set_workbook(
+        self,
+        df: pd.DataFrame,
+        note: str = "",
+        chapters: Optional["core.ChapterIndex"] = None,
+        due: Optional["core.DueIndex"] = None,
+    ) -> None:
+        """단어장을 다 불러온 뒤 챕터 목록을 채우고 시작 버튼을 연다. chapters/due는 불러올 때 만든 색인."""
+        self.df = df
+        if chapters is None or len(chapters) != len(df):
+            chapters = core.ChapterIndex.from_days(df["Day"]) if "Day" in df.columns else None
+        self.chapters = chapters
+        self.note_var.set(note)
+        if core.DUE_MODE:
+            if due is None or len(due) != len(df):
+                due = core.DueIndex(df["Due"])
+            now = time.time()
+            self.due_var.set(
+                f"오늘 복습할 카드 {due.count(core.day_end(now)):,}장 (지금 {due.count(int(now)):,}장)"
+            )
+        decks = self._collect_decks()
+        if len(decks) > 1:
+            listed = ", ".join(f"{name} {count}개" for name, count in decks)
+            self.deck_var.set(f"덱: {listed}\n'덱이름:범위'로 덱을 고르고 ';'로 여러 덱을 이어 씁니다(예: {decks[0][0]}:1-3).")
+        for child in self.chapter_choice_frame.winfo_children():
+            child.destroy()
+        self._choice_specs = dict(self._collect_chapter_choices())
+        self._choice_specs.update((f"{name}:", f"{name}:") for name, _ in decks if len(decks) > 1)
+        choices = list(self._choice_specs)
+        if choices:
+            ttk.Label(self.chapter_choice_frame, text="Day 목록에서 선택").pack(anchor="w")
+            self.chapter_combo = ttk.Combobox(
+                self.chapter_choice_frame,
+                values=choices,
+                state="readonly",
+            )
+            self.chapter_combo.pack(fill="x", pady=(2, 0))
+            self.chapter_combo.bind("<<ComboboxSelected>>", self._on_combo_selected)
+        else:
+            self.chapter_combo = None
+            ttk.Label(
+                self.chapter_choice_frame,
+                text="Day 열이 없거나 숫자를 찾을 수 없습니다.",
+                foreground="#888",
+            ).pack(anchor="w", pady=(2, 0))
+        self.start_button.configure(state="normal")
+        self._update_mode()
+
+    def set_learners(self, names: List[str], current: str = "") -> None:
+        """학습자 목록(상태 파일이 있는 이름)을 채우고 current를 고른 상태로 둔다."""
+        self.learner = current
+        self.learner_var.set(current or NO_LEARNER)
+        if self.learner_combo is not None:
+            self.learner_combo.configure(values=[NO_LEARNER, *names], state="normal")
+
+    def _apply_learner(self) -> bool:
+        """입력칸의 학습자가 지금과 다르면 on_learner로 바꾼다. 바꾸지 못했으면 False."""
+        if self.learner_combo is None or self.df is None:
+            return True
+        name = self.learner_var.get().strip()
+        if name == NO_LEARNER:
+            name = ""
+        if name == self.learner:
+            return True
+        if not self.on_learner(name):
+            self.learner_var.set(self.learner or NO_LEARNER)
+            return False
+        self.learner = name
+        return True
+
+    def _collect_decks(self) -> List[Tuple[str, int]]:
+        if self.df is None or core.DECK_COLUMN not in self.df.columns:
             return []
-        try:
-            series = self.df["Day"].apply(core.to_chapter_num)
-        except Exception:
+        counts = self.df[core.DECK_COLUMN].value_counts(sort=False)
+        return [(str(name), int(count)) for name, count in counts.items()]
+
+    def _collect_chapter_choices(self) -> List[Tuple[str, str]]:
+        """[(목록 글자, 챕터 번호), ...] 카드 수는 챕터 색인에 이미 세어져 있다."""
+        if self.chapters is None:
             return []
-        valid = sorted({int(v) for v in series.dropna().tolist()})
-        return [str(v) for v in valid]
+        return [(f"{chapter} ({count}개)", str(chapter)) for chapter, count in self.chapters.choices()]
 
     def _build_widgets(self) -> None:
         title = ttk.Label(self, text="학습 범위를 선택한 뒤 시작을 눌러 주세요.", font=("Segoe UI", 11, "bold"))
         title.pack(anchor="w")
+        ttk.Label(self, textvariable=self.note_var, foreground="#888").pack(anchor="w", pady=(2, 0))
+        ttk.Label(self, textvariable=self.deck_var, foreground="#555", wraplength=380, justify="left").pack(anchor="w")
+        ttk.Label(self, textvariable=self.due_var, foreground="#555").pack(anchor="w")
+
+        if self.on_learner is not None:
+            learner_frame = ttk.LabelFrame(self, text="학습자 (새 이름을 입력하면 새로 만듦)")
+            learner_frame.pack(fill="x", pady=(12, 0))
+            # 단어장을 다 불러온 뒤 set_learners에서 목록을 채우고 연다
+            self.learner_combo = ttk.Combobox(
+                learner_frame, textvariable=self.learner_var, values=[NO_LEARNER], state="disabled"
+            )
+            self.learner_combo.pack(fill="x", pady=(2, 4))
+            self.learner_combo.bind("<<ComboboxSelected>>", lambda _: self._apply_learner())
 
         mode_frame = ttk.LabelFrame(self, text="범위 방식")
         mode_frame.pack(fill="x", pady=(12, 0))
@@ -266,22 +668,10 @@ class ConfigFrame(ttk.Frame):
         self.chapter_entry = ttk.Entry(self.chapter_frame, textvariable=self.chapter_var)
         self.chapter_entry.pack(fill="x", pady=(2, 4))
 
-        if self._chapter_choices:
-            ttk.Label(self.chapter_frame, text="Day 목록에서 선택").pack(anchor="w")
-            self.chapter_combo = ttk.Combobox(
-                self.chapter_frame,
-                values=self._chapter_choices,
-                state="readonly",
-            )
-            self.chapter_combo.pack(fill="x", pady=(2, 0))
-            self.chapter_combo.bind("<<ComboboxSelected>>", self._on_combo_selected)
-        else:
-            self.chapter_combo = None
-            ttk.Label(
-                self.chapter_frame,
-                text="Day 열이 없거나 숫자를 찾을 수 없습니다.",
-                foreground="#888",
-            ).pack(anchor="w", pady=(2, 0))
+        # Day 목록은 단어장을 다 불러온 뒤 set_workbook에서 채운다
+        self.chapter_choice_frame = ttk.Frame(self.chapter_frame)
+        self.chapter_choice_frame.pack(fill="x")
+        ttk.Label(self.chapter_choice_frame, text="Day 목록을 불러오는 중...", foreground="#888").pack(anchor="w")
 
         self.count_frame = ttk.LabelFrame(self, text="번호 범위")
         self.count_frame.pack(fill="x", pady=(12, 0))
@@ -301,7 +691,7 @@ class ConfigFrame(ttk.Frame):
 
         close_btn = ttk.Button(button_row, text="닫기", command=self._cancel)
         close_btn.pack(side="right")
-        self.start_button = ttk.Button(button_row, text="시작", command=self._start)
+        self.start_button = ttk.Button(button_row, text="시작", command=self._start, state="disabled")
         self.start_button.pack(side="right", padx=(0, 8))
         self.start_button.focus_set()
 
@@ -313,25 +703,29 @@ class ConfigFrame(ttk.Frame):
         chapter_state = "normal" if mode == "chapter" else "disabled"
         count_state = "disabled" if mode == "chapter" else "normal"
         self.chapter_entry.configure(state=chapter_state)
-        if getattr(self, "chapter_combo", None) is not None:
+        if self.chapter_combo is not None:
             combo_state = "readonly" if mode == "chapter" else "disabled"
             self.chapter_combo.configure(state=combo_state)
         self.count_entry.configure(state=count_state)
 
     def _on_combo_selected(self, _: tk.Event) -> None:
-        if getattr(self, "chapter_combo", None) is None:
+        if self.chapter_combo is None:
             return
         value = self.chapter_combo.get().strip()
         if value:
-            self.chapter_var.set(value)
+            self.chapter_var.set(self._choice_specs.get(value, value))
 
     def _start(self) -> None:
+        if self.df is None or not self._apply_learner():
+            return
         mode = self.mode_var.get()
         if mode == "chapter":
             spec = self.chapter_var.get().strip()
             if not spec:
                 messagebox.showerror("안내", "챕터 범위를 입력하거나 선택해 주세요.", parent=self)
                 return
+            if not self._check_spec(spec):
+                return
             self.on_start("chapter", spec, "")
             self.parent.destroy()
         else:
@@ -339,9 +733,20 @@ class ConfigFrame(ttk.Frame):
             if not spec:
                 messagebox.showerror("안내", "번호 범위를 입력해 주세요.", parent=self)
                 return
+            if not self._check_spec(spec):
+                return
             self.on_start("count", "", spec)
             self.parent.destroy()
 
+    def _check_spec(self, spec: str) -> bool:
+        try:
+            for _, part in core.split_deck_spec(spec):
+                core.parse_spec(part)
+        except ValueError as exc:
+            messagebox.showerror("안내", str(exc), parent=self)
+            return False
+        return True
+
     def _cancel(self) -> None:
         if self.on_cancel is not None:
             self.on_cancel()
@@ -355,15 +760,18 @@ class StudyApp(tk.Tk):
         self.minsize(720, 520)
         self.resizable(False, False)
 
-        self._current_card: Optional[Tuple[int, pd.Series]] = None
+        self._current_card: Optional[Tuple[int, "core.Card"]] = None
         self._answer_visible = False
-        self._autosave_flag = False
+        self._idle_job: Optional[str] = None
+        self._save_note = ""
+        self.writer = store.WorkbookWriter(core.CONFIG.file_path, core.SHEET_NAME)
 
         self._build_widgets()
         self._bind_keys()
         self.protocol("WM_DELETE_WINDOW", self.quit_session)
 
         self.prepare_next_card()
+        self.after(200, self._poll_writer)
 
     def _build_widgets(self) -> None:
         style = ttk.Style(self)
@@ -429,6 +837,11 @@ class StudyApp(tk.Tk):
         self.stats_var = tk.StringVar(value='정답률: - | 마지막 학습: -')
         ttk.Label(info_frame, textvariable=self.stats_var, font=('Segoe UI', 9)).pack(anchor='w')
         ttk.Label(info_frame, textvariable=self.status_var, font=('Segoe UI', 9)).pack(anchor='w', pady=(2, 0))
+        self.debug_var = tk.StringVar()
+        if core.PROFILE:
+            ttk.Label(
+                info_frame, textvariable=self.debug_var, font=('Segoe UI', 8), wraplength=560, justify='left'
+            ).pack(anchor='w', pady=(2, 0))
 
         ttk.Button(bottom_bar, text='종료', command=self.quit_session, style='Quiz.TButton').pack(side='right')
 
@@ -447,22 +860,16 @@ class StudyApp(tk.Tk):
         self.correct_btn.configure(state=state)
         self.incorrect_btn.configure(state=state)
 
+    @core.timed("update_overall_summary")
     def update_overall_summary(self) -> None:
-        tries = pd.to_numeric(self.session.sub["Tries"], errors="coerce").fillna(0)
-        fails = pd.to_numeric(self.session.sub["Fails"], errors="coerce").fillna(0)
-        total_tries = int(tries.sum())
-        total_correct = int((tries - fails).clip(lower=0).sum())
-        if total_tries > 0:
-            rate_text = f"{total_correct / total_tries * 100:.0f}% ({total_correct}/{total_tries})"
-        else:
-            rate_text = "-"
-        self.overall_var.set(f"전체 정답률: {rate_text}\nstep {self.session.cur_step}")
+        total = self.session.stats.total
+        self.overall_var.set(f"전체 정답률: {total.rate_text()}\nstep {self.session.cur_step}")
 
     def prepare_next_card(self) -> None:
         self.header_var.set(f"학습 범위: {self.session.sel_desc}")
-        self.update_status(self._autosave_flag)
+        self.update_status()
         self.update_overall_summary()
-        self._autosave_flag = False
+        self._save_note = ""
         self._answer_visible = False
         self.stats_var.set("정답률: - | 마지막 학습: -")
         self._set_answer_buttons(active=False)
@@ -470,11 +877,14 @@ class StudyApp(tk.Tk):
 
         pending = self.session.get_pending_init_card()
         if pending:
-            idx, row = pending
-            self.question_var.set(str(row[self.session.word_col]))
+            idx, card = pending
+            self.question_var.set(str(card.word))
             self.answer_var.set("")
             self.show_btn.configure(state=tk.DISABLED)
-            self._prompt_init_level(idx, row)
+            if core.BULK_INIT_MIN and self.session.pending_init_count() >= core.BULK_INIT_MIN:
+                self._prompt_bulk_init()
+            else:
+                self._prompt_init_level(idx, card)
             return
 
         pick = self.session.choose_next_card()
@@ -484,14 +894,17 @@ class StudyApp(tk.Tk):
             self.show_btn.configure(state=tk.DISABLED)
             return
 
-        idx, row = pick
-        self._current_card = (idx, row)
-        self.question_var.set(str(row[self.session.word_col]))
+        idx, card = pick
+        self._current_card = (idx, card)
+        self.question_var.set(str(card.word))
         self.answer_var.set("")
-        correct_rate, last_seen = self.session.describe_card_stats(row)
-        self.stats_var.set(f"정답률: {correct_rate} | 마지막 학습: {last_seen}")
+        correct_rate, last_seen = self.session.describe_card_stats(card)
+        stats = f"정답률: {correct_rate} | 마지막 학습: {last_seen}"
+        if card.deck is not None:
+            stats = f"덱: {card.deck} | {stats}"
+        self.stats_var.set(stats)
 
-    def _prompt_init_level(self, idx: int, row: pd.Series) -> None:
+    def _prompt_init_level(self, idx: int, card: "core.Card") -> None:
         dialog = tk.Toplevel(self)
         dialog.title("초기 난이도 설정")
         dialog.transient(self)
@@ -499,18 +912,14 @@ class StudyApp(tk.Tk):
 
         ttk.Label(
             dialog,
-            text=f"{row[self.session.word_col]}\n{row[self.session.meaning_col]}",
+            text=f"{card.word}\n{card.meaning}",
             anchor="center",
             justify="center",
         ).pack(padx=28, pady=(28, 16))
 
         choice = tk.StringVar()
         buttons: List[ttk.Radiobutton] = []
-        original_level = (
-            int(row.get("InitLevel"))
-            if self.session._is_valid_init_level(row.get("InitLevel"))
-            else None
-        )
+        original_level = int(card.level) if self.session._is_valid_init_level(card.level) else None
 
         for level, label in INIT_LEVEL_LABELS.items():
             btn = ttk.Radiobutton(
@@ -544,6 +953,10 @@ class StudyApp(tk.Tk):
             choice.set(str(level))
             confirm()
 
+        def open_bulk() -> None:
+            dialog.destroy()
+            self._prompt_bulk_init()
+
         action_frame = ttk.Frame(dialog)
         action_frame.pack(pady=(18, 24))
         ttk.Button(
@@ -554,6 +967,8 @@ class StudyApp(tk.Tk):
             ),
         ).pack(side="right", padx=6)
         ttk.Button(action_frame, text="저장", command=confirm).pack(side="right", padx=6)
+        if self.session.pending_init_count() > 1:
+            ttk.Button(action_frame, text="표로 한꺼번에", command=open_bulk).pack(side="right", padx=6)
 
         dialog.bind("<Return>", lambda _: confirm())
         for level in INIT_LEVEL_LABELS:
@@ -570,6 +985,9 @@ class StudyApp(tk.Tk):
             ),
         )
 
+        self._place_beside(dialog)
+
+    def _place_beside(self, dialog: tk.Toplevel) -> None:
         dialog.update_idletasks()
         parent_x = self.winfo_rootx()
         parent_y = self.winfo_rooty()
@@ -586,19 +1004,162 @@ class StudyApp(tk.Tk):
         pos_y = parent_y + max((parent_h - dlg_h) // 2, 0)
         dialog.geometry(f"+{int(preferred_x)}+{int(pos_y)}")
 
+    def _prompt_bulk_init(self) -> None:
+        """새 카드 난이도를 쪽 단위 표에서 키보드로 매기고, 닫을 때 한 번에 반영한다."""
+        cards = self.session.pending_init_cards()
+        if not cards:
+            self.after(10, self.prepare_next_card)
+            return
+        levels: Dict[int, int] = {}
+        pages = (len(cards) + BULK_PAGE_SIZE - 1) // BULK_PAGE_SIZE
+        page = 0
+
+        dialog = tk.Toplevel(self)
+        dialog.title("새 카드 난이도 한꺼번에 정하기")
+        dialog.transient(self)
+        dialog.grab_set()
+
+        info_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=info_var).pack(anchor="w", padx=16, pady=(14, 6))
+
+        tree = ttk.Treeview(
+            dialog,
+            columns=("word", "meaning", "level"),
+            show="headings",
+            height=BULK_PAGE_SIZE,
+            selectmode="browse",
+        )
+        for column, text, width in (("word", "단어", 170), ("meaning", "뜻", 230), ("level", "난이도", 100)):
+            tree.heading(column, text=text)
+            tree.column(column, width=width, anchor="w")
+        tree.pack(fill="both", expand=True, padx=16)
+
+        ttk.Label(
+            dialog,
+            text="↑↓ 이동 · 1~4 지정 후 다음 줄 · 0 지우기 · Ctrl+1~4 이 쪽 빈칸 모두\n"
+            "PgUp/PgDn 쪽 넘기기 · Enter 반영하고 닫기",
+            font=("Segoe UI", 9),
+            justify="left",
+        ).pack(anchor="w", padx=16, pady=(8, 0))
+
+        def level_text(i: int) -> str:
+            level = levels.get(cards[i][0])
+            return f"{level}: {INIT_LEVEL_LABELS[level]}" if level else ""
+
+        def update_info() -> None:
+            info_var.set(f"{page + 1}/{pages}쪽 · 지정 {len(levels)}/{len(cards)}개")
+
+        def show(number: int, row: int = 0) -> None:
+            nonlocal page
+            page = number
+            start = page * BULK_PAGE_SIZE
+            tree.delete(*tree.get_children())
+            for i in range(start, min(start + BULK_PAGE_SIZE, len(cards))):
+                _, word, meaning = cards[i]
+                tree.insert("", "end", iid=str(i), values=(word, meaning, level_text(i)))
+            focus(min(start + row, len(cards) - 1))
+            update_info()
+
+        def focus(i: int) -> None:
+            tree.selection_set(str(i))
+            tree.focus(str(i))
+            tree.see(str(i))
+
+        def current() -> int:
+            iid = tree.focus()
+            return int(iid) if iid else page * BULK_PAGE_SIZE
+
+        def move(delta: int) -> str:
+            i = min(max(current() + delta, 0), len(cards) - 1)
+            if i // BULK_PAGE_SIZE != page:
+                show(i // BULK_PAGE_SIZE, i % BULK_PAGE_SIZE)
+            else:
+                focus(i)
+            return "break"
+
+        def turn(delta: int) -> str:
+            number = min(max(page + delta, 0), pages - 1)
+            if number != page:
+                show(number)
+            return "break"
+
+        def rate(level: Optional[int]) -> str:
+            i = current()
+            if level is None:
+                levels.pop(cards[i][0], None)
+            else:
+                levels[cards[i][0]] = level
+            tree.set(str(i), "level", level_text(i))
+            update_info()
+            return move(1) if level is not None else "break"
+
+        def rate_page(level: int) -> str:
+            start = page * BULK_PAGE_SIZE
+            for i in range(start, min(start + BULK_PAGE_SIZE, len(cards))):
+                if cards[i][0] not in levels:
+                    levels[cards[i][0]] = level
+                    tree.set(str(i), "level", level_text(i))
+            update_info()
+            return "break"
+
+        def commit() -> None:
+            self.session.set_init_levels(levels)
+            dialog.destroy()
+            self.after(10, self.prepare_next_card)
+
+        action_frame = ttk.Frame(dialog)
+        action_frame.pack(pady=(12, 16))
+        ttk.Button(action_frame, text="반영하고 닫기", command=commit).pack(side="right", padx=6)
+
+        tree.bind("<Up>", lambda _: move(-1))
+        tree.bind("<Down>", lambda _: move(1))
+        dialog.bind("<Prior>", lambda _: turn(-1))
+        dialog.bind("<Next>", lambda _: turn(1))
+        dialog.bind("<Return>", lambda _: commit())
+        dialog.bind("<KP_Enter>", lambda _: commit())
+        for key in ("0", "<BackSpace>", "<Delete>"):
+            dialog.bind(key, lambda _: rate(None))
+        for level in INIT_LEVEL_LABELS:
+            dialog.bind(str(level), lambda _e, lv=level: rate(lv))
+            dialog.bind(f"<KP_{level}>", lambda _e, lv=level: rate(lv))
+            dialog.bind(f"<Control-Key-{level}>", lambda _e, lv=level: rate_page(lv))
+        dialog.protocol("WM_DELETE_WINDOW", commit)
+
+        show(0)
+        tree.focus_set()
+        self._place_beside(dialog)
+
     def reveal_answer(self) -> None:
         if not self._current_card or self._answer_visible:
             return
-        _, row = self._current_card
-        self.question_var.set(str(row[self.session.meaning_col]))
-        self.answer_var.set(f"단어: {row[self.session.word_col]}")
+        _, card = self._current_card
+        self.question_var.set(str(card.meaning))
+        self.answer_var.set(f"단어: {card.word}")
         self._answer_visible = True
         self._set_answer_buttons(active=True)
         self.show_btn.configure(state=tk.DISABLED)
+        # 답을 보는 동안 맞힘/틀림 각각의 다음 카드를 미리 구해 둔다
+        idx, session = self._current_card[0], self.session
+        self._when_idle(lambda: session.prefetch(idx))
+
+    def _when_idle(self, fn: Callable[[], None]) -> None:
+        """입력이 없을 때 fn을 한 번 부른다. 앞서 걸어 둔 일은 취소한다."""
+        self._cancel_idle()
+        self._idle_job = self.after_idle(self._run_idle, fn)
+
+    def _run_idle(self, fn: Callable[[], None]) -> None:
+        self._idle_job = None
+        fn()
+
+    def _cancel_idle(self) -> None:
+        if self._idle_job is not None:
+            self.after_cancel(self._idle_job)
+            self._idle_job = None
 
     def handle_answer(self, correct: bool) -> None:
         if not self._current_card or not self._answer_visible:
             return
+        self._cancel_idle()
         idx, _ = self._current_card
         try:
             self.session.record_answer(idx, correct)
@@ -606,91 +1167,209 @@ class StudyApp(tk.Tk):
             messagebox.showerror("오류", f"결과를 저장하지 못했습니다.\n{exc}")
             return
 
-        autosaved = False
         if self.session.needs_autosave():
-            try:
-                self.session.save()
-                autosaved = True
-            except Exception as exc:
-                messagebox.showerror("오류", f"자동 저장에 실패했습니다.\n{exc}")
+            self._request_save()
 
         self._current_card = None
-        self._autosave_flag = autosaved
         self.prepare_next_card()
 
-    def update_status(self, autosaved: bool = False) -> None:
-        base = f"{self.session.sel_desc} | step {self.session.cur_step} | 진행 {self.session.asked}"
-        if autosaved:
-            base += " | 자동 저장 완료"
-        self.status_var.set(base)
-
-    def open_reconfigure(self) -> None:
+    def _request_save(self) -> None:
         try:
-            self.session.save()
+            requested = self.session.submit_save(self.writer)
         except Exception as exc:
-            messagebox.showerror("오류", f"엑셀 저장에 실패했습니다.\n{exc}", parent=self)
+            messagebox.showerror("오류", f"자동 저장에 실패했습니다.\n{exc}", parent=self)
             return
+        if requested is not None:
+            self._save_note = "저장 중..."
+
+    def _poll_writer(self) -> None:
+        for kind, _, payload in self.writer.drain():
+            if kind == "saved":
+                self._save_note = f"자동 저장 완료 ({payload:.1f}초)"
+            else:
+                self._save_note = "저장 실패"
+                messagebox.showerror("오류", f"자동 저장에 실패했습니다.\n{payload}", parent=self)
+            self.update_status()
+        self.after(200, self._poll_writer)
 
+    def update_status(self) -> None:
+        base = f"{self.session.sel_desc} | step {self.session.cur_step} | 진행 {self.session.asked}"
+        if self.session.duplicate_keys:
+            base += f" | 중복 카드 {len(self.session.duplicate_keys)}묶음"
+        if core.DUE_MODE:
+            base += f" | 복습 대기 {self.session.due_count()}장"
+        if self._save_note:
+            base += f" | {self._save_note}"
+        self.status_var.set(base)
+        if core.PROFILE:
+            self.debug_var.set(core.TIMINGS.describe(PROFILE_LABELS))
+
+    def open_reconfigure(self) -> None:
+        # 답안은 이미 저장소에 기록되어 있고 새 세션도 같은 표를 쓰므로 여기서 저장하지 않는다
         dialog = tk.Toplevel(self)
         dialog.title("학습 범위 다시 설정")
-        dialog.geometry("420x380")
+        dialog.geometry("420x430")
         dialog.resizable(False, False)
         dialog.transient(self)
         dialog.grab_set()
 
         def apply(mode: str, chapter_spec: str, count_spec: str) -> None:
             try:
-                new_session = StudySession(self.session.df.copy(), mode, chapter_spec, count_spec)
+                new_session = self.session.switch_range(mode, chapter_spec, count_spec)
             except Exception as exc:
                 messagebox.showerror("오류", f"세션을 준비하는 중 문제가 발생했습니다.\n{exc}", parent=dialog)
                 return
+            self._cancel_idle()
             self.session = new_session
             self._current_card = None
-            self._autosave_flag = False
             dialog.destroy()
             self.prepare_next_card()
 
-        ConfigFrame(dialog, self.session.df.copy(), apply, on_cancel=dialog.destroy).pack(fill="both", expand=True)
+        ConfigFrame(
+            dialog,
+            self.session.df,
+            apply,
+            on_cancel=dialog.destroy,
+            chapters=self.session.chapter_index,
+            due=self.session.due_index,
+        ).pack(fill="both", expand=True)
 
     def quit_session(self) -> None:
         try:
-            report = self.session.finalize()
+            report = self.session.finalize(self.writer)
         except Exception as exc:
             messagebox.showerror("오류", f"마지막 저장에 실패했습니다.\n{exc}")
             report = []
         else:
             if report:
                 messagebox.showinfo("정답률 상위 10", "\n".join(report))
+        if core.PROFILE:
+            self._dump_profile()
         self.destroy()
 
+    def _dump_profile(self) -> None:
+        path = store.sidecar_path(core.CONFIG.file_path, None, ".profile.json")
+        try:
+            core.TIMINGS.dump(
+                path,
+                range=self.session.sel_desc,
+                cards=len(self.session.cards),
+                asked=self.session.asked,
+                step=self.session.cur_step,
+            )
+        except OSError as exc:
+            messagebox.showwarning("안내", f"시간 기록을 저장하지 못했습니다.\n{exc}")
 
-def main() -> None:
+
+def _due_index(df) -> Optional["core.DueIndex"]:
+    if not core.DUE_MODE:
+        return None
+    due = core.DueIndex(df["Due"])
+    due.count(0)  # 정렬해 둔다
+    return due
+
+
+def _load_workbook(results: "queue.Queue") -> None:
+    # 경로 탐색과 pandas/엑셀 불러오기는 창을 띄운 뒤 별도 스레드에서
     try:
-        df = pd.read_excel(core.FILE_PATH, sheet_name=core.SHEET_NAME)
+        with core.TIMINGS.measure("load"):
+            base = store.open_decks()
+            words = base.load()
+            # 설정 창의 챕터 목록과 세션의 범위 선택이 같이 쓸 색인도 여기서 만든다
+            base.chapter_index
+            backend, df = base, words
+            if core.LEARNER:
+                backend = store.ProfileBackend(base, core.LEARNER, journal=core.JOURNAL, fsync=core.JOURNAL_FSYNC)
+                df = backend.adopt(words)
+            due = _due_index(df)
+            learners = store.find_learners()
+        results.put((base, words, backend, df, due, learners))
     except Exception as exc:
-        print(f"세션을 준비하는 중 오류가 발생했습니다: {exc}")
-        return
+        results.put(exc)
 
+
+def main() -> None:
+    core.load_params()
     root = tk.Tk()
     root.title("영단어 학습 설정")
-    root.geometry("560x440")
-    root.minsize(560, 440)
+    root.geometry("560x540")
+    root.minsize(560, 540)
     root.resizable(False, False)
 
+    loaded: Dict[str, object] = {}
+    results: "queue.Queue" = queue.Queue()
+
     def start_session(mode: str, chapter_spec: str, count_spec: str) -> None:
         nonlocal root
         try:
-            session = StudySession(df, mode, chapter_spec, count_spec)
+            session = StudySession(
+                loaded["df"], mode, chapter_spec, count_spec, backend=loaded["backend"], due_index=loaded["due"]
+            )
         except Exception as exc:
             messagebox.showerror("오류", f"세션을 준비하는 중 문제가 발생했습니다.\n{exc}", parent=root)
             return
         root.destroy()
         app = StudyApp(session)
-        app.mainloop()
+        if not core.PROFILE_CPROFILE:
+            app.mainloop()
+            return
+        # 학습 창 전체(UI 스레드)를 기록. pstats나 snakeviz로 열어 본다
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            app.mainloop()
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(store.sidecar_path(core.CONFIG.file_path, None, ".prof")))
+
+    def choose_learner(name: str) -> bool:
+        """학습자를 바꾼다. 단어장은 다시 읽지 않고 불러 둔 표에 그 학습자의 상태만 입힌다."""
+        base = loaded["base"]
+        try:
+            if name:
+                backend = store.ProfileBackend(base, name, journal=core.JOURNAL, fsync=core.JOURNAL_FSYNC)
+                df = backend.adopt(loaded["words"])
+            else:
+                backend, df = base, loaded["words"]
+        except (OSError, ValueError) as exc:
+            messagebox.showerror("오류", f"학습자 상태를 불러오지 못했습니다.\n{exc}", parent=root)
+            return False
+        # 단어장 자체의 복구 안내는 처음 불러올 때 이미 보였다
+        show_workbook(backend, df, _due_index(df), announce=backend is not base)
+        return True
+
+    def show_workbook(backend, df, due, announce: bool = True) -> None:
+        loaded.update(backend=backend, df=df, due=due)
+        frame.set_workbook(df, note=backend.describe_load(), chapters=backend.chapter_index, due=due)
+        if announce and backend.recovered:
+            messagebox.showinfo("복구", f"저장되지 않았던 기록 {backend.recovered}건을 저널에서 복구했습니다.", parent=root)
+
+    frame = ConfigFrame(root, None, start_session, note="단어장을 불러오는 중...", on_learner=choose_learner)
+    frame.pack(fill="both", expand=True)
+
+    def poll_loader() -> None:
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            root.after(50, poll_loader)
+            return
+        if isinstance(result, Exception):
+            messagebox.showerror("오류", f"세션을 준비하는 중 오류가 발생했습니다.\n{result}", parent=root)
+            root.destroy()
+            return
+        base, words, backend, df, due, learners = result
+        loaded.update(base=base, words=words)
+        frame.set_learners(learners, core.LEARNER.strip())
+        show_workbook(backend, df, due)
 
-    ConfigFrame(root, df, start_session).pack(fill="both", expand=True)
+    threading.Thread(target=_load_workbook, args=(results,), name="workbook-loader", daemon=True).start()
+    root.after(50, poll_loader)
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # exe에서도 덱 파싱 프로세스를 띄울 수 있게
+    multiprocessing.freeze_support()
     main()
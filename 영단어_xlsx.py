@@ -0,0 +1,919 @@
+"""엑셀(.xlsx) 스트리밍 읽기와 병합 쓰기.
+
+큰 단어장에서 필요한 것은 단어/뜻/Day/상태 열뿐이므로 pandas.read_excel처럼 모든 셀을 만들지 않는다.
+
+- read_streaming      : 필요한 열(과 범위 안의 행)만 DataFrame으로 만든다. 시트 XML을 직접 한 줄씩 읽고
+                        공유 문자열은 마지막에 필요한 것만 찾는다. 다룰 수 없는 형식이면 openpyxl 읽기 전용 모드로 읽는다.
+- merge_into_workbook : 원본에 df의 상태 열 값만 바꿔 쓴다(나머지 열·시트·수식·서식 보존). 시트 XML의 해당 셀만
+                        고쳐 쓰고, 불러온 뒤 파일이 바뀌었으면 고칠 줄의 단어/뜻이 그대로인지 확인한다.
+                        고쳐 쓰기가 모르는 구조가 있으면 openpyxl로 통째로 열어 고친다.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import html
+import importlib
+import math
+import os
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree as ET
+
+core = importlib.import_module("영단어")
+pd = core.lazy_import("pandas")
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW, _CELL, _VALUE, _TEXT = MAIN_NS + "row", MAIN_NS + "c", MAIN_NS + "v", MAIN_NS + "t"
+_INLINE, _PHONETIC, _SHARED_ITEM = MAIN_NS + "is", MAIN_NS + "rPh", MAIN_NS + "si"
+_DIGITS = "0123456789"
+_CHUNK = 1 << 16
+
+# 앱이 값을 바꾸는 열. 저장할 때는 이 열과 원본에 없는 열만 쓴다.
+WRITE_COLUMNS = ("Tries", "Fails", "LastStep", "InitLevel", "LastSeen", "Due")
+
+
+class UnsupportedLayout(Exception):
+    """직접 읽기가 다루지 않는 파일(Strict OOXML 등). openpyxl로 읽는다."""
+
+
+# ===== 값 변환 =====
+def sheet_header(values) -> list:
+    """첫 줄을 read_excel과 같은 열 이름으로(빈 칸은 'Unnamed: i', 중복은 '이름.1')."""
+    names, seen = [], {}
+    for i, value in enumerate(values):
+        value = cell_value(value)
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def cell_value(value):
+    """셀 값을 read_excel과 같게(빈 문자열은 None, 정수인 실수는 int)."""
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def excel_value(value):
+    """DataFrame 값 → openpyxl에 쓸 값(결측은 빈 칸, numpy/pandas 스칼라는 기본 타입)."""
+    if value is None:
+        return None
+    with contextlib.suppress(TypeError, ValueError):
+        if pd.isna(value):
+            return None
+    if hasattr(value, "to_pydatetime"):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _same_cell(a, b) -> bool:
+    blank_a = a is None or (isinstance(a, float) and math.isnan(a))
+    blank_b = b is None or (isinstance(b, float) and math.isnan(b))
+    return blank_a and blank_b or (not blank_a and not blank_b and a == b)
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+# ===== 시트 XML 직접 읽기 =====
+class _SharedRef:
+    """공유 문자열 번호. 시트를 다 읽은 뒤 resolve()에서 문자열로 바뀐다."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+
+class _SheetTarget:
+    """XMLParser target. 시트 XML에서 keep 열의 셀만 값으로 바꿔 줄 단위로 모은다.
+
+    slots(열 → 자리)가 None인 동안은 모든 열을 담는다(머리글 줄). 바뀐 slots는 다음 줄부터 적용되고,
+    넘기는 줄마다 모든 열을 담았는지 표시한다. 빈 줄(행 번호가 건너뛴 줄)도 openpyxl처럼 빈 줄로 넘긴다.
+    """
+
+    def __init__(self, reader: "_XmlSheet") -> None:
+        self.reader = reader
+        self.slots: Optional[Dict[int, int]] = None
+        self.next_slots: Optional[Dict[int, int]] = None
+        self.rows: List[Tuple[int, list, bool, bool]] = []
+        self._columns: Dict[str, int] = {}
+        self._next_row = 1
+        self._values: Optional[list] = None
+        self._nonblank = False
+        self._slot: Optional[int] = None
+        self._col = -1
+        self._kind = self._style = None
+        self._buf: Optional[List[str]] = None
+        self._capture = False
+        self._phonetic = False
+
+    def start(self, tag, attrib) -> None:
+        if tag == _CELL:
+            ref = attrib.get("r")
+            if ref is None:
+                self._col += 1
+            else:
+                letters = ref.rstrip(_DIGITS)
+                col = self._columns.get(letters)
+                if col is None:
+                    col = self._columns[letters] = _column_index(letters)
+                self._col = col
+            slots = self.slots
+            if slots is None:
+                self._slot = self._col
+            else:
+                self._slot = slots.get(self._col)
+            if self._slot is not None:
+                self._kind = attrib.get("t")
+                self._style = attrib.get("s")
+                self._buf = None
+        elif tag == _VALUE or tag == _TEXT:
+            if self._slot is not None and not self._phonetic:
+                if self._buf is None:
+                    self._buf = []
+                self._capture = True
+            if tag == _VALUE:
+                self._nonblank = True
+        elif tag == _ROW:
+            self.slots = self.next_slots
+            number = attrib.get("r")
+            number = int(number) if number is not None else self._next_row
+            while self._next_row < number:
+                # 행 번호가 건너뛴 자리는 빈 줄
+                self._emit(self._next_row, self._blank_values(), False)
+                self._next_row += 1
+            self._values = self._blank_values()
+            self._nonblank = False
+            self._col = -1
+        elif tag == _INLINE:
+            self._nonblank = True
+        elif tag == _PHONETIC:
+            self._phonetic = True
+
+    def end(self, tag) -> None:
+        if tag == _CELL:
+            if self._slot is not None:
+                text = "".join(self._buf) if self._buf is not None else None
+                value = self.reader.convert(self._kind, self._style, text)
+                values = self._values
+                if self.slots is None and self._slot >= len(values):
+                    values.extend([None] * (self._slot + 1 - len(values)))
+                values[self._slot] = value
+                self._slot = None
+        elif tag == _VALUE or tag == _TEXT:
+            self._capture = False
+        elif tag == _ROW:
+            self._emit(self._next_row, self._values, self._nonblank)
+            self._next_row += 1
+        elif tag == _PHONETIC:
+            self._phonetic = False
+
+    def data(self, text: str) -> None:
+        if self._capture:
+            self._buf.append(text)
+
+    def close(self) -> None:
+        pass
+
+    def _blank_values(self) -> list:
+        return [] if self.slots is None else [None] * len(self.slots)
+
+    def _emit(self, number: int, values: list, nonblank: bool) -> None:
+        self.rows.append((number - 2, values, nonblank, self.slots is None))
+
+
+class _StringsTarget:
+    """sharedStrings.xml에서 필요한 번호의 문자열만 꺼낸다(윗주 rPh는 뺀다). need=None이면 전부."""
+
+    def __init__(self, need: Optional[Set[int]]) -> None:
+        self.need = need
+        self.found: Dict[int, str] = {}
+        self._index = -1
+        self._buf: Optional[List[str]] = None
+        self._capture = False
+        self._phonetic = False
+
+    def start(self, tag, attrib) -> None:
+        if tag == _SHARED_ITEM:
+            self._index += 1
+            self._buf = [] if self.need is None or self._index in self.need else None
+        elif tag == _TEXT:
+            self._capture = self._buf is not None and not self._phonetic
+        elif tag == _PHONETIC:
+            self._phonetic = True
+
+    def end(self, tag) -> None:
+        if tag == _SHARED_ITEM:
+            if self._buf is not None:
+                self.found[self._index] = "".join(self._buf)
+            self._buf = None
+        elif tag == _TEXT:
+            self._capture = False
+        elif tag == _PHONETIC:
+            self._phonetic = False
+
+    def data(self, text: str) -> None:
+        if self._capture:
+            self._buf.append(text)
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def done(self) -> bool:
+        return self.need is not None and len(self.found) >= len(self.need)
+
+
+class _XmlSheet:
+    """시트 XML을 직접 읽는다. 필요한 열의 셀만 값으로 바꾸고, 공유 문자열은 마지막에 필요한 것만 찾는다."""
+
+    def __init__(self, path, sheet_name: str) -> None:
+        try:
+            self.zip = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as exc:
+            raise UnsupportedLayout(str(exc)) from exc
+        try:
+            self._open(sheet_name)
+            self._stream = self.zip.open(self.sheet_path)
+        except (KeyError, ET.ParseError) as exc:
+            self.zip.close()
+            raise UnsupportedLayout(f"{type(exc).__name__}: {exc}") from exc
+        except BaseException:
+            self.zip.close()
+            raise
+        self._target = _SheetTarget(self)
+        self._parser = ET.XMLParser(target=self._target)
+        self._eof = False
+        self._pending: List[Tuple[int, list, bool, bool]] = []
+
+    def _open(self, sheet_name: str) -> None:
+        book = ET.fromstring(self.zip.read("xl/workbook.xml"))
+        if book.tag != MAIN_NS + "workbook":
+            raise UnsupportedLayout(f"알 수 없는 통합 문서 형식: {book.tag}")
+        props = book.find(MAIN_NS + "workbookPr")
+        date1904 = props is not None and props.get("date1904") in {"1", "true"}
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+        rel_id = None
+        for sheet in book.iter(MAIN_NS + "sheet"):
+            if sheet.get("name") == sheet_name:
+                rel_id = sheet.get(REL_NS + "id")
+        if rel_id is None:
+            # read_excel과 같은 오류
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+        targets: Dict[str, str] = {}
+        by_type: Dict[str, str] = {}
+        for rel in ET.fromstring(self.zip.read("xl/_rels/workbook.xml.rels")).iter(PKG_REL_NS + "Relationship"):
+            target = rel.get("Target", "")
+            target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+            targets[rel.get("Id")] = target
+            by_type[rel.get("Type", "").rsplit("/", 1)[-1]] = target
+        self.sheet_path = targets[rel_id]
+        self.strings_path = by_type.get("sharedStrings")
+        self.date_styles, self.timedelta_styles = self._date_styles(by_type.get("styles"))
+
+    def _date_styles(self, styles_path: Optional[str]) -> Tuple[Set[str], Set[str]]:
+        """날짜/시간 서식이 걸린 셀 스타일 번호(문자열, 셀의 s 속성과 비교)."""
+        if styles_path is None or styles_path not in self.zip.namelist():
+            return set(), set()
+        from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+
+        root = ET.fromstring(self.zip.read(styles_path))
+        formats = dict(BUILTIN_FORMATS)
+        for fmt in root.iter(MAIN_NS + "numFmt"):
+            formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode", "")
+        dates, deltas = set(), set()
+        xfs = root.find(MAIN_NS + "cellXfs")
+        for i, xf in enumerate(xfs if xfs is not None else []):
+            code = formats.get(int(xf.get("numFmtId", 0)))
+            if code and is_date_format(code):
+                dates.add(str(i))
+                if is_timedelta_format(code):
+                    deltas.add(str(i))
+        return dates, deltas
+
+    def convert(self, kind: Optional[str], style: Optional[str], text: Optional[str]):
+        if not text:
+            # 값 없는 셀, 계산 결과가 저장되지 않은 수식(<v/>)
+            return None
+        if kind == "s":
+            return _SharedRef(int(text))
+        if kind == "inlineStr" or kind == "str":
+            return text
+        if kind == "b":
+            return text == "1"
+        if kind == "e":
+            # read_excel은 #N/A 같은 오류 셀을 결측으로 읽는다
+            return None
+        if kind == "d":
+            return datetime.datetime.fromisoformat(text)
+        value = float(text)
+        if style is not None and style in self.date_styles:
+            from openpyxl.utils.datetime import from_excel
+
+            return from_excel(value, self.epoch, timedelta=style in self.timedelta_styles)
+        return int(value) if value.is_integer() else value
+
+    def _pull(self) -> List[Tuple[int, list, bool, bool]]:
+        """다음 조각을 읽어 완성된 줄들을 돌려준다. 끝이면 빈 리스트."""
+        target = self._target
+        while not target.rows and not self._eof:
+            chunk = self._stream.read(_CHUNK)
+            if chunk:
+                self._parser.feed(chunk)
+            else:
+                self._parser.close()
+                self._eof = True
+        rows, target.rows = target.rows, []
+        return rows
+
+    def header(self) -> list:
+        rows = self._pull()
+        if not rows:
+            return []
+        # 같은 조각에 함께 읽힌 줄은 모든 열을 담은 채로 rows()까지 보관한다
+        values = rows[0][1]
+        self._pending = rows[1:]
+        self.resolve([values])
+        return values
+
+    def rows(self, keep: List[int]) -> Iterator[Tuple[int, list, bool]]:
+        self._target.next_slots = {col: slot for slot, col in enumerate(keep)}
+        rows, self._pending = self._pending, []
+        while rows:
+            for pos, values, nonblank, full in rows:
+                if full:
+                    values = [values[c] if c < len(values) else None for c in keep]
+                yield pos, values, nonblank
+            rows = self._pull()
+
+    def resolve(self, lists: List[list]) -> None:
+        """_SharedRef를 실제 문자열로 바꾼다. sharedStrings.xml은 필요한 번호를 다 찾으면 그만 읽는다."""
+        need = {v.index for values in lists for v in values if type(v) is _SharedRef}
+        strings: Dict[int, str] = {}
+        if need and self.strings_path is not None:
+            target = _StringsTarget(need)
+            parser = ET.XMLParser(target=target)
+            with self.zip.open(self.strings_path) as fh:
+                for chunk in iter(lambda: fh.read(_CHUNK), b""):
+                    parser.feed(chunk)
+                    if target.done:
+                        break
+            strings = target.found
+        for values in lists:
+            for i, v in enumerate(values):
+                if type(v) is _SharedRef:
+                    values[i] = strings.get(v.index) or None
+
+    def close(self) -> None:
+        self._stream.close()
+        self.zip.close()
+
+
+class _OpenpyxlSheet:
+    """openpyxl 읽기 전용 모드(직접 읽기가 다루지 않는 파일용). _XmlSheet와 같은 모양."""
+
+    def __init__(self, path, sheet_name: str) -> None:
+        from openpyxl import load_workbook
+
+        self.book = load_workbook(path, read_only=True, data_only=True)
+        if sheet_name not in self.book.sheetnames:
+            self.book.close()
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        sheet = self.book[sheet_name]
+        sheet.reset_dimensions()
+        self._rows = sheet.iter_rows()
+
+    @staticmethod
+    def _value(cell):
+        # read_excel은 #N/A 같은 오류 셀을 결측으로 읽는다
+        return None if cell.data_type == "e" else cell_value(cell.value)
+
+    def header(self) -> list:
+        return [self._value(cell) for cell in next(self._rows, ())]
+
+    def rows(self, keep: List[int]) -> Iterator[Tuple[int, list, bool]]:
+        for pos, row in enumerate(self._rows):
+            nonblank = any(cell.value is not None and cell.value != "" for cell in row)
+            yield pos, [self._value(row[i]) if i < len(row) else None for i in keep], nonblank
+
+    def resolve(self, lists: List[list]) -> None:
+        pass
+
+    def close(self) -> None:
+        self.book.close()
+
+
+def read_streaming(path, sheet_name: str, scope=None):
+    """단어/뜻/Day/상태 열만 남긴 DataFrame을 만든다.
+
+    scope=("chapter"|"count", spec)이면 범위 밖 행은 담지 않고 Tries 합계만 센다
+    (cur_step은 엑셀 전체 Tries 합이므로 끝까지 읽는다). Day가 공유 문자열이면 마지막에야
+    풀리므로 그런 행은 일단 담았다가 다 읽은 뒤 거른다.
+    df.index는 시트의 데이터 행 위치(read_excel처럼 중간 빈 줄 포함, 끝 빈 줄 제외)이고,
+    남기지 않은 열/행은 저장할 때 merge_into_workbook이 원본에서 그대로 옮긴다.
+    반환: (df, 범위로 걸렀으면 엑셀 전체 Tries 합계 아니면 None)
+    """
+    source = file_signature(path)
+    try:
+        sheet = _XmlSheet(path, sheet_name)
+    except UnsupportedLayout:
+        sheet = _OpenpyxlSheet(path, sheet_name)
+
+    with contextlib.closing(sheet):
+        header = sheet_header(sheet.header())
+        word_col, meaning_col = core.detect_card_columns(pd.DataFrame(columns=header))
+        keep = [i for i, name in enumerate(header) if name in {word_col, meaning_col} | core.STATE_COLUMNS]
+        names = [header[i] for i in keep]
+        mode, spec = scope if scope is not None else (None, None)
+        wanted = core.parse_count_spec(spec).shift(-1) if mode == "count" else None
+        by_chapter = mode == "chapter" and "Day" in names
+        chapters = core.parse_chapter_spec(spec) if by_chapter else None
+        day_slot = names.index("Day") if by_chapter else None
+        tries_slot = names.index("Tries") if "Tries" in names else None
+
+        columns: List[list] = [[] for _ in keep]
+        # Day 값 종류는 챕터 수 정도라 값마다 한 번만 판정한다(True와 1이 섞이지 않게 형식도 키에)
+        outside_day: Dict[tuple, bool] = {}
+        positions: List[int] = []
+        outside_tries: list = []
+        last = -1
+        for pos, values, nonblank in sheet.rows(keep):
+            if nonblank:
+                last = pos
+            if wanted is not None:
+                outside = pos not in wanted
+            elif chapters is not None:
+                day = values[day_slot]
+                if type(day) is _SharedRef:
+                    outside = False
+                else:
+                    outside = outside_day.get((type(day), day))
+                    if outside is None:
+                        outside = outside_day[(type(day), day)] = core.to_chapter_num(day) not in chapters
+            else:
+                outside = False
+            if outside:
+                if tries_slot is not None:
+                    outside_tries.append(values[tries_slot])
+                continue
+            positions.append(pos)
+            for column, value in zip(columns, values):
+                column.append(value)
+        sheet.resolve(columns + [outside_tries])
+
+    # 끝쪽 빈 줄은 read_excel처럼 버린다
+    cut = len(positions)
+    while cut and positions[cut - 1] > last:
+        cut -= 1
+    data = {name: column[:cut] for name, column in zip(names, columns)}
+    index = pd.Index(positions[:cut], dtype="int64") if wanted is not None or by_chapter else None
+    df = pd.DataFrame(data, index=index)
+    # read_excel처럼 숫자로 읽히는 문자열만 있는 열은 숫자 열로
+    for name in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[name]):
+            with contextlib.suppress(ValueError, TypeError):
+                df[name] = pd.to_numeric(df[name])
+
+    total_tries = None
+    if wanted is not None or by_chapter:
+        total_tries = int(core.int_array(outside_tries).sum()) if outside_tries else 0
+        if "Tries" in df.columns:
+            total_tries += int(core.int_array(df["Tries"]).sum())
+        if by_chapter:
+            inside = chapters.mask(core.chapter_numbers(df["Day"]))
+            df = df[inside]
+    df.attrs["pruned"] = total_tries is not None or len(keep) < len(header)
+    df.attrs["row_filtered"] = total_tries is not None
+    df.attrs["source"] = source
+    return df, total_tries
+
+
+# ===== 병합 쓰기 =====
+# 이 프로세스가 마지막으로 쓴 파일의 (크기, 수정 시각)
+_written: Dict[str, Tuple[int, int]] = {}
+
+
+def file_signature(path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def remember_written(path) -> None:
+    """merge_into_workbook 결과로 path를 교체한 뒤 부른다. 다음 저장도 빠른 경로를 쓸 수 있다."""
+    _written[os.path.abspath(path)] = file_signature(path)
+
+
+def merge_into_workbook(df, src, dst, sheet_name: str, sync=None) -> None:
+    """src 엑셀에 df의 상태 열 값을 병합해 dst에 쓴다.
+
+    df.index는 시트의 데이터 행 위치(read_streaming). 상태 열(WRITE_COLUMNS)과 원본에 없는 df 열만 쓰고
+    (없는 열은 오른쪽에 덧붙임), 다른 열/행/시트와 수식은 그대로 둔다.
+    sync={(단어, 뜻): {열: 값}}이면 df에 없는 행 중 같은 (단어, 뜻) 행에도 그 값을 쓴다
+    (범위만 읽은 세션에서 같은 카드의 다른 행을 함께 갱신하기 위함).
+    시트 XML 고쳐 쓰기가 모르는 구조를 만나면 UnsupportedLayout을 내고 openpyxl 경로로 다시 쓴다.
+    """
+    current = file_signature(src)
+    check = current is None or current not in {df.attrs.get("source"), _written.get(os.path.abspath(src))}
+    try:
+        _patch_workbook(df, src, dst, sheet_name, sync, check)
+    except UnsupportedLayout:
+        _merge_with_openpyxl(df, src, dst, sheet_name, sync)
+
+
+def sheet_names(path) -> List[str]:
+    """통합 문서의 시트 이름(순서대로)."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            book = ET.fromstring(zf.read("xl/workbook.xml"))
+        if book.tag == MAIN_NS + "workbook":
+            return [sheet.get("name") for sheet in book.iter(MAIN_NS + "sheet")]
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        pass
+    from openpyxl import load_workbook
+
+    book = load_workbook(path, read_only=True)
+    try:
+        return list(book.sheetnames)
+    finally:
+        book.close()
+
+
+def _write_columns(df, header: list) -> Dict[object, int]:
+    """쓸 df 열 → 시트 열 번호(0-based). 원본에 없는 열은 머리글 오른쪽에 차례로 붙인다.
+
+    SQLite 백엔드처럼 열 이름을 문자열로 바꾼 표도 원본 머리글과 맞춘다.
+    """
+    at: Dict[object, int] = {}
+    for i, name in enumerate(header):
+        at.setdefault(name, i)
+    for i, name in enumerate(header):
+        at.setdefault(str(name), i)
+    columns: Dict[object, int] = {}
+    extra = len(header)
+    for c in df.columns:
+        if c in at:
+            if c in WRITE_COLUMNS:
+                columns[c] = at[c]
+        else:
+            columns[c] = extra
+            extra += 1
+    return columns
+
+
+# --- 빠른 경로: 시트 XML에서 해당 셀만 고쳐 쓴다 ---
+_ROW_XML = re.compile(rb"\s*(<row\b[^>]*?)(/>|>(.*?)</row>)", re.S)
+_CELL_XML = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+_CELL_REF = re.compile(rb'\sr="([A-Z]+)\d+"')
+_ROW_REF = re.compile(rb'\sr="(\d+)"')
+_STYLE_ATTR = re.compile(rb'\ss="(\d+)"')
+_TYPE_ATTR = re.compile(rb'\st="(\w+)"')
+_SPANS_ATTR = re.compile(rb'\sspans="[^"]*"')
+_SPANS_END = re.compile(rb'\sspans="[^"]*?(\d+)"')
+_CELL_ATTR = re.compile(rb"\s([\w:]+)\s*=")
+_CELL_TEXT = re.compile(rb"<(?:v|t)(?:\s[^>]*)?>([^<]*)</(?:v|t)>")
+_DIMENSION = re.compile(rb'<dimension ref="[A-Z]+\d+(?::([A-Z]+)(\d+))?"\s*/>')
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _moved(number: int) -> RuntimeError:
+    return RuntimeError(
+        f"엑셀 {number}행의 단어/뜻이 불러올 때와 다릅니다. "
+        "프로그램 실행 중에 엑셀을 편집했다면 다시 실행해 주세요."
+    )
+
+
+def _cell_xml(ref: bytes, style: Optional[bytes], value) -> Optional[bytes]:
+    """값 하나를 <c> 요소로. 빈 값이면 서식만 남기거나(None이면) 셀을 뺀다."""
+    from xml.sax.saxutils import escape
+
+    value = excel_value(value)
+    attrs = b'r="%s"' % ref + (b' s="%s"' % style if style else b"")
+    if isinstance(value, float) and not math.isfinite(value):
+        value = None
+    if value is None:
+        return b"<c %s/>" % attrs if style else None
+    if isinstance(value, bool):
+        return b'<c %s t="b"><v>%d</v></c>' % (attrs, value)
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+        from openpyxl.utils.datetime import to_excel
+
+        value = to_excel(value)
+    if isinstance(value, (int, float)):
+        return b"<c %s><v>%s</v></c>" % (attrs, repr(value).encode())
+    text = escape(_ILLEGAL_XML.sub("", str(value))).encode("utf-8")
+    return b'<c %s t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (attrs, text)
+
+
+class _SheetPatcher:
+    """시트 XML 한 줄(<row>)씩 받아 쓸 열의 셀만 바꾼 바이트를 돌려준다.
+
+    check=True(불러온 뒤 파일이 바뀜)이면 고칠 줄의 단어/뜻이 df와 같은지 확인한다.
+    """
+
+    def __init__(self, zip_in: zipfile.ZipFile, sheet: _XmlSheet, df, header: list, sync, check: bool = False) -> None:
+        from openpyxl.utils import get_column_letter
+
+        word_col, meaning_col = core.detect_card_columns(df)
+        width = len(header)
+        self.zip = zip_in
+        self.sheet = sheet
+        col_at = _write_columns(df, header)
+        self.columns = list(col_at)
+        self.extra = [c for c in self.columns if col_at[c] >= width]
+        self.refs = {c: get_column_letter(col_at[c] + 1).encode() for c in self.columns}
+        self.cols = {self.refs[c]: col_at[c] for c in self.columns}
+        self.at = {int(p): i for i, p in enumerate(df.index)}
+        self.values = {c: df[c].tolist() for c in self.columns}
+        self.sync = sync if sync and word_col in header and meaning_col in header else None
+        if self.sync:
+            self.key_refs = (
+                get_column_letter(header.index(word_col) + 1).encode(),
+                get_column_letter(header.index(meaning_col) + 1).encode(),
+            )
+        self.check: List[Tuple[bytes, list]] = []
+        if check:
+            self.check = [
+                (get_column_letter(header.index(c) + 1).encode(), df[c].tolist())
+                for c in (word_col, meaning_col)
+                if c in header
+            ]
+        self.extra_start = width
+        self.last_col = get_column_letter(width + len(self.extra)).encode()
+        self._strings: Optional[Dict[int, str]] = None
+
+    def _cells(self, body: bytes) -> Dict[bytes, bytes]:
+        cells = {}
+        end = 0
+        for match in _CELL_XML.finditer(body):
+            if body[end : match.start()].strip():
+                raise UnsupportedLayout("셀 말고 다른 요소가 있는 줄")
+            end = match.end()
+            cell = match.group()
+            ref = _CELL_REF.search(cell[: cell.find(b">") + 1])
+            if ref is None or ref.group(1) in cells:
+                raise UnsupportedLayout("셀 주소(r)가 없거나 겹치는 셀")
+            cells[ref.group(1)] = cell
+        if body[end:].strip():
+            raise UnsupportedLayout("셀 말고 다른 요소가 있는 줄")
+        return cells
+
+    def _text(self, cell: Optional[bytes]):
+        """셀 바이트 → 값(동기화할 (단어, 뜻) 비교용)."""
+        if cell is None:
+            return None
+        head = cell[: cell.find(b">") + 1]
+        if b"<rPh" in cell:
+            # 윗주는 읽을 때 빼므로 여기서도 빼야 하는데 정규식으로는 구분하지 않는다
+            raise UnsupportedLayout("윗주가 있는 셀")
+        kind = _TYPE_ATTR.search(head)
+        kind = kind.group(1).decode() if kind else None
+        style = _STYLE_ATTR.search(head)
+        text = html.unescape("".join(t.decode("utf-8") for t in _CELL_TEXT.findall(cell[len(head):])))
+        value = self.sheet.convert(kind, style.group(1).decode() if style else None, text)
+        if type(value) is _SharedRef:
+            if self._strings is None:
+                target = _StringsTarget(None)
+                if self.sheet.strings_path is not None:
+                    parser = ET.XMLParser(target=target)
+                    with self.zip.open(self.sheet.strings_path) as fh:
+                        for chunk in iter(lambda: fh.read(_CHUNK), b""):
+                            parser.feed(chunk)
+                        parser.close()
+                self._strings = target.found
+            value = self._strings.get(value.index) or None
+        return cell_value(value)
+
+    def _replace(self, cells: Dict[bytes, bytes], number: int, updates: Dict[bytes, object]) -> None:
+        for letters, value in updates.items():
+            old = cells.get(letters)
+            if old is not None and b"<f" in old:
+                raise UnsupportedLayout("상태 열에 수식이 있음")
+            style = None
+            if old is not None:
+                head = old[: old.find(b">") + 1]
+                if not set(_CELL_ATTR.findall(head)) <= {b"r", b"s", b"t"}:
+                    raise UnsupportedLayout("상태 열 셀에 모르는 속성이 있음")
+                match = _STYLE_ATTR.search(head)
+                style = match.group(1) if match else None
+            new = _cell_xml(letters + str(number).encode(), style, value)
+            if new is None:
+                cells.pop(letters, None)
+            else:
+                cells[letters] = new
+
+    def row(self, head: bytes, tail: bytes, body: Optional[bytes]) -> bytes:
+        ref = _ROW_REF.search(head)
+        if ref is None:
+            raise UnsupportedLayout("행 번호(r)가 없는 행")
+        number = int(ref.group(1))
+        if self.extra:
+            spans = _SPANS_END.search(head)
+            if spans is not None and int(spans.group(1)) > self.extra_start:
+                raise UnsupportedLayout("머리글보다 긴 줄")
+        pos = number - 2
+        updates: Optional[Dict[bytes, object]] = None
+        cells = None
+        i = self.at.get(pos)
+        if number == 1 and self.extra:
+            updates = {self.refs[c]: c for c in self.extra}
+        elif i is not None:
+            if self.check:
+                cells = self._cells(body or b"")
+                for letters, values in self.check:
+                    if not _same_cell(self._text(cells.get(letters)), values[i]):
+                        raise _moved(number)
+            updates = {self.refs[c]: self.values[c][i] for c in self.columns}
+        elif self.sync and body:
+            cells = self._cells(body)
+            key = tuple(self._text(cells.get(letters)) for letters in self.key_refs)
+            changes = self.sync.get(key)
+            if changes:
+                updates = {self.refs[c]: v for c, v in changes.items() if c in self.refs}
+        if not updates:
+            return head + tail
+        if cells is None:
+            cells = self._cells(body or b"")
+        if self.extra and any(_column_index(letters.decode()) >= self.extra_start for letters in cells if letters not in self.cols):
+            raise UnsupportedLayout("머리글보다 긴 줄")
+        self._replace(cells, number, updates)
+        ordered = sorted(cells.items(), key=lambda item: (len(item[0]), item[0]))
+        return _SPANS_ATTR.sub(b"", head) + b">" + b"".join(cell for _, cell in ordered) + b"</row>"
+
+    def new_row(self, pos: int) -> bytes:
+        """XML에 없는 빈 줄(df에는 있는 위치)을 만든다."""
+        i = self.at[pos]
+        for _, values in self.check:
+            if not _same_cell(None, values[i]):
+                raise _moved(pos + 2)
+        cells: Dict[bytes, bytes] = {}
+        self._replace(cells, pos + 2, {self.refs[c]: self.values[c][i] for c in self.columns})
+        ordered = sorted(cells.items(), key=lambda item: (len(item[0]), item[0]))
+        return b'<row r="%d">' % (pos + 2) + b"".join(cell for _, cell in ordered) + b"</row>"
+
+
+def _patch_sheet(patcher: _SheetPatcher, fh, out) -> None:
+    buf = b""
+    while b"<sheetData" not in buf or b">" not in buf[buf.find(b"<sheetData"):]:
+        chunk = fh.read(_CHUNK)
+        if not chunk:
+            raise UnsupportedLayout("sheetData 없음")
+        buf += chunk
+    start = buf.find(b"<sheetData")
+    start = buf.find(b">", start) + 1
+    if buf[start - 2 : start] == b"/>":
+        raise UnsupportedLayout("빈 시트")
+    prefix = buf[:start]
+    if patcher.extra:
+        # 머리글보다 긴 줄이 있으면 덧붙일 열과 겹친다(openpyxl 경로는 그 칸들을 오른쪽으로 민다)
+        dimension = _DIMENSION.search(prefix)
+        if dimension is None or dimension.group(1) and _column_index(dimension.group(1).decode()) >= patcher.extra_start:
+            raise UnsupportedLayout("머리글보다 긴 줄")
+
+        def widen(match):
+            last_col, last_row = match.group(1), match.group(2)
+            if last_col is None or (len(last_col), last_col) < (len(patcher.last_col), patcher.last_col):
+                last_col = patcher.last_col
+            return b'<dimension ref="A1:%s%s"/>' % (last_col, last_row or b"1")
+        prefix = _DIMENSION.sub(widen, prefix)
+    out.write(prefix)
+
+    buf, i = buf[start:], 0
+    pending = sorted(patcher.at)
+    k = 0
+    last = 0
+    eof = False
+    parts: List[bytes] = []
+    while True:
+        match = _ROW_XML.match(buf, i)
+        if match is not None and (match.end() < len(buf) or eof):
+            head, tail, body = match.group(1), match.group(2), match.group(3)
+            number = _ROW_REF.search(head)
+            if number is not None:
+                number = int(number.group(1))
+                if number <= last:
+                    raise UnsupportedLayout("행 번호가 차례대로가 아님")
+                last = number
+                while k < len(pending) and pending[k] + 2 < number:
+                    parts.append(patcher.new_row(pending[k]))
+                    k += 1
+                if k < len(pending) and pending[k] + 2 == number:
+                    k += 1
+            parts.append(patcher.row(head, tail, body))
+            i = match.end()
+            if len(parts) >= 256:
+                out.write(b"".join(parts))
+                parts = []
+            continue
+        rest = buf[i:].lstrip()
+        if rest.startswith(b"</sheetData>"):
+            break
+        if eof:
+            raise UnsupportedLayout("시트 XML을 해석할 수 없음")
+        chunk = fh.read(_CHUNK)
+        eof = not chunk
+        buf, i = buf[i:] + chunk, 0
+    for pos in pending[k:]:
+        parts.append(patcher.new_row(pos))
+    out.write(b"".join(parts))
+    out.write(buf[i:])
+    for chunk in iter(lambda: fh.read(_CHUNK), b""):
+        out.write(chunk)
+
+
+def _patch_workbook(df, src, dst, sheet_name: str, sync, check: bool = False) -> None:
+    sheet = _XmlSheet(src, sheet_name)
+    try:
+        header = sheet_header(sheet.header())
+        patcher = _SheetPatcher(sheet.zip, sheet, df, header, sync, check)
+        with zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zip_out:
+            for info in sheet.zip.infolist():
+                if info.filename != sheet.sheet_path:
+                    zip_out.writestr(info, sheet.zip.read(info.filename))
+                    continue
+                out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                out_info.compress_type = zipfile.ZIP_DEFLATED
+                with sheet.zip.open(info) as fh, zip_out.open(out_info, "w", force_zip64=True) as out:
+                    _patch_sheet(patcher, fh, out)
+    finally:
+        sheet.close()
+
+
+# --- 느린 경로: openpyxl로 통째로 열어 고친다 ---
+def _merge_with_openpyxl(df, src, dst, sheet_name: str, sync) -> None:
+    """src를 openpyxl로 열어 쓸 열만 df 값으로 바꿔 dst에 저장한다. df 행의 단어/뜻이 원본과 같은지 확인한다.
+
+    셀 서식·열 너비·병합 셀처럼 openpyxl이 다루는 것은 그대로 남는다(그림·차트와 수식의 저장된 계산값은 빠진다).
+    통합 문서를 통째로 메모리에 올리므로 빠른 경로를 쓸 수 없을 때만 쓴다.
+    """
+    from openpyxl import load_workbook
+
+    word_col, meaning_col = core.detect_card_columns(df)
+    at = {int(p): i for i, p in enumerate(df.index)}
+    book = load_workbook(src)
+    if sheet_name not in book.sheetnames:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    sheet = book[sheet_name]
+    rows = sheet.max_row - 1
+    if at and max(at) >= rows:
+        raise RuntimeError("엑셀 행 수가 불러올 때보다 줄었습니다. 다시 실행해 주세요.")
+
+    raw_header = [cell.value for cell in next(sheet.iter_rows(max_row=1))]
+    while raw_header and raw_header[-1] is None:
+        raw_header.pop()
+    header = sheet_header(raw_header)
+    width = len(header)
+    col_at = _write_columns(df, header)
+    extra = [c for c in col_at if col_at[c] >= width]
+    if extra and sheet.max_column > width:
+        # 머리글보다 긴 줄은 덧붙인 열 뒤로 민다
+        sheet.insert_cols(width + 1, len(extra))
+    for c in extra:
+        sheet.cell(1, col_at[c] + 1, c)
+
+    keys = [header.index(c) + 1 if c in header else None for c in (word_col, meaning_col)]
+    values = {c: df[c].tolist() for c in set(col_at) | {word_col, meaning_col}}
+    for pos in range(rows):
+        number = pos + 2
+        i = at.get(pos)
+        if i is not None:
+            for c, col in zip((word_col, meaning_col), keys):
+                cell = sheet.cell(number, col) if col is not None else None
+                # 수식 셀은 계산 결과를 모르므로 건너뛴다
+                if cell is None or cell.data_type == "f":
+                    continue
+                if not _same_cell(cell_value(cell.value), values[c][i]):
+                    raise _moved(number)
+            changes = {c: values[c][i] for c in col_at}
+        elif sync and None not in keys:
+            changes = sync.get(tuple(cell_value(sheet.cell(number, col).value) for col in keys), {})
+        else:
+            continue
+        for c, value in changes.items():
+            if c in col_at:
+                sheet.cell(number, col_at[c] + 1).value = excel_value(value)
+    book.save(dst)